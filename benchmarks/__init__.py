@@ -0,0 +1 @@
+"""Benchmarks of the client hot paths, run them with `python -m benchmarks`."""
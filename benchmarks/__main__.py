@@ -0,0 +1,58 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import argparse
+import json
+
+from . import (
+    bench_compression,
+    bench_crypto,
+    bench_framing,
+    bench_memory,
+    bench_transfer,
+)
+from .harness import BenchmarkSuite, compare
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Benchmarks of the tfprotocol client.',
+    )
+    parser.add_argument('-o', '--output', help='store the results in a json file')
+    parser.add_argument('-c', '--compare', help='json results to compare with')
+    parser.add_argument('-k', '--filter', default='', help='run matching benchmarks')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='measured rounds')
+    parser.add_argument(
+        '-q', '--quick', action='store_true', help='smaller sizes and rounds'
+    )
+    parser.add_argument(
+        '--transfer-size', type=int, help='bytes moved by each transfer benchmark'
+    )
+    parser.add_argument(
+        '--no-transfer', action='store_true', help='skip the loopback transfers'
+    )
+    args = parser.parse_args()
+
+    suite = BenchmarkSuite(
+        repeat=3 if args.quick else args.repeat,
+        min_time=0.05 if args.quick else 0.2,
+        pattern=args.filter,
+    )
+    bench_crypto.run(suite, quick=args.quick)
+    bench_framing.run(suite, quick=args.quick)
+    bench_memory.run(suite, quick=args.quick)
+    bench_compression.run(suite, quick=args.quick)
+    if not args.no_transfer:
+        bench_transfer.run(suite, quick=args.quick, size=args.transfer_size)
+    if args.output:
+        suite.save(args.output)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        print()
+        print(compare(baseline, suite.to_dict()))
+
+
+if __name__ == '__main__':
+    main()
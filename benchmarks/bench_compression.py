@@ -0,0 +1,65 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import os
+from io import BytesIO
+
+from tfprotocol_client.misc.compression import (
+    CompressingReader,
+    CompressionCodec,
+    DecompressingWriter,
+    GzipCodec,
+    ZlibCodec,
+)
+
+from .harness import BenchmarkSuite
+
+SIZE = 1024 * 1024
+QUICK_SIZE = 128 * 1024
+CODECS = (ZlibCodec(1), ZlibCodec(6), ZlibCodec(9), GzipCodec(6))
+QUICK_CODECS = (ZlibCodec(1), ZlibCodec(6))
+
+
+def compressible_data(size: int) -> bytes:
+    """CSV like data, it compresses about as much as logs and JSON do."""
+    lines = bytearray()
+    i = 0
+    while len(lines) < size:
+        lines += b'%d,name %d,2022-01-%02d,%d\n' % (i, i % 97, i % 28 + 1, i * 7)
+        i += 1
+    return bytes(lines[:size])
+
+
+def run(suite: BenchmarkSuite, quick: bool = False):
+    """CPU cost of the compression of the transfers, the throughput is measured over
+    the uncompressed data and the ratio is stored along with it.
+    """
+    size = QUICK_SIZE if quick else SIZE
+    for kind, data in (('csv', compressible_data(size)), ('random', os.urandom(size))):
+        for codec in QUICK_CODECS if quick else CODECS:
+            _bench_codec(suite, f'{codec.name}-{codec.level}', codec, kind, data)
+
+
+def _bench_codec(
+    suite: BenchmarkSuite, label: str, codec: CompressionCodec, kind: str, data: bytes
+):
+    compressed = CompressingReader(BytesIO(data), codec).read()
+    ratio = {'ratio': len(data) / len(compressed)}
+    suite.bench(
+        f'compression.compress[{label},{kind}]',
+        lambda: CompressingReader(BytesIO(data), codec).read(),
+        nbytes=len(data),
+        info=ratio,
+    )
+
+    def decompress():
+        writer = DecompressingWriter(BytesIO())
+        writer.write(compressed)
+        writer.finish()
+
+    suite.bench(
+        f'compression.decompress[{label},{kind}]',
+        decompress,
+        nbytes=len(data),
+        info=ratio,
+    )
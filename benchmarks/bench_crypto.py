@@ -0,0 +1,39 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import os
+
+from tfprotocol_client.security.cryptography import Xor
+
+from .harness import BenchmarkSuite
+
+SIZES = (64, 1024, 4096, 16384)
+QUICK_SIZES = (64, 1024)
+
+
+def run(suite: BenchmarkSuite, quick: bool = False):
+    """Xor encryption and decryption of payloads of several sizes, and the application
+    of a keystream computed ahead. Every call uses a fresh cipher.
+    """
+    key = os.urandom(32)
+    for size in QUICK_SIZES if quick else SIZES:
+        payload = os.urandom(size)
+        # THE LOOP VARIABLES ARE BOUND AS DEFAULTS, EACH BENCH KEEPS ITS OWN PAYLOAD
+        suite.bench(
+            f'xor.encrypt[{size}]',
+            lambda payload=payload: Xor(key).encrypt(payload),
+            nbytes=size,
+        )
+        suite.bench(
+            f'xor.decrypt[{size}]',
+            lambda payload=payload: Xor(key).decrypt(payload),
+            nbytes=size,
+        )
+        keystream = Xor(key).keystream(size)
+        suite.bench(
+            f'xor.apply[{size}]',
+            lambda payload=payload, keystream=keystream: Xor.apply_encrypt(
+                payload, *keystream
+            ),
+            nbytes=size,
+        )
@@ -0,0 +1,64 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+from tfprotocol_client.misc.constants import LONG_SIZE
+from tfprotocol_client.models.message import TfProtocolMessage
+from tfprotocol_client.models.status_info import StatusInfo
+
+from .harness import BenchmarkSuite
+
+# (header, response, parse_code) AS THE SERVERS SEND THEM
+RESPONSES = (
+    (2, b'OK', False),
+    (26, b'OK DIRECTORY WAS CREATED', False),
+    (32, b'FAILED 5 : FILE ALREADY EXISTS', False),
+    (42, b'FAILED 12 : PERMISSION DENIED /py_test/a', False),
+    (25, b'CONT 3 : STREAM CONTINUE', False),
+    (64, b'D: test2/\nD: test3new/\nD: test2/test21/\nF: test2/test.java\n', False),
+    (64, b'a' * 64, False),
+    (24, b'0 OK DB OPENED WITH ID 1', True),
+    (30, b'3 FAILED : NO SUCH TABLE: MISS', True),
+    (20, b'-1 OK 12 ROWS LISTED', True),
+)
+
+
+def run(suite: BenchmarkSuite, quick: bool = False):
+    """Construction of request messages and parsing of response status lines."""
+    # pylint: disable=unused-argument
+    suite.bench('message.command', lambda: TfProtocolMessage('MKDIR', '/py_test/dir'))
+    suite.bench(
+        'message.build',
+        lambda: TfProtocolMessage('COMMAND', header_size=8)
+        .add('_ARG1')
+        .add('_ARG2_')
+        .add(3, size=LONG_SIZE),
+    )
+    suite.bench(
+        'message.frame',
+        lambda: tuple(TfProtocolMessage('PUT', '/py_test/file.txt', 0, 512)),
+    )
+    payload = bytes(4096)
+    suite.bench(
+        'message.payload[4096]',
+        lambda: TfProtocolMessage(payload).payload,
+        nbytes=len(payload),
+    )
+
+    def parse_corpus():
+        for header, response, parse_code in RESPONSES:
+            StatusInfo.build_status(header, response, parse_code=parse_code)
+
+    suite.bench('status.build_status[corpus]', parse_corpus)
+    suite.bench(
+        'status.build_status[ok]', lambda: StatusInfo.build_status(2, b'OK')
+    )
+    suite.bench(
+        'status.build_status[failed]',
+        lambda: StatusInfo.build_status(32, b'FAILED 5 : FILE ALREADY EXISTS'),
+    )
+    suite.bench(
+        'status.build_status[code]',
+        lambda: StatusInfo.build_status(
+            24, b'0 OK DB OPENED WITH ID 1', parse_code=True
+        ),
+    )
@@ -0,0 +1,34 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import struct
+
+from tfprotocol_client.misc.constants import ENDIANESS
+from tfprotocol_client.models.file_stat import FileStat
+from tfprotocol_client.models.status_info import StatusInfo
+from tfprotocol_client.models.transfer_state import TransferStatus
+
+from .harness import BenchmarkSuite
+
+COUNT = 1_000_000
+QUICK_COUNT = 100_000
+
+
+def run(suite: BenchmarkSuite, quick: bool = False):
+    """Footprint of the models built in bulk, like the result of a FSTATLS over a big
+    directory.
+    """
+    count = QUICK_COUNT if quick else COUNT
+    fstatstruct = struct.pack(f'{ENDIANESS}bbQQQ', 0, 1, 4096, 1700000000, 1700000000)
+    suite.memory(
+        f'memory.fstatls[{count}]',
+        lambda: [FileStat.build_from_structure(fstatstruct)[1] for _ in range(count)],
+    )
+    suite.memory(
+        f'memory.status_info[{count}]',
+        lambda: [StatusInfo.build_status(2, b'OK') for _ in range(count)],
+    )
+    suite.memory(
+        f'memory.transfer_status[{count}]',
+        lambda: [TransferStatus() for _ in range(count)],
+    )
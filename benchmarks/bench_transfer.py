@@ -0,0 +1,124 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import os
+from contextlib import contextmanager
+from io import BytesIO
+
+from tfprotocol_client.extensions.xs_sqlite import XSSQLite
+from tfprotocol_client.misc.compression import ZlibCodec
+from tfprotocol_client.testing.stand_in_server import StandInServer
+from tfprotocol_client.tfprotocol import TfProtocol
+
+from .bench_compression import compressible_data
+from .harness import BenchmarkSuite
+
+SIZE = 8 * 1024
+QUICK_SIZE = 2 * 1024
+BUFFER_SIZE = 4096
+TIMEOUT = 60
+
+
+@contextmanager
+def _session(server: StandInServer, protocol_type=TfProtocol):
+    # EVERY BENCHMARK GETS ITS OWN CONNECTION TO NOT DEPEND ON THE PREVIOUS ONES
+    tfproto = protocol_type(*server.protocol_args)
+    tfproto.connect()
+    try:
+        yield tfproto
+    finally:
+        tfproto.disconnect()
+
+
+def run(suite: BenchmarkSuite, quick: bool = False, size: int = None):
+    """End to end transfers against a loopback stand-in server."""
+    size = size or (QUICK_SIZE if quick else SIZE)
+    payload = os.urandom(size)
+    with StandInServer() as server:
+        _bench_files(suite, server, payload)
+        _bench_compressed(suite, server, compressible_data(size))
+        _bench_sql(suite, server)
+
+
+def _bench_files(suite: BenchmarkSuite, server: StandInServer, payload: bytes):
+    size = len(payload)
+    with _session(server) as tfproto:
+        suite.bench(
+            f'transfer.put[{size}]',
+            lambda: tfproto.put_command(BytesIO(payload), 'put.bin', 0, BUFFER_SIZE),
+            nbytes=size,
+        )
+    with _session(server) as tfproto:
+        suite.bench(
+            f'transfer.get[{size}]',
+            lambda: tfproto.get_command(BytesIO(), 'put.bin', 0, BUFFER_SIZE),
+            nbytes=size,
+        )
+    with _session(server) as tfproto:
+        suite.bench(
+            f'transfer.sup[{size}]',
+            lambda: tfproto.sup_command('sup.bin', BytesIO(payload), TIMEOUT),
+            nbytes=size,
+        )
+    with _session(server) as tfproto:
+        suite.bench(
+            f'transfer.sdown[{size}]',
+            lambda: tfproto.sdown_command('sup.bin', BytesIO(), TIMEOUT),
+            nbytes=size,
+        )
+
+
+def _bench_compressed(suite: BenchmarkSuite, server: StandInServer, payload: bytes):
+    # THE THROUGHPUT IS THE EFFECTIVE ONE, OVER THE UNCOMPRESSED DATA
+    size = len(payload)
+    codec = ZlibCodec(1)
+    with _session(server) as tfproto:
+        suite.bench(
+            f'transfer.put[csv,{size}]',
+            lambda: tfproto.put_command(BytesIO(payload), 'csv.bin', 0, BUFFER_SIZE),
+            nbytes=size,
+        )
+    with _session(server) as tfproto:
+        suite.bench(
+            f'transfer.put[csv,zlib-1,{size}]',
+            lambda: tfproto.put_command(
+                BytesIO(payload), 'csv.z', 0, BUFFER_SIZE, compression=codec
+            ),
+            nbytes=size,
+        )
+    with _session(server) as tfproto:
+        suite.bench(
+            f'transfer.get[csv,zlib-1,{size}]',
+            lambda: tfproto.get_command(
+                BytesIO(), 'csv.z', 0, BUFFER_SIZE, compression=codec
+            ),
+            nbytes=size,
+        )
+
+
+def _bench_sql(suite: BenchmarkSuite, server: StandInServer):
+    with _session(server, XSSQLite) as xssqlite:
+        xssqlite.xssqlite_command()
+        db_id = xssqlite.open_command(':memory:')
+        xssqlite.exec_command(
+            db_id, 'CREATE TABLE BENCH(ID INT PRIMARY KEY NOT NULL, NAME TEXT NOT NULL);'
+        )
+        xssqlite.exec_command(
+            db_id,
+            ''.join(
+                f"INSERT INTO BENCH (ID,NAME) VALUES ({i}, 'name {i}');"
+                for i in range(100)
+            ),
+        )
+        suite.bench(
+            'transfer.exec[update]',
+            lambda: xssqlite.exec_command(db_id, "UPDATE BENCH SET NAME='x' WHERE ID=1;"),
+        )
+        suite.bench(
+            'transfer.exec[select 100 rows]',
+            lambda: xssqlite.exec_command(
+                db_id, 'SELECT * FROM BENCH;', rows_handler=lambda row: None
+            ),
+        )
+        xssqlite.close_command(db_id)
+        xssqlite.terminate_command()
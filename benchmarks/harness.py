@@ -0,0 +1,149 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tracemalloc
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Sized
+
+
+class BenchmarkSuite:
+    """Collects timings of small callables and stores them as JSON, so the results of
+    two commits can be compared.
+    """
+
+    def __init__(self, repeat: int = 5, min_time: float = 0.2, pattern: str = '') -> None:
+        """Benchmark suite initialization.
+
+        Args:
+            `repeat` (int): Number of measured rounds per benchmark.
+            `min_time` (float): Minimum seconds of each round, the number of calls
+                per round is calibrated to reach it.
+            `pattern` (str): Only the benchmarks whose name contains it are run.
+        """
+        self.repeat = repeat
+        self.min_time = min_time
+        self.pattern = pattern
+        self.results: Dict[str, dict] = {}
+
+    def bench(
+        self,
+        name: str,
+        func: Callable[[], object],
+        nbytes: Optional[int] = None,
+        setup: Optional[Callable[[], None]] = None,
+        info: Optional[dict] = None,
+    ):
+        """Measures `func`, `nbytes` is the amount of data processed by each call and it is
+        used to report the throughput. `info` is stored along with the timings.
+        """
+        if self.pattern not in name:
+            return
+        if setup is not None:
+            setup()
+        number = self._calibrate(func)
+        rounds: List[float] = []
+        for _ in range(self.repeat):
+            start = perf_counter()
+            for _ in range(number):
+                func()
+            rounds.append((perf_counter() - start) / number)
+        result = {
+            'number': number,
+            'min': min(rounds),
+            'median': statistics.median(rounds),
+            'mean': statistics.mean(rounds),
+            'ops_per_sec': 1 / min(rounds),
+        }
+        if nbytes:
+            result['bytes'] = nbytes
+            result['mb_per_sec'] = nbytes / min(rounds) / 1e6
+        if info:
+            result.update(info)
+        self.results[name] = result
+        throughput = f' {result["mb_per_sec"]:10.2f} MB/s' if nbytes else ''
+        print(f'{name:<40} {result["min"] * 1e6:14.2f} us{throughput}')
+
+    def memory(self, name: str, build: Callable[[], Sized]):
+        """Measures the memory held by the collection returned by `build`, reporting the
+        footprint of each of its items.
+        """
+        if self.pattern not in name:
+            return
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            items = build()
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result = {
+            'count': len(items),
+            'memory': after - before,
+            'bytes_per_item': (after - before) / max(len(items), 1),
+        }
+        del items
+        self.results[name] = result
+        print(f'{name:<40} {result["bytes_per_item"]:14.2f} B/item')
+
+    def _calibrate(self, func: Callable[[], object]) -> int:
+        number = 1
+        while True:
+            start = perf_counter()
+            for _ in range(number):
+                func()
+            elapsed = perf_counter() - start
+            if elapsed >= self.min_time or number >= 1 << 20:
+                return number
+            number *= 2 if elapsed <= 0 else max(2, int(self.min_time / elapsed) + 1)
+
+    def to_dict(self) -> dict:
+        return {'metadata': metadata(), 'results': self.results}
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=2, sort_keys=True)
+
+
+def metadata() -> dict:
+    """Information about where and on which commit the benchmarks run."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'date': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+    }
+
+
+def compare(baseline: dict, current: dict) -> str:
+    """Table with the relative change of every benchmark present in both results."""
+    lines = [f'{"benchmark":<40} {"baseline":>12} {"current":>12} {"change":>8}']
+    for name, result in sorted(current['results'].items()):
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        if 'bytes_per_item' in result:
+            key, scale, unit = 'bytes_per_item', 1, 'B'
+        else:
+            key, scale, unit = 'min', 1e6, 'us'
+        change = (result[key] - previous[key]) / previous[key] * 100
+        lines.append(
+            f'{name:<40} {previous[key] * scale:10.2f}{unit:<2}'
+            f' {result[key] * scale:10.2f}{unit:<2} {change:+7.1f}%'
+        )
+    return '\n'.join(lines)
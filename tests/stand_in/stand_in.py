@@ -0,0 +1,32 @@
+# pylint: disable=redefined-outer-name
+
+import pytest
+from tfprotocol_client.extensions.xs_sqlite import XSSQLite
+from tfprotocol_client.testing.stand_in_server import StandInServer
+from tfprotocol_client.tfprotocol import TfProtocol
+
+
+@pytest.fixture(scope='module')
+def stand_in_server():
+    with StandInServer() as server:
+        yield server
+
+
+@pytest.fixture(scope='module')
+def stand_in_tfprotocol(stand_in_server: StandInServer):
+    tfproto = TfProtocol(*stand_in_server.protocol_args)
+    tfproto.connect()
+    tfproto.mkdir_command('/py_test')
+    yield tfproto
+    tfproto.rmdir_command('/py_test')
+    tfproto.disconnect()
+
+
+@pytest.fixture(scope='module')
+def stand_in_xssqlite(stand_in_server: StandInServer):
+    tfproto = XSSQLite(*stand_in_server.protocol_args)
+    tfproto.connect()
+    tfproto.xssqlite_command()
+    yield tfproto
+    tfproto.terminate_command()
+    tfproto.disconnect()
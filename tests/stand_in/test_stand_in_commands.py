@@ -0,0 +1,680 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+# pylint: disable=redefined-outer-name
+
+import io
+import os
+import time
+from threading import Event
+from typing import List
+
+import pytest
+from tfprotocol_client.extensions.xs_sqlite import XSSQLite
+from tfprotocol_client.misc.chunk_sizing import AdaptiveChunkSize
+from tfprotocol_client.misc.compression import (
+    CompressingReader,
+    GzipCodec,
+    ZlibCodec,
+)
+from tfprotocol_client.misc.constants import DFLT_KEYSTREAM_BUFFER_SIZE
+from tfprotocol_client.misc.metrics import Metrics
+from tfprotocol_client.misc.rate_limit import RateLimiter
+from tfprotocol_client.models.exceptions import TfException
+from tfprotocol_client.models.file_stat import FileStat, FileStatTypeEnum
+from tfprotocol_client.models.keepalive_options import (
+    KeepAliveMechanismType,
+    KeepAliveOptions,
+)
+from tfprotocol_client.models.putget_commands import PutGetCommandEnum
+from tfprotocol_client.models.rekey_policy import RekeyPolicy
+from tfprotocol_client.models.status_info import StatusInfo
+from tfprotocol_client.models.status_server_code import StatusServerCode
+from tfprotocol_client.models.tcptimeout_options import TCPTimeoutOptions
+from tfprotocol_client.models.transfer_progress import TransferProgress
+from tfprotocol_client.security.hash_utils import hexstr, sha256_for
+from tfprotocol_client.testing.stand_in_server import (
+    StandInError,
+    StandInServer,
+    _Session,
+)
+from tfprotocol_client.tfprotocol import TfProtocol
+
+# pylint: disable=unused-import
+from .stand_in import stand_in_server, stand_in_tfprotocol, stand_in_xssqlite
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_regular_commands(stand_in_tfprotocol: TfProtocol):
+    """Test for the regular commands against the stand-in server."""
+    tfproto = stand_in_tfprotocol
+    resps: List[StatusInfo] = []
+    tfproto.echo_command('Hello World', response_handler=resps.append)
+    assert resps[-1] == 'Hello World'
+    tfproto.date_command(response_handler=lambda d, s: resps.append(d))
+    assert resps[-1] > 0
+    tfproto.touch_command('/py_test/file.txt', response_handler=resps.append)
+    assert resps[-1] == StatusInfo(StatusServerCode.OK)
+    tfproto.sha256_command('/py_test/file.txt', response_handler=resps.append)
+    assert resps[-1].message == hexstr(sha256_for(b''))
+    tfproto.touch_command('/py_test/file.txt', response_handler=resps.append)
+    assert resps[-1].status is StatusServerCode.FAILED and resps[-1].code == 5
+    tfproto.fstat_command(
+        '/py_test/file.txt', response_handler=lambda s, r: resps.append(s)
+    )
+    stat: FileStat = resps[-1]
+    assert stat.type is FileStatTypeEnum.FILE and stat.size == 0
+    tfproto.del_command('/py_test/file.txt')
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_folder_commands(stand_in_tfprotocol: TfProtocol):
+    """Test for the folder commands against the stand-in server."""
+    tfproto = stand_in_tfprotocol
+    resps: List[StatusInfo] = []
+    tfproto.mkdir_command('/py_test/test2/test21')
+    tfproto.touch_command('/py_test/test2/test.java')
+    tfproto.mkdir_command('/py_test/test3')
+    tfproto.renam_command('/py_test/test3', '/py_test/test3new')
+    tfproto.lsr_command('/py_test', response_handler=resps.append)
+    resps_payload = b'D: test2/\nD: test3new/\nD: test2/test21/\nF: test2/test.java\n'
+    assert resps[0] == StatusInfo(
+        StatusServerCode.CONT,
+        code=3,
+        payload=resps_payload,
+        message=resps_payload.decode(),
+    )
+    assert resps[1] == StatusInfo(StatusServerCode.OK)
+    resps.clear()
+    sink = io.BytesIO()
+    tfproto.lsr_command('/py_test', response_handler=resps.append, sink=sink)
+    assert resps == [StatusInfo(StatusServerCode.OK)]
+    assert sink.getvalue() == resps_payload
+    tfproto.rmdir_command('/py_test/test2')
+    tfproto.rmdir_command('/py_test/test3new')
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_transference_commands(stand_in_tfprotocol: TfProtocol):
+    """Test for the transference commands against the stand-in server."""
+    tfproto = stand_in_tfprotocol
+    resps: List[StatusInfo] = []
+    payload = b'Some random text' * 100
+    # SUP/SDOWN
+    assert tfproto.sup_command('py_test/supdown.txt', io.BytesIO(payload), 5)
+    sink = io.BytesIO()
+    assert tfproto.sdown_command('py_test/supdown.txt', sink, 5)
+    assert sink.getvalue() == payload
+    tfproto.fsize_command('py_test/supdown.txt', response_handler=resps.append)
+    assert resps[-1].code == len(payload)
+    # PUT/GET
+    tfproto.put_command(io.BytesIO(payload), 'py_test/putget.txt', 0, 512)
+    sink = io.BytesIO()
+    tfproto.get_command(sink, 'py_test/putget.txt', 0, 512, response_handler=resps.append)
+    assert sink.getvalue() == payload
+    assert resps[-1] == StatusInfo(
+        status=StatusServerCode.OK, code=PutGetCommandEnum.HPFFIN.value
+    )
+    sizer = AdaptiveChunkSize(initial=256, minimum=64, window=0)
+    tfproto.put_command(io.BytesIO(payload), 'py_test/putget.txt', 0, sizer)
+    sink = io.BytesIO()
+    tfproto.get_command(sink, 'py_test/putget.txt', 0, sizer)
+    assert sink.getvalue() == payload and sizer.throughput > 0
+    tfproto.rate_limiter = RateLimiter(50_000, burst=512)
+    start = time.monotonic()
+    tfproto.put_command(io.BytesIO(payload), 'py_test/putget.txt', 0, 512)
+    assert tfproto.sup_command('py_test/supdown.txt', io.BytesIO(payload), 5)
+    # THE BURST IS REFILLED WITH THE 1600 BYTES OF THE PUT BEFORE THE SUP CHUNK GOES,
+    # THE DEBT OF THE SUP ONLY DELAYS THE NEXT TRANSFERENCE
+    assert time.monotonic() - start >= 0.03
+    tfproto.rate_limiter = None
+    # INTREAD/INTWRITE
+    sink = io.BytesIO()
+    tfproto.intread_command('py_test/putget.txt', sink, response_handler=resps.append)
+    assert sink.getvalue() == payload and resps[-1].message == hexstr(sha256_for(payload))
+    tfproto.intwrite_command(
+        'py_test/putget.txt',
+        io.BytesIO(b'new'),
+        resps[-1].message,
+        response_handler=resps.append,
+    )
+    assert resps[-1].status is StatusServerCode.OK
+    tfproto.intwrite_command(
+        'py_test/putget.txt',
+        io.BytesIO(b'stale'),
+        hexstr(sha256_for(payload)),
+        response_handler=resps.append,
+    )
+    assert resps[-1].status is StatusServerCode.FAILED
+    # SNDFILE/RCVFILE, WITH A SESSION BUILT FROM THE CONNECTED ONE
+    # pylint: disable=no-value-for-parameter
+    big_payload = bytes(range(256)) * 40
+    resps.clear()
+    TfProtocol(tfproto).sndfile_command(
+        True,
+        'py_test/sndfile.bin',
+        io.BytesIO(big_payload),
+        lambda _, __, status, ___: resps.append(status),
+        window=4,
+    )
+    assert len(resps) == 4 and resps[-1].status is StatusServerCode.OK
+    assert all(r.status is StatusServerCode.CONT for r in resps[:-1])
+    resps.clear()
+    tfproto.rcvfile_command(
+        True,
+        'py_test/sndfile.bin',
+        handler=lambda _, __, status, ___: resps.append(status),
+    )
+    assert b''.join(r.payload for r in resps[:-1]) == big_payload
+    # RCVFILE STREAMING INTO A SINK, A STREAM OR A FUNCTION
+    resps.clear()
+    tfproto.sndfile_command(False, 'py_test/sndfile.bin', io.BytesIO(big_payload))
+    chunks: List[bytes] = []
+    tfproto.rcvfile_command(
+        False,
+        'py_test/sndfile.bin',
+        lambda chunk: chunks.append(bytes(chunk)),
+        lambda _, __, status, ___: resps.append(status),
+    )
+    assert b''.join(chunks) == big_payload
+    sink = io.BytesIO()
+    tfproto.rcvfile_command(
+        True,
+        'py_test/sndfile.bin',
+        sink,
+        lambda _, __, status, ___: resps.append(status),
+    )
+    assert sink.getvalue() == big_payload
+    assert [r.status for r in resps] == [StatusServerCode.OK] * 2
+    tfproto.del_command('py_test/supdown.txt')
+    tfproto.del_command('py_test/putget.txt')
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_sndfile_window_failure(
+    stand_in_server: StandInServer, monkeypatch: pytest.MonkeyPatch
+):
+    """Test a server failing in the middle of a SNDFILE window."""
+
+    def failing_sndfile(session: _Session, _: bytes):
+        # FAILS THE THIRD CHUNK, THEN KEEPS ANSWERING THE CHUNKS IN FLIGHT
+        session.reply('CONT')
+        chunks = 0
+        while session.recv_msg()[:4] == b'CONT':
+            chunks += 1
+            session.reply('CONT' if chunks < 3 else 'FAILED 28 : No space left.')
+        session.reply()
+
+    monkeypatch.setattr(_Session, 'cmd_sndfile', failing_sndfile)
+    tfproto = TfProtocol(*stand_in_server.protocol_args, channel_len=1029)
+    tfproto.connect()
+    resps: List[StatusInfo] = []
+    tfproto.sndfile_command(
+        True,
+        'py_test/sndfile.bin',
+        io.BytesIO(bytes(1024 * 10)),
+        lambda _, __, status, ___: resps.append(status),
+        window=4,
+    )
+    statuses = [r.status for r in resps]
+    assert statuses[-2:] == [StatusServerCode.FAILED, StatusServerCode.OK]
+    assert statuses[:-2] == [StatusServerCode.CONT] * 3
+    # THE SESSION IS STILL IN STEP
+    resps.clear()
+    tfproto.echo_command('in step', response_handler=resps.append)
+    assert resps == ['in step']
+    tfproto.disconnect()
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_compressed_transference(stand_in_tfprotocol: TfProtocol):
+    """Test the compression of the transference commands."""
+    tfproto = stand_in_tfprotocol
+    resps: List[StatusInfo] = []
+    payload = b''.join(b'%d,name %d\n' % (i, i) for i in range(500))
+    # PUT/GET
+    tfproto.put_command(
+        io.BytesIO(payload), 'py_test/compressed.z', 0, 512, compression=ZlibCodec()
+    )
+    tfproto.fsize_command('py_test/compressed.z', response_handler=resps.append)
+    assert 0 < resps[-1].code < len(payload) // 2
+    sink = io.BytesIO()
+    resps.clear()
+    tfproto.get_command(
+        sink,
+        'py_test/compressed.z',
+        0,
+        512,
+        response_handler=resps.append,
+        compression=ZlibCodec(),
+    )
+    assert sink.getvalue() == payload
+    assert resps[-1].status is StatusServerCode.OK
+    # A TRUNCATED OBJECT IS NOT REPORTED AS DOWNLOADED
+    obj = CompressingReader(io.BytesIO(payload), ZlibCodec()).read()
+    tfproto.put_command(io.BytesIO(obj[: len(obj) // 2]), 'py_test/truncated.z', 0, 512)
+    resps.clear()
+    tfproto.get_command(
+        io.BytesIO(),
+        'py_test/truncated.z',
+        0,
+        512,
+        response_handler=resps.append,
+        compression=ZlibCodec(),
+    )
+    assert resps[-1].status is StatusServerCode.FAILED
+    assert resps[-1].code == PutGetCommandEnum.HPFCANCEL.value
+    tfproto.del_command('py_test/truncated.z')
+    # A COMPRESSED OBJECT IS NOT RESUMED, THE SESSION IS STILL IN STEP
+    with pytest.raises(TfException):
+        tfproto.get_command(
+            io.BytesIO(), 'py_test/compressed.z', 10, 512, compression=ZlibCodec()
+        )
+    resps.clear()
+    tfproto.echo_command('in step', response_handler=resps.append)
+    assert resps == ['in step']
+    # SUP/SDOWN, THE CODEC OF THE DOWNLOAD IS THE ONE IN THE HEADER
+    assert tfproto.sup_command(
+        'py_test/compressed.z', io.BytesIO(payload), 5, compression=GzipCodec()
+    )
+    sink = io.BytesIO()
+    assert tfproto.sdown_command(
+        'py_test/compressed.z', sink, 5, compression=ZlibCodec()
+    )
+    assert sink.getvalue() == payload
+    tfproto.del_command('py_test/compressed.z')
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_keystream_buffer(stand_in_server: StandInServer):
+    """Test a session ciphering with the keystream computed ahead."""
+    tfproto = TfProtocol(*stand_in_server.protocol_args)
+    tfproto.keystream_buffer_size = DFLT_KEYSTREAM_BUFFER_SIZE
+    tfproto.connect()
+    assert tfproto.client.keystream_buffer_size == DFLT_KEYSTREAM_BUFFER_SIZE
+    resps: List[StatusInfo] = []
+    for i in range(20):
+        tfproto.echo_command(f'Hello {i}', response_handler=resps.append)
+        assert resps[-1] == f'Hello {i}'
+        time.sleep(0.001)
+    payload = bytes(range(256)) * 80
+    tfproto.put_command(io.BytesIO(payload), 'py_test/keystream.bin', 0, 4096)
+    sink = io.BytesIO()
+    tfproto.get_command(sink, 'py_test/keystream.bin', 0, 4096)
+    assert sink.getvalue() == payload
+    tfproto.keystream_buffer_size = 0
+    tfproto.echo_command('Hello', response_handler=resps.append)
+    assert resps[-1] == 'Hello'
+    tfproto.del_command('py_test/keystream.bin')
+    tfproto.disconnect()
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_rekey(stand_in_server: StandInServer):
+    """Test the renewal of the session key on demand and by policy."""
+    tfproto = TfProtocol(*stand_in_server.protocol_args)
+    tfproto.metrics = Metrics()
+    tfproto.keystream_buffer_size = 1024
+    tfproto.rekey_policy = RekeyPolicy(max_bytes=4096, keylen=24)
+    tfproto.connect()
+    assert tfproto.client.rekey_policy is tfproto.rekey_policy
+    resps: List[StatusInfo] = []
+    tfproto.nigma_command(32, response_handler=resps.append)
+    assert resps[-1].status is StatusServerCode.OK
+    assert tfproto.client.session_key == resps[-1].payload
+    assert len(tfproto.client.session_key) == 32
+    with pytest.raises(TfException):
+        tfproto.nigma_command(30)
+    keys = {tfproto.client.session_key}
+    payload = bytes(range(256)) * 40
+    for i in range(3):
+        tfproto.put_command(io.BytesIO(payload), 'py_test/rekey.bin', 0, 4096)
+        sink = io.BytesIO()
+        tfproto.get_command(sink, 'py_test/rekey.bin', 0, 4096)
+        assert sink.getvalue() == payload
+        tfproto.echo_command(f'Hello {i}', response_handler=resps.append)
+        assert resps[-1] == f'Hello {i}'
+        keys.add(tfproto.client.session_key)
+    assert len(keys) > 3
+    assert all(len(key) == 24 for key in keys - {resps[0].payload})
+    snapshot = tfproto.metrics.snapshot()
+    assert snapshot['rekey']['count'] >= 3
+    # THE RENEWALS OF THE POLICY ARE NOT TIMED AS COMMANDS
+    assert snapshot['commands']['NIGMA']['count'] == 2
+    tfproto.del_command('py_test/rekey.bin')
+    tfproto.disconnect()
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_rekey_small_commands(stand_in_server: StandInServer):
+    """Test that the rekey policy also applies to the single request commands."""
+    tfproto = TfProtocol(*stand_in_server.protocol_args)
+    tfproto.metrics = Metrics()
+    tfproto.rekey_policy = RekeyPolicy(max_bytes=512)
+    tfproto.connect()
+    keys = {tfproto.client.session_key}
+    resps: List[StatusInfo] = []
+    for i in range(20):
+        tfproto.mkdir_command(f'py_test/rekey_{i}', response_handler=resps.append)
+        tfproto.rmdir_command(f'py_test/rekey_{i}', response_handler=resps.append)
+        keys.add(tfproto.client.session_key)
+    assert all(resp.status is StatusServerCode.OK for resp in resps)
+    assert len(keys) > 2
+    # A REQUESTED RENEWAL IS NOT PRECEDED BY THE DUE ONE
+    rekeys = tfproto.metrics.snapshot()['rekey']['count']
+    tfproto.client.rekey_policy.max_bytes = 1
+    tfproto.nigma_command(16, response_handler=resps.append)
+    assert resps[-1].status is StatusServerCode.OK
+    assert tfproto.metrics.snapshot()['rekey']['count'] == rekeys + 1
+    tfproto.client.rekey_policy = None
+    tfproto.disconnect()
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_transference_progress(stand_in_tfprotocol: TfProtocol):
+    """Test the progress reports of the transference commands."""
+    tfproto = stand_in_tfprotocol
+    tfproto.progress_interval = 0
+    reports: List[TransferProgress] = []
+    payload = b'Some random text' * 100
+
+    def last_report(command: str) -> TransferProgress:
+        assert reports[-1].command == command and reports[-1].finished
+        assert reports[-1].done == reports[-1].total == len(payload)
+        assert reports[-1].eta == 0 and reports[-1].fraction == 1.0
+        return reports[-1]
+
+    tfproto.put_command(
+        io.BytesIO(payload),
+        'py_test/progress.txt',
+        0,
+        512,
+        progress_handler=reports.append,
+    )
+    assert len(reports) == 5 and reports[0].done == 512 and reports[0].total == 1600
+    last_report('PUT')
+    tfproto.get_command(
+        io.BytesIO(), 'py_test/progress.txt', 0, 512, progress_handler=reports.append
+    )
+    last_report('GET')
+    tfproto.sup_command(
+        'py_test/progress.txt', io.BytesIO(payload), 5, progress_handler=reports.append
+    )
+    last_report('SUP')
+    tfproto.sdown_command(
+        'py_test/progress.txt', io.BytesIO(), 5, progress_handler=reports.append
+    )
+    last_report('SDOWN')
+    tfproto.sndfile_command(
+        True,
+        'py_test/progress.txt',
+        io.BytesIO(payload),
+        progress_handler=reports.append,
+    )
+    last_report('SNDFILE')
+    tfproto.rcvfile_command(
+        False, 'py_test/progress.txt', io.BytesIO(), progress_handler=reports.append
+    )
+    last_report('RCVFILE')
+    tfproto.intread_command(
+        'py_test/progress.txt', io.BytesIO(), progress_handler=reports.append
+    )
+    last_report('INTREAD')
+    tfproto.progress_interval = TfProtocol.progress_interval
+    tfproto.del_command('py_test/progress.txt')
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_xssqlite_commands(stand_in_xssqlite: XSSQLite):
+    """Test for the XS_SQLITE subsystem against the stand-in server."""
+    tfproto = stand_in_xssqlite
+    db_id = tfproto.open_command(':memory:')
+    assert db_id == '1'
+    tfproto.exec_command(
+        db_id,
+        '''
+        CREATE TABLE COMPANY(ID INT PRIMARY KEY NOT NULL, NAME TEXT NOT NULL);
+        INSERT INTO COMPANY (ID,NAME) VALUES (1, 'Paul');
+        INSERT INTO COMPANY (ID,NAME) VALUES (2, 'Allen');
+        ''',
+    )
+    resps: List[StatusInfo] = []
+    rows: List[list] = []
+    tfproto.exec_command(
+        db_id,
+        'SELECT * FROM COMPANY;',
+        response_handler=resps.append,
+        rows_handler=rows.append,
+    )
+    assert resps[-1].status is StatusServerCode.OK, resps[-1]
+    assert rows == [[b'ID', b'NAME'], [b'1', b'Paul'], [b'2', b'Allen']]
+    tfproto.exec_command(db_id, 'SELECT * FROM MISSING;', response_handler=resps.append)
+    assert resps[-1].status is StatusServerCode.FAILED
+    tfproto.close_command(db_id, response_handler=resps.append)
+    assert resps[-1].status is StatusServerCode.OK
+
+
+class _BrokenStream(io.BytesIO):
+    """Stream failing after the first read or write, like a vanished local file."""
+
+    def __init__(self, data: bytes = b'') -> None:
+        super().__init__(data)
+        self.calls = 0
+
+    def read(self, size: int = -1) -> bytes:
+        self.calls += 1
+        if self.calls > 1:
+            raise IOError('broken stream')
+        return super().read(size)
+
+    def write(self, data) -> int:
+        raise IOError('broken stream')
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_xssqlite_rekey(stand_in_server: StandInServer):
+    """Test that the rekey policy waits for the main command interface."""
+    tfproto = XSSQLite(*stand_in_server.protocol_args)
+    tfproto.rekey_policy = RekeyPolicy(max_bytes=200)
+    tfproto.connect()
+    tfproto.xssqlite_command()
+    assert tfproto.client.subsystem == 'XS_SQLITE'
+    key = tfproto.client.session_key
+    db_id = tfproto.open_command(':memory:')
+    tfproto.exec_command(db_id, 'CREATE TABLE t (id INTEGER, name TEXT)')
+    rows: List[list] = []
+    for i in range(5):
+        tfproto.exec_command(db_id, f"INSERT INTO t VALUES ({i}, '{'x' * 100}')")
+        tfproto.exec_command(db_id, 'SELECT id FROM t', rows_handler=rows.append)
+    # EVERY SELECT ANSWERS THE COLUMN NAMES AND THE ROWS
+    assert len(rows) == 20 and tfproto.client.session_key == key
+    # BACK AT THE MAIN COMMAND INTERFACE THE OVERDUE KEY IS RENEWED
+    tfproto.exit_command()
+    assert tfproto.client.subsystem is None
+    assert tfproto.client.rekey_if_due() and tfproto.client.session_key != key
+    tfproto.xssqlite_command()
+    rows.clear()
+    tfproto.exec_command(db_id, 'SELECT id FROM t', rows_handler=rows.append)
+    assert rows[1:] == [[str(i).encode()] for i in range(5)]
+    tfproto.terminate_command()
+    assert tfproto.client.subsystem is None
+    tfproto.disconnect()
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_xssqlite_blobs(
+    stand_in_server: StandInServer,
+    stand_in_tfprotocol: TfProtocol,
+    stand_in_xssqlite: XSSQLite,
+):
+    """Test the blob streams through the same session and through another one."""
+    tfproto = stand_in_xssqlite
+    db_id = tfproto.open_command(':memory:')
+    tfproto.exec_command(db_id, 'CREATE TABLE FILES(NAME TEXT, DATA BLOB);')
+    payload = os.urandom(20000)
+    resps: List[StatusInfo] = []
+    assert tfproto.put_blob(
+        db_id, 'FILES', 'same.bin', io.BytesIO(payload), response_handler=resps.append
+    )
+    assert resps[-1].status is StatusServerCode.OK
+    assert tfproto.put_blob(
+        db_id,
+        'FILES',
+        'other.bin',
+        io.BytesIO(payload[::-1]),
+        tmp_dir='py_test',
+        transfer_session=stand_in_tfprotocol,
+    )
+    sink = io.BytesIO()
+    assert tfproto.get_blob(db_id, 'FILES', 'same.bin', sink)
+    assert sink.getvalue() == payload
+    sink = io.BytesIO()
+    assert tfproto.get_blob(
+        db_id,
+        'FILES',
+        'other.bin',
+        sink,
+        tmp_dir='py_test',
+        transfer_session=stand_in_tfprotocol,
+    )
+    assert sink.getvalue() == payload[::-1]
+
+    # FAILURES REMOVE THE TEMPORARY FILES
+    assert not tfproto.put_blob(
+        db_id, 'MISSING', 'x.bin', io.BytesIO(payload), response_handler=resps.append
+    )
+    assert resps[-1].status is StatusServerCode.FAILED
+    assert not tfproto.put_blob(db_id, 'FILES', 'x.bin', _BrokenStream(payload))
+    assert not tfproto.get_blob(db_id, 'FILES', 'same.bin', _BrokenStream())
+    assert not tfproto.get_blob(
+        db_id,
+        'FILES',
+        'other.bin',
+        _BrokenStream(),
+        tmp_dir='py_test',
+        transfer_session=stand_in_tfprotocol,
+    )
+    assert not tfproto.get_blob(db_id, 'FILES', 'missing.bin', io.BytesIO())
+    root = stand_in_server.root
+    for directory in (root, os.path.join(root, 'py_test')):
+        assert not [name for name in os.listdir(directory) if name.startswith('.blob_')]
+    # THE SESSION IS STILL IN THE SUBSYSTEM
+    rows: List[list] = []
+    tfproto.exec_command(db_id, 'SELECT NAME FROM FILES;', rows_handler=rows.append)
+    assert rows == [[b'NAME'], [b'same.bin'], [b'other.bin']]
+    tfproto.close_command(db_id)
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_xssqlite_blob_reenter(
+    stand_in_server: StandInServer, monkeypatch: pytest.MonkeyPatch
+):
+    """Test the subsystem state when the server does not let a blob stream back in."""
+    tfproto = XSSQLite(*stand_in_server.protocol_args)
+    tfproto.connect()
+    tfproto.xssqlite_command()
+    db_id = tfproto.open_command(':memory:')
+    tfproto.exec_command(db_id, 'CREATE TABLE FILES(NAME TEXT, DATA BLOB);')
+    assert tfproto.put_blob(db_id, 'FILES', 'a.bin', io.BytesIO(b'blob'))
+
+    def cmd_xs_sqlite(*_):
+        raise StandInError(5, 'Subsystem busy.')
+
+    monkeypatch.setattr(_Session, 'cmd_xs_sqlite', cmd_xs_sqlite)
+    sink = io.BytesIO()
+    assert tfproto.get_blob(db_id, 'FILES', 'a.bin', sink)
+    assert sink.getvalue() == b'blob' and tfproto.client.subsystem is None
+    # THE SESSION IS IN STEP AT THE MAIN COMMAND INTERFACE
+    resps: List[str] = []
+    # pylint: disable=no-value-for-parameter
+    TfProtocol(tfproto).echo_command('in step', response_handler=resps.append)
+    assert resps == ['in step']
+    tfproto.disconnect()
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_xssqlite_query_cache(stand_in_xssqlite: XSSQLite):
+    """Test the query cache of exec_command against the stand-in server."""
+    tfproto = stand_in_xssqlite
+    cache = tfproto.enable_query_cache(ttl=60, max_bytes=1024)
+    db_id = tfproto.open_command(':memory:')
+    tfproto.exec_command(
+        db_id,
+        '''
+        CREATE TABLE T(ID INT, NAME TEXT);
+        INSERT INTO T VALUES (1, 'Paul');
+        ''',
+    )
+    live: List[list] = []
+    cached: List[list] = []
+    tfproto.exec_command(db_id, 'SELECT * FROM T;', rows_handler=live.append)
+    tfproto.exec_command(db_id, 'SELECT *  FROM T', rows_handler=cached.append)
+    assert cache.hits == 1 and len(cache) == 1
+    assert live == cached == [[b'ID', b'NAME'], [b'1', b'Paul']]
+    assert all(isinstance(value, bytes) for row in live for value in row)
+    # WRITES INVALIDATE THE CACHE
+    tfproto.exec_command(db_id, "INSERT INTO T VALUES (2, 'Allen');")
+    assert len(cache) == 0
+    rows: List[list] = []
+    tfproto.exec_command(db_id, 'SELECT * FROM T;', rows_handler=rows.append)
+    assert rows[-1] == [b'2', b'Allen'] and len(cache) == 1
+    # RESULTS OVER THE BUDGET ARE NOT CACHED
+    tfproto.exec_command(db_id, f"INSERT INTO T VALUES (3, '{'x' * 2000}');")
+    for _ in range(2):
+        rows.clear()
+        tfproto.exec_command(db_id, 'SELECT * FROM T;', rows_handler=rows.append)
+        assert len(rows) == 4 and len(rows[-1][1]) == 2000
+    assert cache.hits == 1 and len(cache) == 0 and cache.size == 0
+    tfproto.disable_query_cache()
+    tfproto.close_command(db_id)
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_tcp_timeout_options(stand_in_server: StandInServer):
+    """Test the connection options set before connecting."""
+    tfproto = TfProtocol(*stand_in_server.protocol_args)
+    options = TCPTimeoutOptions(connect_retry=2)
+    tfproto.tcp_timeout_options = options
+    options.connect_timeout = 5000
+    assert tfproto.tcp_timeout_options is options and options.connect_timeout == 5000
+    # THE OLD NAMES STILL WORK
+    options.set_dns_resolution_timeout = 4000
+    assert options.dns_resolution_timeout == 4000
+    tfproto.set_tcp_timeout_options = options
+    for _ in range(2):
+        resps: List[StatusInfo] = []
+        tfproto.connect(on_response=resps.append)
+        # THE WRONG VALUES ARE REPORTED TO THE CURRENT CONNECTION
+        options.connect_retry = -1
+        assert resps[-1].status is StatusServerCode.FAILED
+        assert options.connect_retry == 2
+        tfproto.disconnect()
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_multiplexed_keepalive(
+    stand_in_server: StandInServer, monkeypatch: pytest.MonkeyPatch
+):
+    """Test the shared keep alive service reporting dead sessions and failed set ups."""
+    # THE STAND-IN DOES NOT ANSWER THE UDP PROBES
+    options = KeepAliveOptions(
+        KeepAliveMechanismType.UDP_HOSTCHECK, 0.05, 1, 2, multiplexed=True
+    )
+    tfproto = TfProtocol(*stand_in_server.protocol_args)
+    dead, connected = Event(), []
+    on_dead = lambda _: dead.set()  # pylint: disable=unnecessary-lambda-assignment
+    assert tfproto.connect(options, on_connect=connected.append, on_dead=on_dead)
+    assert connected == [tfproto]
+    assert dead.wait(5)
+    assert not tfproto.client.is_connect()
+
+    def failed_keepalive(session: _Session, _: bytes):
+        raise StandInError(1, 'Keep alive not supported.')
+
+    monkeypatch.setattr(_Session, 'cmd_keepalive', failed_keepalive)
+    options.keepalive_mechanism = KeepAliveMechanismType.UDP_PROCHECK
+    tfproto = TfProtocol(*stand_in_server.protocol_args)
+    dead.clear()
+    with pytest.raises(TfException):
+        tfproto.connect(options, on_dead=on_dead)
+    assert dead.is_set() and not tfproto.client.is_connect()
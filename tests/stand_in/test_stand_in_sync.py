@@ -0,0 +1,182 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+# pylint: disable=redefined-outer-name
+
+import os
+from pathlib import Path
+
+import pytest
+from tfprotocol_client.misc.metrics import Metrics
+from tfprotocol_client.testing.stand_in_server import StandInServer, _Session
+from tfprotocol_client.tfprotocol import TfProtocol
+from tfprotocol_client.tfprotocol_sync import TfProtocolSync
+
+# pylint: disable=unused-import
+from .stand_in import stand_in_server, stand_in_tfprotocol
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_sync_put(
+    stand_in_server: StandInServer, stand_in_tfprotocol: TfProtocol, tmp_path
+):
+    """Test that the uploads are skipped when the server has the same file."""
+    sync = TfProtocolSync(stand_in_tfprotocol)
+    local = tmp_path / 'artifact.bin'
+    local.write_bytes(b'artifact v1')
+    remote = Path(stand_in_server.root, 'py_test', 'artifact.bin')
+    assert sync.sync_put(str(local), '/py_test/artifact.bin')
+    assert remote.read_bytes() == b'artifact v1'
+    assert not sync.sync_put(str(local), '/py_test/artifact.bin')
+    # SAME SIZE, DIFFERENT CONTENT
+    local.write_bytes(b'artifact v2')
+    assert sync.sync_put(str(local), '/py_test/artifact.bin')
+    assert remote.read_bytes() == b'artifact v2'
+    assert sync.remote_sha256('/py_test/missing.bin') is None
+    stand_in_tfprotocol.del_command('/py_test/artifact.bin')
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_sync_dir(
+    stand_in_server: StandInServer, stand_in_tfprotocol: TfProtocol, tmp_path
+):
+    """Test the plan and the execution of a directory synchronization."""
+    sync = TfProtocolSync(
+        stand_in_tfprotocol,
+        session_factory=lambda: TfProtocol(*stand_in_server.protocol_args),
+        workers=2,
+    )
+    local = tmp_path / 'tree'
+    (local / 'docs' / 'old').mkdir(parents=True)
+    (local / 'a.txt').write_bytes(b'alpha')
+    (local / 'docs' / 'b.txt').write_bytes(b'bravo bravo')
+    (local / 'docs' / 'old' / 'c.txt').write_bytes(b'charlie')
+    remote = Path(stand_in_server.root, 'py_test', 'tree')
+
+    report = sync.sync_dir(str(local), '/py_test/tree', dry_run=True)
+    assert report.dry_run and report.ok and not remote.exists()
+    assert [str(action) for action in report.plan] == [
+        'MKDIR .',
+        'MKDIR docs/',
+        'MKDIR docs/old/',
+        'PUT a.txt (5 bytes)',
+        'PUT docs/b.txt (11 bytes)',
+        'PUT docs/old/c.txt (7 bytes)',
+    ]
+
+    report = sync.sync_dir(str(local), '/py_test/tree')
+    assert report.ok and len(report.done) == 6 and report.transferred == 23
+    assert (remote / 'docs' / 'old' / 'c.txt').read_bytes() == b'charlie'
+    assert not [name for name in remote.iterdir() if name.name.startswith('.tfsync-')]
+
+    report = sync.sync_dir(str(local), '/py_test/tree', checksum=True)
+    assert report.ok and not report.plan.actions and report.plan.skipped == 3
+
+    # A DRY RUN STATS THE FILES ONE BY ONE INSTEAD OF UPLOADING A LIST
+    (local / 'a.txt').write_bytes(b'alpha v1')
+    stand_in_tfprotocol.metrics = Metrics()
+    report = sync.sync_dir(str(local), '/py_test/tree', dry_run=True)
+    commands = stand_in_tfprotocol.metrics.snapshot()['commands']
+    stand_in_tfprotocol.metrics = None
+    assert [str(action) for action in report.plan] == ['PUT a.txt (8 bytes)']
+    assert commands['FSTAT']['count'] == 3 and 'PUT' not in commands
+
+    # A CHANGE, A RENAME AND A REMOVED DIRECTORY
+    (local / 'a.txt').write_bytes(b'alpha v2')
+    (local / 'docs' / 'old' / 'c.txt').rename(local / 'docs' / 'c.txt')
+    (local / 'docs' / 'old').rmdir()
+    report = sync.sync_dir(str(local), '/py_test/tree', delete=True)
+    assert report.ok
+    assert [str(action) for action in report.plan] == [
+        'RENAM docs/old/c.txt -> docs/c.txt',
+        'PUT a.txt (8 bytes)',
+        'RMDIR docs/old/',
+    ]
+    assert report.transferred == 8 and report.plan.skipped == 1
+    assert (remote / 'a.txt').read_bytes() == b'alpha v2'
+    assert (remote / 'docs' / 'c.txt').read_bytes() == b'charlie'
+    assert not (remote / 'docs' / 'old').exists()
+    stand_in_tfprotocol.rmdir_command('/py_test/tree')
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_sync_short_fstatls(
+    stand_in_tfprotocol: TfProtocol, tmp_path, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that the files missing in a short FSTATLS answer are stated one by one."""
+    sync = TfProtocolSync(stand_in_tfprotocol)
+    local = tmp_path / 'short'
+    local.mkdir()
+    for name in ('a.txt', 'b.txt', 'c.txt'):
+        (local / name).write_bytes(name.encode())
+    assert sync.sync_dir(str(local), '/py_test/short').ok
+    fstatls = _Session.cmd_fstatls
+
+    def cmd_fstatls(self: _Session, args: bytes):
+        # ONLY THE FIRST ENTRY AND THE TERMINATOR
+        sent = []
+        self.send_raw = sent.append
+        try:
+            fstatls(self, args)
+        finally:
+            del self.send_raw
+        for data in sent[:1] + sent[-1:]:
+            self.send_raw(data)
+
+    monkeypatch.setattr(_Session, 'cmd_fstatls', cmd_fstatls)
+    stand_in_tfprotocol.metrics = Metrics()
+    plan = sync.plan_put_dir(str(local), '/py_test/short')
+    commands = stand_in_tfprotocol.metrics.snapshot()['commands']
+    stand_in_tfprotocol.metrics = None
+    monkeypatch.undo()
+    assert not plan.actions and plan.skipped == 3
+    assert commands['FSTATLS']['count'] == 1 and commands['FSTAT']['count'] == 2
+    stand_in_tfprotocol.rmdir_command('/py_test/short')
+
+
+@pytest.mark.run(order=8)
+def test_stand_in_mirror_down(
+    stand_in_server: StandInServer, stand_in_tfprotocol: TfProtocol, tmp_path
+):
+    """Test the incremental download of a server directory."""
+    sync = TfProtocolSync(
+        stand_in_tfprotocol,
+        session_factory=lambda: TfProtocol(*stand_in_server.protocol_args),
+        workers=2,
+    )
+    remote = Path(stand_in_server.root, 'py_test', 'mirror')
+    (remote / 'docs').mkdir(parents=True)
+    (remote / 'a.txt').write_bytes(b'alpha')
+    (remote / 'docs' / 'b.txt').write_bytes(b'bravo bravo')
+    os.utime(remote / 'a.txt', (1_600_000_000, 1_600_000_000))
+    local = tmp_path / 'mirror'
+
+    report = sync.mirror_down('/py_test/mirror', str(local))
+    assert report.ok and report.transferred == 16
+    assert [str(action) for action in report.plan] == [
+        'MKDIR .',
+        'MKDIR docs/',
+        'GET a.txt (5 bytes)',
+        'GET docs/b.txt (11 bytes)',
+    ]
+    assert (local / 'docs' / 'b.txt').read_bytes() == b'bravo bravo'
+    assert os.stat(local / 'a.txt').st_mtime == 1_600_000_000
+
+    report = sync.mirror_down('/py_test/mirror', str(local))
+    assert report.ok and not report.plan.actions and report.plan.skipped == 2
+
+    # AN INTERRUPTED DOWNLOAD AND A REMOVED FILE
+    (remote / 'a.txt').write_bytes(b'alpha v2')
+    os.utime(remote / 'a.txt', (1_700_000_000, 1_700_000_000))
+    (local / 'a.txt.1700000000.tfpart').write_bytes(b'alp')
+    (remote / 'docs' / 'b.txt').unlink()
+    report = sync.mirror_down('/py_test/mirror', str(local), delete=True)
+    assert report.ok and report.transferred == 5
+    assert [str(action) for action in report.plan] == [
+        'GET a.txt (5 bytes)',
+        'DEL docs/b.txt',
+    ]
+    assert (local / 'a.txt').read_bytes() == b'alpha v2'
+    assert not (local / 'docs' / 'b.txt').exists()
+    assert not list(local.glob('*.tfpart'))
+    stand_in_tfprotocol.rmdir_command('/py_test/mirror')
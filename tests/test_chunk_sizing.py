@@ -0,0 +1,55 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import pytest
+from tfprotocol_client.misc.chunk_sizing import AdaptiveChunkSize, requested_size
+
+
+@pytest.mark.run(order=8)
+def test_adaptive_chunk_size():
+    """Test the hill climbing of the chunk size over the measured throughput"""
+    sizer = AdaptiveChunkSize(initial=8, minimum=4, maximum=64, window=1.0)
+    assert requested_size(sizer) == 8 and requested_size(512) == 512
+    # FIRST WINDOW: MEASURED AND GROWN
+    sizer.record(8, 100, 1.0)
+    assert sizer.size == 16
+    # DISCARDED: MEASURED WITH AN OLD SIZE
+    sizer.record(8, 1000, 1.0)
+    assert sizer.size == 16 and sizer.throughput == 100
+    # BETTER: KEEPS GROWING
+    sizer.record(16, 200, 0.5)
+    sizer.record(16, 200, 0.5)
+    assert sizer.size == 32
+    # WORSE: BACK
+    sizer.record(32, 100, 1.0)
+    assert sizer.size == 16
+    # NOISE: HOLDS
+    sizer.record(16, 105, 1.0)
+    assert sizer.size == 16
+    # CAPPED BY THE SERVER GRANT OF THE CURRENT TRANSFERENCE
+    sizer = AdaptiveChunkSize(initial=8, minimum=4, maximum=64, window=1.0)
+    assert sizer.propose(granted=12) == 8
+    sizer.record(8, 100, 1.0, granted=12)
+    assert sizer.size == 12
+    assert sizer.propose() == 12
+    sizer.record(12, 200, 1.0)
+    assert sizer.size == 24
+
+
+@pytest.mark.run(order=8)
+def test_adaptive_chunk_size_shared():
+    """Test that the transferences sharing a sizer keep their own grants"""
+    sizer = AdaptiveChunkSize(initial=16, minimum=4, maximum=64, window=1.0)
+    small, big = sizer.timer(granted=8), sizer.timer(granted=64)
+    assert small.propose() == 8 and big.propose() == 16
+    # A NEW TRANSFERENCE DOES NOT LIFT THE CAP OF A RUNNING ONE
+    assert requested_size(sizer) == 16 and small.propose() == 8
+    # THE CAPPED MEASUREMENTS DO NOT SHRINK THE SHARED SIZE
+    sizer.record(8, 100, 1.0, granted=8)
+    assert sizer.size == 16 and not sizer.throughput
+    # THE UNCAPPED ONE KEEPS LEARNING BEYOND THE OTHER GRANT
+    sizer.record(16, 100, 1.0, granted=64)
+    assert sizer.size == 32 and small.propose() == 8 and big.propose() == 32
+    copy = sizer.copy()
+    copy.record(32, 400, 1.0)
+    assert copy.size == 64 and sizer.size == 32
@@ -0,0 +1,69 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import io
+import zlib
+
+import pytest
+from tfprotocol_client.misc.compression import (
+    CompressingReader,
+    DecompressingWriter,
+    GzipCodec,
+    ZlibCodec,
+    compression_header,
+)
+from tfprotocol_client.models.exceptions import TfException
+
+DATA = b''.join(b'%d,name %d,2022-01-01\n' % (i, i) for i in range(5000))
+
+
+@pytest.mark.run(order=8)
+def test_compressing_reader_roundtrip():
+    """Test that the compressed object decompresses back in small chunks"""
+    for codec in (ZlibCodec(1), GzipCodec(9)):
+        reader = CompressingReader(io.BytesIO(DATA), codec, chunk_size=1000)
+        obj = b''
+        while True:
+            chunk = reader.read(100)
+            if not chunk:
+                break
+            obj += chunk
+        assert obj.startswith(compression_header(codec))
+        assert len(obj) * 4 < len(DATA) and reader.tell() == len(obj)
+        sink = io.BytesIO()
+        writer = DecompressingWriter(sink)
+        for i in range(0, len(obj), 7):
+            writer.write(memoryview(obj)[i : i + 7])
+        assert writer.finish() and sink.getvalue() == DATA
+
+
+@pytest.mark.run(order=8)
+def test_compressing_reader_seek():
+    """Test that the compressed object can be resumed from an offset"""
+    codec = ZlibCodec()
+    obj = CompressingReader(io.BytesIO(DATA), codec).read()
+    reader = CompressingReader(io.BytesIO(DATA), codec, chunk_size=512)
+    reader.read(1000)
+    assert reader.seek(len(obj) // 2) == len(obj) // 2
+    assert reader.read() == obj[len(obj) // 2 :]
+    reader.seek(10)
+    view = memoryview(bytearray(20))
+    assert reader.readinto(view) == 20 and view == obj[10:30]
+    with pytest.raises(io.UnsupportedOperation):
+        reader.seek(0, io.SEEK_END)
+
+
+@pytest.mark.run(order=8)
+def test_decompressing_writer_errors():
+    """Test the incomplete, corrupted and not compressed objects"""
+    obj = CompressingReader(io.BytesIO(DATA), ZlibCodec()).read()
+    writer = DecompressingWriter(io.BytesIO())
+    writer.write(obj[: len(obj) // 2])
+    assert not writer.finish() and not writer.complete
+    with pytest.raises(TfException):
+        DecompressingWriter(io.BytesIO()).write(b'not compressed data')
+    header = compression_header(ZlibCodec())
+    with pytest.raises(TfException):
+        DecompressingWriter(io.BytesIO()).write(header + b'\x00' * 10)
+    with pytest.raises(TfException):
+        DecompressingWriter(io.BytesIO()).write(b'TFZ\x01\x03lz4' + zlib.compress(DATA))
@@ -0,0 +1,76 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import os
+import time
+
+import pytest
+from tfprotocol_client.security.cryptography import Xor
+from tfprotocol_client.security.keystream import KeystreamBuffer, KeystreamPipeline
+
+KEY = bytes(range(1, 33))
+
+
+@pytest.mark.run(order=2)
+def test_xor():
+    """Test the Xor cipher against known ciphertexts and the keystream application"""
+    xor = Xor(KEY)
+    assert xor.encrypt(b'esto es probando' * 3) == bytes.fromhex(
+        '6cc718fb9be7c22e3fbe69a039abe8d11d876c0b9c607eeda1662e272b591a74'
+        '9ac46f12ef4c8d656e843469de7c1828'
+    )
+    assert xor.encrypt(b'esto es probando') == bytes.fromhex(
+        'f49a78d4ed0c7deb41366b75d03b70a7'
+    )
+    assert xor.position == 64
+    key = os.urandom(64)
+    sender, receiver = Xor(key), Xor(key)
+    for size in (0, 1, 8, 63, 64, 65, 1000):
+        payload = os.urandom(size)
+        clone = sender.copy()
+        encrypted = sender.encrypt(payload)
+        assert Xor.apply_encrypt(payload, *clone.keystream(size)) == encrypted
+        assert receiver.decrypt(encrypted) == payload
+    # EVERY CIPHER KEEPS THE KEY IT WAS CREATED WITH
+    assert Xor(KEY).encrypt(b'esto es probando')[:4] == bytes.fromhex('6cc718fb')
+
+
+@pytest.mark.run(order=2)
+def test_keystream_pipeline():
+    """Test the keystreams computed ahead follow the cipher until the sizes change"""
+    cipher, reference = Xor(KEY), Xor(KEY)
+    pipeline = KeystreamPipeline(cipher, (8, 100), depth=2)
+    for _ in range(5):
+        for size in (8, 100):
+            payload = os.urandom(size)
+            keystream = pipeline.take(cipher, size)
+            assert Xor.apply_encrypt(payload, *keystream) == reference.encrypt(payload)
+    assert pipeline.take(cipher, 50) is None and not pipeline.running
+    assert cipher.encrypt(b'payload') == reference.encrypt(b'payload')
+    # A CIPHER USED APART STOPS THE PIPELINE
+    pipeline = KeystreamPipeline(cipher, (8,), depth=2)
+    assert cipher.encrypt(b'payload') == reference.encrypt(b'payload')
+    assert pipeline.take(cipher, 8) is None
+    pipeline = KeystreamPipeline(cipher, (8,), depth=2)
+    assert pipeline.take(Xor(KEY), 8) is None
+
+
+@pytest.mark.run(order=2)
+def test_keystream_buffer():
+    """Test the keystream computed ahead for payloads of any size"""
+    cipher, reference = Xor(KEY), Xor(KEY)
+    buffer = KeystreamBuffer(cipher, capacity=1000)
+    for size in (8, 0, 1, 31, 32, 33, 100, 2000, 8, 500, 64):
+        time.sleep(0.001)
+        payload = os.urandom(size)
+        keystream = buffer.keystream(size)
+        assert Xor.apply_encrypt(payload, *keystream) == reference.encrypt(payload)
+    # A CIPHER USED APART IS FOLLOWED FROM WHERE IT IS
+    assert cipher.encrypt(b'payload') == reference.encrypt(b'payload')
+    assert Xor.apply_encrypt(b'payload', *buffer.keystream(7)) == reference.encrypt(
+        b'payload'
+    )
+    assert cipher.position == reference.position and cipher.get_seed() == (
+        reference.get_seed()
+    )
+    buffer.close()
@@ -0,0 +1,89 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import socket
+from time import monotonic
+
+import pytest
+from tfprotocol_client.connection.client import SocketClient
+from tfprotocol_client.connection.happy_eyeballs import (
+    interleave_families,
+    race_connect,
+    resolve_addresses,
+)
+from tfprotocol_client.models.status_server_code import StatusServerCode
+
+V4, V6, TCP = socket.AF_INET, socket.AF_INET6, socket.SOCK_STREAM
+
+
+def _info(family: int, host: str, port: int = 1234):
+    sockaddr = (host, port) if family == V4 else (host, port, 0, 0)
+    return (family, TCP, 6, '', sockaddr)
+
+
+def _closed_port() -> int:
+    with socket.socket(V4, TCP) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.run(order=8)
+def test_interleave_families():
+    """Test the order of the connection attempts"""
+    infos = [
+        _info(V6, '::1'),
+        _info(V6, '::2'),
+        _info(V6, '::1'),
+        _info(V6, '::3'),
+        _info(V4, '10.0.0.1'),
+        _info(V4, '10.0.0.2'),
+    ]
+    ordered = [info[4][0] for info in interleave_families(infos)]
+    assert ordered == ['::1', '10.0.0.1', '::2', '10.0.0.2', '::3']
+    assert not interleave_families([])
+    assert resolve_addresses('127.0.0.1', 80, 5)[0][4] == ('127.0.0.1', 80)
+
+
+@pytest.mark.run(order=8)
+def test_race_connect():
+    """Test that the first address to answer wins and failures move on at once"""
+    with socket.socket(V4, TCP) as server:
+        server.bind(('127.0.0.1', 0))
+        server.listen(4)
+        port = server.getsockname()[1]
+        # A REFUSED ADDRESS DOES NOT WAIT FOR THE ATTEMPT DELAY
+        infos = [_info(V4, '127.0.0.1', _closed_port()), _info(V4, '127.0.0.1', port)]
+        start = monotonic()
+        sock = race_connect(infos, timeout=5, attempt_delay=3)
+        assert monotonic() - start < 2
+        assert sock.getpeername() == ('127.0.0.1', port)
+        assert sock.gettimeout() is None
+        sock.close()
+        with pytest.raises(OSError):
+            race_connect(infos[:1], timeout=5, attempt_delay=0.1)
+        with pytest.raises(OSError):
+            race_connect([], timeout=5, attempt_delay=0.1)
+
+        client = SocketClient('localhost', port)
+        status = client.start_connection(5, 5)
+        assert status.status is StatusServerCode.OK
+        assert client.is_connect()
+        client.stop_connection()
+        client = SocketClient('127.0.0.1', _closed_port())
+        status = client.start_connection(5, 5, 0.05)
+        assert status.status is StatusServerCode.DISCONNECTED
+
+
+@pytest.mark.run(order=8)
+def test_unresolved_host(monkeypatch: pytest.MonkeyPatch):
+    """Test that a host without addresses is reported as not found"""
+
+    def getaddrinfo(*_, **__):
+        raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+
+    monkeypatch.setattr(socket, 'getaddrinfo', getaddrinfo)
+    with pytest.raises(socket.gaierror):
+        resolve_addresses('nowhere.invalid', 1234, 5)
+    status = SocketClient('nowhere.invalid', 1234).start_connection(5, 5)
+    assert status.status is StatusServerCode.DISCONNECTED
+    assert 'not found' in status.message
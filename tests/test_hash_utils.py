@@ -1,8 +1,11 @@
 # coded by lagcleaner
 # email: lagcleaner@gmail.com
 
+from io import BytesIO
+from threading import Event
+
 import pytest
-from tfprotocol_client.security.hash_utils import sha256_for
+from tfprotocol_client.security.hash_utils import sha256_for, sha256_stream
 
 
 @pytest.mark.run(order=2)
@@ -13,3 +16,9 @@ def test_hash():
         == b'\xbdB\xa31\x11\x94\x1bP\xbf\xc8r\xa4\xb7\xf7\x1f\xbee\xca\xf35\xcaj\xbd\x0c\xe0e\xf6\x83X\x87\xb3\x0f'
     )
     assert sha256_for('esto es probando') == sha256_for(b'esto es probando')
+    assert sha256_stream(BytesIO(b'esto es probando'), chunk_size=3) == sha256_for(
+        'esto es probando'
+    )
+    cancel = Event()
+    cancel.set()
+    assert sha256_stream(BytesIO(b'esto es probando'), cancel=cancel) is None
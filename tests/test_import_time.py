@@ -0,0 +1,37 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+# MODULES ONLY NEEDED ON CONNECTION, WITH PROXIES, KEEP ALIVE OR EXTENSIONS
+LAZY_MODULES = (
+    'Crypto',
+    'multiprocessing',
+    'tfprotocol_client.connection.socks_prox',
+    'tfprotocol_client.connection.keep_alive_thread',
+    'tfprotocol_client.connection.keep_alive_service',
+    'tfprotocol_client.extensions',
+)
+
+
+@pytest.mark.run(order=8)
+def test_import_is_lazy():
+    """Test that importing the protocol does not load the optional modules"""
+    code = (
+        'import json, sys\n'
+        'import tfprotocol_client.tfprotocol\n'
+        'print(json.dumps(list(sys.modules)))\n'
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, check=True, text=True
+    ).stdout
+    loaded = [
+        module
+        for module in json.loads(output)
+        if module.startswith(LAZY_MODULES)
+    ]
+    assert not loaded
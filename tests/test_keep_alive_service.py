@@ -0,0 +1,95 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import socket
+from threading import Event, Thread
+from time import sleep
+
+import pytest
+from tfprotocol_client.connection.keep_alive_service import KeepAliveService
+from tfprotocol_client.misc.timer_wheel import TimerWheel
+from tfprotocol_client.models.keepalive_options import (
+    KeepAliveMechanismType,
+    KeepAliveOptions,
+)
+
+
+class _Client:
+    """Stands for a connected `ProtocolClient` probed through UDP."""
+
+    def __init__(self, port):
+        self.address = '127.0.0.1'
+        self.port = port
+        self.connected = True
+
+    def is_connect(self):
+        return self.connected
+
+    def stop_connection(self):
+        self.connected = False
+
+
+def _udp_responder(answers: int):
+    """UDP server answering `1` to the first `answers` probes, then keeping silent."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.settimeout(2)
+
+    def serve():
+        for _ in range(answers):
+            try:
+                _, addr = sock.recvfrom(64)
+            except IOError:
+                return
+            sock.sendto(bytes((1,)), addr)
+
+    Thread(target=serve, daemon=True).start()
+    return sock
+
+
+@pytest.mark.run(order=8)
+def test_timer_wheel():
+    """Test timer expiration across wheel turns"""
+    wheel = TimerWheel(tick=1, size=4, start=0)
+    wheel.schedule(1, 'a')
+    wheel.schedule(2.5, 'b')
+    wheel.schedule(9, 'c')
+    assert len(wheel) == 3
+    assert wheel.next_timeout(0.5) == 0.5
+    assert not wheel.advance(0.9)
+    assert wheel.advance(1) == ['a']
+    assert wheel.advance(3) == ['b']
+    assert not wheel.advance(8)
+    assert wheel.advance(9.5) == ['c']
+    assert len(wheel) == 0 and wheel.next_timeout(10) is None
+
+
+@pytest.mark.run(order=8)
+def test_keep_alive_service_dead_sessions():
+    """Test that unanswered sessions are closed and reported while alive ones remain"""
+    alive_srv, dead_srv = _udp_responder(1000), _udp_responder(2)
+    service = KeepAliveService(tick=0.01)
+    service.start()
+    options = KeepAliveOptions(KeepAliveMechanismType.UDP_HOSTCHECK, 0.03, 1, 3)
+    alive, dead = _Client(alive_srv.getsockname()[1]), _Client(dead_srv.getsockname()[1])
+    reported, wrongly_reported = Event(), []
+    service.register(alive, options, on_dead=wrongly_reported.append)
+    service.register(dead, options, on_dead=lambda c: reported.set())
+    assert len(service) == 2
+    assert reported.wait(2)
+    assert not dead.is_connect() and alive.is_connect() and not wrongly_reported
+    assert len(service) == 1
+    service.unregister(alive)
+    sleep(0.05)
+    assert len(service) == 0
+    service.stop()
+    service.join(1)
+    assert not service.is_alive() and not service.is_active
+    alive_srv.close()
+    dead_srv.close()
+    # A STOP BEFORE THE THREAD RUNS IS NOT LOST
+    service = KeepAliveService(tick=0.01)
+    service.stop()
+    service.start()
+    service.join(1)
+    assert not service.is_alive()
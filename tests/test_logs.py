@@ -0,0 +1,33 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import logging
+
+import pytest
+from tfprotocol_client.connection.client import SocketClient
+from tfprotocol_client.misc.logs import LOGGER_NAME, disable_tracing, enable_tracing
+
+
+def _handlers() -> int:
+    return len(logging.getLogger(LOGGER_NAME).handlers)
+
+
+@pytest.mark.run(order=8)
+def test_logs_verbosity_mode():
+    """Test that the tracing of the verbose clients lasts while any of them is open"""
+    base = _handlers()
+    first = SocketClient(verbosity_mode=True)
+    second = SocketClient(verbosity_mode=True)
+    assert _handlers() == base + 1
+    first.stop_connection()
+    first.stop_connection()
+    assert _handlers() == base + 1
+    second.stop_connection()
+    assert _handlers() == base
+    # THE TRACING ENABLED BY THE USER IS KEPT
+    enable_tracing()
+    client = SocketClient(verbosity_mode=True)
+    client.stop_connection()
+    assert _handlers() == base + 1
+    disable_tracing()
+    assert _handlers() == base
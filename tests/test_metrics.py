@@ -0,0 +1,60 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import socket
+
+import pytest
+from tfprotocol_client.connection.protocol_client import ProtocolClient
+from tfprotocol_client.misc.metrics import Metrics
+from tfprotocol_client.models.status_server_code import StatusServerCode
+
+
+@pytest.mark.run(order=8)
+def test_metrics_commands_and_export():
+    """Test command timing, nesting, errors and the exported formats"""
+    metrics = Metrics(buckets=(0.5, 1.0))
+    assert Metrics.verb_of(b'MKDIR test/dir') == 'MKDIR'
+    assert Metrics.verb_of(b'EXEC') == 'EXEC'
+    assert Metrics.verb_of(b'\x00\x01binary') == 'OTHER'
+    assert Metrics.verb_of(b'0.11') == 'OTHER'
+    with metrics.command('PUT'):
+        assert metrics.in_command
+        with metrics.command('OTHER'):
+            pass
+    with pytest.raises(IOError):
+        with metrics.command('GET'):
+            raise IOError()
+    metrics.add_sent(10)
+    metrics.observe_handshake(0.7)
+    metrics.observe_rekey(0.2)
+    snapshot = metrics.snapshot()
+    assert list(snapshot['commands']) == ['GET', 'PUT']
+    assert snapshot['commands']['PUT']['buckets'] == {'0.5': 1, '1.0': 1, '+Inf': 1}
+    assert snapshot['errors'] == {'GET': 1}
+    assert snapshot['handshake']['buckets'] == {'0.5': 0, '1.0': 1, '+Inf': 1}
+    assert snapshot['rekey']['count'] == 1
+    text = metrics.to_prometheus()
+    assert 'tfprotocol_command_duration_seconds_count{verb="PUT"} 1' in text
+    assert 'tfprotocol_command_errors_total{verb="GET"} 1' in text
+    assert 'tfprotocol_handshake_duration_seconds_bucket{le="+Inf"} 1' in text
+    assert 'tfprotocol_rekey_duration_seconds_bucket{le="0.5"} 1' in text
+    assert 'tfprotocol_sent_bytes_total 10' in text
+
+
+@pytest.mark.run(order=8)
+def test_metrics_protocol_client_hook():
+    """Test that requests through the protocol client are recorded"""
+    local, remote = socket.socketpair()
+    client = ProtocolClient()
+    # pylint: disable=protected-access
+    client._socket, client._is_connect = local, True
+    client.metrics = Metrics()
+    remote.sendall((2).to_bytes(4, 'big') + b'OK')
+    status = client.translate('MKDIR test')
+    assert status.status is StatusServerCode.OK
+    snapshot = client.metrics.snapshot()
+    assert snapshot['commands']['MKDIR']['count'] == 1
+    assert snapshot['bytes_sent'] == 4 + len(b'MKDIR test')
+    assert snapshot['bytes_received'] == 6
+    client.stop_connection()
+    remote.close()
@@ -3,6 +3,7 @@
 
 import pytest
 from tfprotocol_client.misc.parse_utils import (
+    find_status_b,
     isnumber,
     separate_status,
     separate_status_b,
@@ -45,3 +46,24 @@ def test_parse_utils():
     assert tryparse_int(b'123d', dflt_value=2) == 2
     assert tryparse_int(bytearray(b'123')) == 123
     assert not isnumber(b'123s')
+
+
+@pytest.mark.run(order=7)
+def test_parse_utils_bytes_edge_cases():
+    """Test for the bytes parsers with unusual responses"""
+    assert separate_status_b(b' OK') == (None, b' OK')
+    assert separate_status_b(b'ok \t message ') == (StatusServerCode.OK, b'message ')
+    assert separate_status_b(bytearray(b'CONT')) == (StatusServerCode.CONT, b'')
+    assert separate_status_b(b'') == (None, b'')
+
+    assert separate_status_codenumber_b(b'  12.5 rest') == (b'12.5', b'rest')
+    assert separate_status_codenumber_b(b'-3 rest') == (b'', b'-3 rest')
+    assert separate_status_codenumber_b(b'5  ') == (b'', b'5')
+    assert separate_status_codenumber_b(b'code 5  ') == (b'', b'code 5')
+    assert separate_status_codenumber_b(b'code 5 x ') == (b'', b'code 5 x ')
+    assert separate_status_codenumber_b(b'  ') == (b'', b'')
+
+    assert find_status_b(b'OK DB OPENED') == (StatusServerCode.OK, True)
+    assert find_status_b(b'DB OPENED OK') == (StatusServerCode.OK, False)
+    assert find_status_b(b'FA OK CONT') == (StatusServerCode.CONT, False)
+    assert find_status_b(b'nothing') == (StatusServerCode.UNKNOWN, False)
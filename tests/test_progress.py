@@ -0,0 +1,27 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import io
+
+import pytest
+from tfprotocol_client.misc.progress import ProgressTracker, stream_left
+from tfprotocol_client.models.transfer_progress import TransferProgress
+
+
+@pytest.mark.run(order=8)
+def test_progress_tracker_reports():
+    """Test the throttling of the progress reports and the estimations"""
+    reports = []
+    tracker = ProgressTracker('GET', 'file', reports.append, total=100, interval=60)
+    tracker.update(10)
+    tracker.update(10)
+    assert not reports
+    tracker.finish()
+    assert len(reports) == 1 and reports[0].done == 20 and reports[0].finished
+    assert reports[0].average_rate == reports[0].rate > 0
+    progress = TransferProgress('GET', 'file', 25, 100, 1.0, 30.0, 25.0)
+    assert progress.eta == 3.0 and progress.fraction == 0.25
+    assert TransferProgress('SDOWN', 'file', 5).eta is None
+    stream = io.BytesIO(b'0123456789')
+    stream.seek(4)
+    assert stream_left(stream) == 6 and stream.tell() == 4
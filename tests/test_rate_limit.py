@@ -0,0 +1,82 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+# pylint: disable=protected-access
+
+from threading import Event, Thread
+from time import monotonic, sleep
+
+import pytest
+from tfprotocol_client.misc import rate_limit
+from tfprotocol_client.misc.rate_limit import RateLimiter, Throttle
+
+
+@pytest.mark.run(order=8)
+def test_rate_limiter_rate_and_parent():
+    """Test that the flows go at the rate of the slowest limiter they go through"""
+    parent = RateLimiter(100_000, burst=1_000)
+    limiter = RateLimiter(1_000_000, burst=1_000, parent=parent)
+    throttle = Throttle(None, limiter)
+    assert throttle and not Throttle(None, None)
+    start = monotonic()
+    for _ in range(21):
+        throttle.consume(1_000)
+    # THE BURST GOES AT ONCE, THE REST AT THE PARENT RATE
+    assert 0.18 <= monotonic() - start < 1.0
+
+
+@pytest.mark.run(order=8)
+def test_rate_limiter_weighted_sharing(monkeypatch):
+    """Test that the bandwidth is shared in proportion to the weights of the flows"""
+    # THE CLOCK ONLY MOVES WHEN THE TEST GIVES THE TOKENS OF ONE CHUNK
+    clock = [0.0]
+    monkeypatch.setattr(rate_limit, 'monotonic', lambda: clock[0])
+    limiter = RateLimiter(1_000, burst=1_000)
+    limiter.flow().consume(1_000)
+    done = Event()
+    served = []
+
+    def transfer(weight: int):
+        flow = limiter.flow(weight)
+        while not done.is_set():
+            flow.consume(1_000)
+            served.append(weight)
+
+    def wait_for(predicate):
+        deadline = monotonic() + 5
+        while not predicate() and monotonic() < deadline:
+            sleep(0.001)
+        assert predicate()
+
+    threads = [
+        Thread(target=transfer, args=(weight,), daemon=True) for weight in (1, 3)
+    ]
+    for thread in threads:
+        thread.start()
+    for i in range(13):
+        queued = 2 if i < 12 else 1
+        wait_for(lambda i=i, q=queued: len(served) == i and len(limiter._waiting) == q)
+        if i == 11:
+            # THE FLOW SERVED NEXT STOPS, THE OTHER ONE GETS A LAST CHUNK
+            done.set()
+        with limiter._cond:
+            clock[0] += 1.0
+            limiter._cond.notify_all()
+    assert served[:12].count(3) == 9 and served[:12].count(1) == 3
+    for thread in threads:
+        thread.join()
+
+
+@pytest.mark.run(order=8)
+def test_rate_limiter_failed_wait(monkeypatch):
+    """Test that a wait ended by an exception leaves the queue"""
+    limiter = RateLimiter(1_000, burst=1_000)
+    limiter.flow().consume(1_000)
+
+    def interrupted(*_):
+        raise KeyboardInterrupt()
+
+    monkeypatch.setattr(limiter._cond, 'wait', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        limiter.flow().consume(1_000)
+    assert not limiter._waiting
@@ -0,0 +1,21 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import pytest
+from tfprotocol_client.models.rekey_policy import RekeyPolicy
+
+
+@pytest.mark.run(order=8)
+def test_rekey_policy_due():
+    """Test the renewal of the key by usage, age and idleness"""
+    assert not RekeyPolicy().due(10**12, 10**6, 10**6)
+    policy = RekeyPolicy(max_bytes=1000, max_seconds=60, early=0.5, idle_seconds=2)
+    assert policy.usage(500, 0) == 0.5
+    assert policy.usage(100, 45) == 0.75
+    assert not policy.due(400, 10, 10)
+    assert policy.due(1000, 0, 0)
+    assert policy.due(0, 60, 0)
+    # PAST THE EARLY FRACTION ONLY AN IDLE SESSION RENEWS ITS KEY
+    assert not policy.due(600, 0, 1)
+    assert policy.due(600, 0, 2)
+    assert policy.due(0, 30, 5)
@@ -77,3 +77,18 @@ def test_status_info_parse():
     assert status.message == 'A lot of info whitout header or status'
     assert status.code == 38
     assert status.payload == b'A payload'
+
+
+@pytest.mark.run(order=6)
+def test_status_info_lazy_message():
+    """Test for the message decoded on demand and the payload view"""
+    payload = b'x' * 2000
+    status = StatusInfo.build_status(len(payload), payload)
+    # pylint: disable=protected-access
+    assert status._message is None
+    assert status.payload_view[:4] == b'xxxx'
+    assert status.payload_view.readonly
+    assert status.message == 'x' * 1024 + '...'
+    status.message = 'replaced'
+    assert status.message == 'replaced'
+    assert StatusInfo(StatusServerCode.OK, payload=b'data').message == ''
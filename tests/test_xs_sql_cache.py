@@ -0,0 +1,49 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+from time import sleep
+
+import pytest
+from tfprotocol_client.extensions.xs_sql_cache import XSQueryCache
+from tfprotocol_client.models.status_info import StatusInfo
+from tfprotocol_client.models.status_server_code import StatusServerCode
+
+
+@pytest.mark.run(order=8)
+def test_query_cache_sql_analysis():
+    """Test for SQL normalization and read only detection"""
+    assert (
+        XSQueryCache.normalize_sql("  SELECT *\n  FROM T\tWHERE N = 'a  b' ; ")
+        == "SELECT * FROM T WHERE N = 'a  b'"
+    )
+    assert XSQueryCache.is_read_only('SELECT * FROM COMPANY;')
+    assert XSQueryCache.is_read_only("select * from t where n = 'DROP TABLE'")
+    assert XSQueryCache.is_read_only('WITH c AS (SELECT 1) SELECT * FROM c')
+    assert not XSQueryCache.is_read_only('SELECT 1; DELETE FROM COMPANY;')
+    assert not XSQueryCache.is_read_only('WITH c AS (SELECT 1) DELETE FROM t')
+    assert not XSQueryCache.is_read_only('INSERT INTO T VALUES (1)')
+    assert not XSQueryCache.is_read_only('')
+
+
+@pytest.mark.run(order=8)
+def test_query_cache_ttl_budget_invalidation():
+    """Test for cache expiration, memory budget and invalidation"""
+    status = StatusInfo(StatusServerCode.OK, message='OK')
+    cache = XSQueryCache(ttl=0.2, max_bytes=20)
+    cache.put(1, 'SELECT 1', status, [b'ID', b'1'])
+    entry = cache.get('1', '  SELECT   1;')
+    assert entry is not None and entry.frames == (b'ID', b'1')
+    assert cache.size == 3
+    # budget: oldest entries are evicted
+    cache.put(1, 'SELECT 2', status, [b'0123456789'])
+    cache.put(2, 'SELECT 3', status, [b'0123456789'])
+    assert cache.get(1, 'SELECT 1') is None
+    assert cache.size <= 20 and len(cache) == 2
+    # invalidation by database
+    cache.invalidate(2)
+    assert cache.get(2, 'SELECT 3') is None
+    assert cache.get(1, 'SELECT 2') is not None
+    # expiration
+    sleep(0.25)
+    assert cache.get(1, 'SELECT 2') is None
+    assert cache.size == 0
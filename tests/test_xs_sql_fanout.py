@@ -0,0 +1,66 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+from time import sleep
+
+import pytest
+from tfprotocol_client.extensions.xs_sql_fanout import XSSQLFanOut
+from tfprotocol_client.models.status_info import StatusInfo
+from tfprotocol_client.models.status_server_code import StatusServerCode
+
+
+class _ShardSession:
+    """Stands for a XS SQL session answering `exec_command` with fixed rows."""
+
+    def __init__(self, rows, delay=0.0, fail=False):
+        self.rows = rows
+        self.delay = delay
+        self.fail = fail
+
+    def exec_command(self, db_id, sql_query, response_handler, rows_handler):
+        sleep(self.delay)
+        if self.fail:
+            raise IOError('shard down')
+        response_handler(StatusInfo(StatusServerCode.OK, message=f'{db_id} {sql_query}'))
+        for row in self.rows:
+            rows_handler(row)
+
+
+@pytest.mark.run(order=8)
+def test_fanout_ordered_merge():
+    """Test ordered merge across shards."""
+    fanout = XSSQLFanOut(
+        [
+            (_ShardSession([[b'ID'], [b'1'], [b'2']], delay=0.05), 1),
+            (_ShardSession([[b'ID'], [b'3']]), 2),
+        ]
+    )
+    rows = []
+    resps = []
+    results = fanout.exec_command(
+        'SELECT ID FROM T;',
+        rows_handler=lambda i, r: rows.append((i, r[0])),
+        response_handler=lambda i, s: resps.append((i, s.status)),
+        ordered=True,
+    )
+    assert rows == [(0, b'ID'), (0, b'1'), (0, b'2'), (1, b'ID'), (1, b'3')]
+    assert sorted(resps) == [(0, StatusServerCode.OK), (1, StatusServerCode.OK)]
+    assert [r.rows for r in results] == [3, 2]
+    assert all(r.elapsed > 0 and r.error is None for r in results)
+
+
+@pytest.mark.run(order=8)
+def test_fanout_unordered_and_errors():
+    """Test fastest-first merge and shard failures."""
+    fanout = XSSQLFanOut(
+        [
+            (_ShardSession([[b'slow']], delay=0.1), 1),
+            (_ShardSession([[b'fast']]), 2),
+            (_ShardSession([], fail=True), 3),
+        ]
+    )
+    rows = []
+    results = fanout.exec_command('SELECT 1;', rows_handler=lambda i, r: rows.append(r[0]))
+    assert rows == [b'fast', b'slow']
+    assert isinstance(results[2].error, IOError)
+    assert results[2].status is None
@@ -46,16 +46,6 @@ def test_sup_sdown_commands(tfprotocol_instance: TfProtocol):
     tfproto.del_command('py_test/test_supdown.txt')
 
 
-def __rcvfile_handler(
-    status: StatusInfo,
-    sink: io.BytesIO = None,
-    resps: List[StatusInfo] = None,
-):
-    if sink is not None and sink.writable() and status.payload:
-        sink.write(status.payload)
-    resps.append(status)
-
-
 @pytest.mark.run(order=51)
 def test_snd_rcv_commands(tfprotocol_instance: TfProtocol):
     """Test for sndfile and rcvfile commands."""
@@ -79,11 +69,10 @@ def test_snd_rcv_commands(tfprotocol_instance: TfProtocol):
         True,
         'py_test/test_sendrcv.txt',
         sink,
-        lambda _, __, status, sink: __rcvfile_handler(status, sink, resps),
+        lambda _, __, status, ___: resps.append(status),
     )
     assert sink.getvalue() == b'Some random text'
-    assert all((r.status == StatusServerCode.CONT) for r in resps[:-1])
-    assert resps[-1].status == StatusServerCode.OK
+    assert len(resps) == 1 and resps[-1].status == StatusServerCode.OK
     #
 
 
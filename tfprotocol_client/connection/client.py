@@ -2,11 +2,22 @@
 # email: lagcleaner@gmail.com
 
 import socket
+import sys
 from io import BytesIO
-from typing import Any
-
-import tfprotocol_client.connection.socks_prox as socks
-from tfprotocol_client.misc.constants import DFLT_HEADER_SIZE, DFLT_MAX_BUFFER_SIZE
+from typing import Any, Optional
+
+from tfprotocol_client.connection.happy_eyeballs import (
+    race_connect,
+    resolve_addresses,
+)
+from tfprotocol_client.misc.constants import (
+    DFLT_CONNECT_ATTEMPT_DELAY,
+    DFLT_HEADER_SIZE,
+    DFLT_MAX_BUFFER_SIZE,
+)
+from tfprotocol_client.misc.logs import hold_tracing, release_tracing
+from tfprotocol_client.misc.metrics import Metrics
+from tfprotocol_client.misc.rate_limit import RateLimiter
 from tfprotocol_client.misc.timeout_func import TimeLimitExpired, timelimit
 from tfprotocol_client.models.exceptions import ErrorCode, TfException
 from tfprotocol_client.models.proxy_options import ProxyOptions
@@ -14,7 +25,10 @@ from tfprotocol_client.models.status_info import StatusInfo
 
 
 class SocketClient:
-    """Socket Client, handles proxy and basic send and receive."""
+    """Socket Client, handles proxy and basic send and receive. With `verbosity_mode`
+    the traces of the library are shown (see `enable_tracing`) until the connection of
+    the client is stopped.
+    """
 
     def __init__(
         self,
@@ -25,10 +39,14 @@ class SocketClient:
         header_size: int = DFLT_HEADER_SIZE,
         verbosity_mode: bool = False,
     ) -> None:
-        self._socket: socks.socksocket = socks.socksocket(
-            socket.AF_INET, socket.SOCK_STREAM
-        )
-        if proxy_options is not None:
+        self._socket: socket.socket
+        if proxy_options is None:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        else:
+            # pylint: disable=import-outside-toplevel
+            import tfprotocol_client.connection.socks_prox as socks
+
+            self._socket = socks.socksocket(socket.AF_INET, socket.SOCK_STREAM)
             self._socket.set_proxy(
                 proxy_options.proxy_type,
                 proxy_options.address,
@@ -43,6 +61,11 @@ class SocketClient:
         self.max_buffer_size: int = max_buffer_size
         self._is_connect: bool = False
         self.verbosity_mode = verbosity_mode
+        self.metrics: Optional[Metrics] = None
+        self.rate_limiter: Optional[RateLimiter] = None
+        self._holds_tracing: bool = verbosity_mode
+        if verbosity_mode:
+            hold_tracing()
 
     def is_connect(self):
         return self._is_connect
@@ -52,28 +75,50 @@ class SocketClient:
         return self._socket
 
     @socket.setter
-    def set_socket(self, new_socket: socks.socksocket):
+    def set_socket(self, new_socket: 'socket.socket'):
         self._socket = new_socket
 
-    def start_connection(self, dns_resolution_timeout: int, timeout: int) -> StatusInfo:
-        """Method to initiate the connection with the server via socket.
+    def start_connection(
+        self,
+        dns_resolution_timeout: float,
+        timeout: float,
+        attempt_delay: float = DFLT_CONNECT_ATTEMPT_DELAY / 1000,
+    ) -> StatusInfo:
+        """Method to initiate the connection with the server via socket. Without proxy
+        every address of the server is tried, in parallel and with staggered starts,
+        and the first one to connect is used.
 
         Args:
-            `dns_resolution_timeout` (int): dns timeout expressed in seconds
-            `timeout` (int): timeout to connect expresed in seconds
+            `dns_resolution_timeout` (float): dns timeout expressed in seconds
+            `timeout` (float): timeout to connect expresed in seconds
+            `attempt_delay` (float): seconds between the starts of the attempts to the
+                addresses of the server
 
         Returns:
             StatusInfo: status information resulting from connection attempt
         """
         try:
-            ip = timelimit(
-                dns_resolution_timeout,
-                (lambda *_, **__: socket.gethostbyname(self.address)),
-            )
-            if not ip:
-                return StatusInfo.parse(f'DISCONNECTED 0 {self.address} not found.')
-            self._socket.settimeout(timeout)
-            self._socket.connect((ip, self.port))
+            if self._proxy_options is not None:
+                ip = timelimit(
+                    dns_resolution_timeout,
+                    (lambda *_, **__: socket.gethostbyname(self.address)),
+                )
+                if not ip:
+                    return StatusInfo.parse(f'DISCONNECTED 0 {self.address} not found.')
+                self._socket.settimeout(timeout)
+                self._socket.connect((ip, self.port))
+            else:
+                addresses = resolve_addresses(
+                    self.address, self.port, dns_resolution_timeout
+                )
+                if not addresses:
+                    return StatusInfo.parse(f'DISCONNECTED 0 {self.address} not found.')
+                sock = race_connect(addresses, timeout, attempt_delay)
+                self._socket.close()
+                self._socket = sock
+            # THE HEADER AND THE BODY OF A MESSAGE ARE SENT APART, WITH NAGLE THE BODY
+            # WOULD WAIT FOR THE (DELAYED) ACK OF THE HEADER IN EVERY REQUEST
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             self._is_connect = True
             return StatusInfo.parse("OK")
         except AttributeError as attr_err:
@@ -82,7 +127,9 @@ class SocketClient:
             )
         except TimeLimitExpired:
             return StatusInfo.parse("DISCONNECTED 0 time out dns")
-        except socks.GeneralProxyError:
+        except socket.gaierror:
+            return StatusInfo.parse(f'DISCONNECTED 0 {self.address} not found.')
+        except _proxy_errors():
             return StatusInfo.parse(
                 "DISCONNECTED 0 cannot stablish connection with this parameters"
             )
@@ -97,6 +144,9 @@ class SocketClient:
             except Exception:  # pylint: disable=broad-except
                 pass
         self._is_connect = False
+        if self._holds_tracing:
+            self._holds_tracing = False
+            release_tracing()
 
     def _send(self, rawmessage: bytes) -> int:
         """Send a bunch of bytes through the socket to the server.
@@ -112,7 +162,10 @@ class SocketClient:
         """
         try:
             if rawmessage:
-                return self.socket.send(rawmessage)
+                sent = self.socket.send(rawmessage)
+                if self.metrics is not None:
+                    self.metrics.add_sent(sent)
+                return sent
             return 0
         except Exception as e:
             raise TfException(
@@ -162,6 +215,8 @@ class SocketClient:
                     message=f'Heap space not enough server answer with a very \
                         high header number\nheader:{size}',
                 )
+        if self.metrics is not None:
+            self.metrics.add_received(bytes_received)
         return binary_message.getvalue()
 
     def exception_guard(self):
@@ -173,3 +228,9 @@ class SocketClient:
 
     def __del__(self):
         self.stop_connection()
+
+
+def _proxy_errors():
+    # THE PROXY ERRORS CAN ONLY BE RAISED IF THE SOCKS MODULE WAS IMPORTED
+    socks = sys.modules.get('tfprotocol_client.connection.socks_prox')
+    return socks.GeneralProxyError if socks is not None else ()
@@ -11,6 +11,15 @@ class CodesSenderRecvr:
     commands.
     """
 
+    __slots__ = (
+        '_client',
+        'recveing_signal',
+        'sending_signal',
+        'block',
+        '_last_command',
+        'last_header',
+    )
+
     def __init__(self, client: ProtocolClient) -> None:
         """Codes utility initialization.
 
@@ -0,0 +1,142 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import errno
+import os
+import selectors
+import socket
+from time import monotonic
+from typing import List, Optional, Tuple
+
+from tfprotocol_client.misc.timeout_func import timelimit
+
+# (family, type, proto, canonname, sockaddr) as returned by `socket.getaddrinfo`.
+AddrInfo = Tuple[int, int, int, str, tuple]
+
+# THE ERRORS OF connect_ex MEANING THAT THE CONNECTION IS IN PROGRESS
+_IN_PROGRESS = {
+    0,
+    errno.EINPROGRESS,
+    errno.EWOULDBLOCK,
+    errno.EAGAIN,
+    getattr(errno, 'WSAEWOULDBLOCK', errno.EWOULDBLOCK),
+}
+
+
+def resolve_addresses(host: str, port: int, timeout: float) -> List[AddrInfo]:
+    """Every address of `host`, IPv6 and IPv4, in the order the connection attempts
+    should follow (see `interleave_families`).
+
+    Args:
+        `host` (str): Name or address of the host.
+        `port` (int): Port to connect to.
+        `timeout` (float): Seconds to wait for the resolution.
+
+    Raises:
+        TimeLimitExpired: The resolution took longer than `timeout`.
+        socket.gaierror: The host could not be resolved.
+
+    Returns:
+        List[AddrInfo]: The addresses found.
+    """
+    infos = timelimit(
+        timeout, socket.getaddrinfo, host, port, socket.AF_UNSPEC, socket.SOCK_STREAM
+    )
+    return interleave_families(infos or [])
+
+
+def interleave_families(infos: List[AddrInfo]) -> List[AddrInfo]:
+    """Sorts the addresses alternating their families, starting with the family of the
+    preferred one (the first returned by the resolver), so a broken IPv6 or IPv4
+    network only delays the connection by one attempt. Repeated addresses are removed.
+    """
+    by_family: List[List[AddrInfo]] = []
+    seen = set()
+    for info in infos:
+        if info[4] in seen:
+            continue
+        seen.add(info[4])
+        for group in by_family:
+            if group[0][0] == info[0]:
+                group.append(info)
+                break
+        else:
+            by_family.append([info])
+    ordered: List[AddrInfo] = []
+    while any(by_family):
+        for group in by_family:
+            if group:
+                ordered.append(group.pop(0))
+    return ordered
+
+
+def race_connect(
+    infos: List[AddrInfo], timeout: float, attempt_delay: float
+) -> socket.socket:
+    """Connects to the first address that answers (Happy Eyeballs, RFC 8305). The
+    attempts are non-blocking and start in order, one every `attempt_delay` seconds or
+    as soon as the previous ones failed, the first one to connect wins and the rest are
+    aborted.
+
+    Args:
+        `infos` (List[AddrInfo]): The addresses, in order of preference.
+        `timeout` (float): Seconds to wait for the whole race.
+        `attempt_delay` (float): Seconds between the starts of the attempts.
+
+    Raises:
+        socket.timeout: No address connected in `timeout` seconds.
+        OSError: Every attempt failed, the error of the last one.
+
+    Returns:
+        socket.socket: The connected socket, in blocking mode.
+    """
+    deadline = monotonic() + timeout
+    pending = list(infos)
+    attempts = {}
+    selector = selectors.DefaultSelector()
+    error: Optional[OSError] = None
+    next_start = monotonic()
+    try:
+        while pending or attempts:
+            now = monotonic()
+            if now >= deadline:
+                raise socket.timeout('connection time out')
+            if pending and (now >= next_start or not attempts):
+                family, type_, proto, _, sockaddr = pending.pop(0)
+                sock = None
+                try:
+                    sock = socket.socket(family, type_, proto)
+                    sock.setblocking(False)
+                    code = sock.connect_ex(sockaddr)
+                except OSError as e:
+                    code, error = None, e
+                if code not in _IN_PROGRESS:
+                    if code is not None:
+                        error = OSError(code, os.strerror(code))
+                    if sock is not None:
+                        sock.close()
+                    continue
+                selector.register(sock, selectors.EVENT_WRITE)
+                attempts[sock] = sockaddr
+                next_start = now + attempt_delay
+            wait = deadline - now
+            if pending:
+                wait = min(wait, max(next_start - now, 0))
+            for key, _ in selector.select(wait):
+                sock = key.fileobj
+                selector.unregister(sock)
+                del attempts[sock]
+                code = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if code == 0:
+                    sock.setblocking(True)
+                    return sock
+                error = OSError(code, os.strerror(code))
+                sock.close()
+                # A FAILED ATTEMPT STARTS THE NEXT ONE AT ONCE
+                next_start = now
+        raise error if error is not None else OSError('no address to connect to')
+    finally:
+        # ABORT THE LOSERS
+        for sock in attempts:
+            sock.close()
+        selector.close()
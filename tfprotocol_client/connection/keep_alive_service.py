@@ -0,0 +1,255 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import selectors
+import socket
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, List, Optional
+
+from tfprotocol_client.connection.keep_alive_thread import (
+    new_datagram_socket,
+    procheck_payload,
+    set_keepalive_native,
+    setup_procheck,
+)
+from tfprotocol_client.connection.protocol_client import ProtocolClient
+from tfprotocol_client.misc.constants import EMPTY_HANDLER
+from tfprotocol_client.misc.logs import keepalive_logger
+from tfprotocol_client.misc.timer_wheel import TimerWheel
+from tfprotocol_client.models.exceptions import TfException
+from tfprotocol_client.models.keepalive_options import (
+    KeepAliveMechanismType,
+    KeepAliveOptions,
+)
+from tfprotocol_client.models.proxy_options import ProxyOptions
+
+DeadSessionHandler = Callable[[ProtocolClient], None]
+
+
+class _KeepAliveSession:
+    """Keep alive state of a registered connection."""
+
+    __slots__ = ('client', 'options', 'on_dead', 'udp_sock', 'payload', 'counter', 'active')
+
+    def __init__(
+        self,
+        proto_client: ProtocolClient,
+        options: KeepAliveOptions,
+        udp_sock: socket.socket,
+        payload: bytes,
+        on_dead: DeadSessionHandler,
+    ) -> None:
+        self.client: ProtocolClient = proto_client
+        self.options: KeepAliveOptions = options
+        self.on_dead: DeadSessionHandler = on_dead
+        self.udp_sock: socket.socket = udp_sock
+        self.payload: bytes = payload
+        self.counter: int = 0
+        self.active: bool = True
+
+    @property
+    def addrs(self):
+        return self.client.address, self.client.port
+
+
+class KeepAliveService(Thread):
+    """Process wide keep alive mechanism. A single thread sends the UDP_HOSTCHECK and
+    UDP_PROCHECK probes of every registered connection, waiting for the answers with a
+    `selectors` loop and scheduling the next probes in a timer wheel. Connections
+    considered dead are closed and reported through their `on_dead` callback, which runs
+    in the service thread so it must not block.
+    """
+
+    _instance: Optional['KeepAliveService'] = None
+    _instance_lock = Lock()
+
+    def __init__(self, tick: float = 0.1, wheel_size: int = 512) -> None:
+        """Keep alive service initialization.
+
+        Args:
+            `tick` (float): Resolution (in seconds) of the probe scheduling.
+            `wheel_size` (int): Number of slots of the timer wheel.
+        """
+        super().__init__(name='keepalive_service', daemon=True)
+        self._selector = selectors.DefaultSelector()
+        self._wheel = TimerWheel(tick, wheel_size)
+        self._lock = Lock()
+        self._sessions: Dict[int, _KeepAliveSession] = {}
+        self._pending: List[_KeepAliveSession] = []
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ, None)
+        # SET BY stop() FROM ANY THREAD, EVEN BEFORE THE SERVICE THREAD STARTS
+        self._stopping = Event()
+
+    @classmethod
+    def instance(cls) -> 'KeepAliveService':
+        """The shared keep alive service of the process, started on first use."""
+        with cls._instance_lock:
+            if cls._instance is None or not cls._instance.is_alive():
+                cls._instance = cls()
+                cls._instance.start()
+            return cls._instance
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @property
+    def is_active(self) -> bool:
+        """Whether the service thread runs and was not asked to stop."""
+        return self.is_alive() and not self._stopping.is_set()
+
+    def register(
+        self,
+        proto_client: ProtocolClient,
+        options: KeepAliveOptions,
+        proxy_options: ProxyOptions = None,
+        on_dead: DeadSessionHandler = EMPTY_HANDLER,
+    ) -> bool:
+        """Starts the keep alive mechanism for a connected client. The UDP_PROCHECK set up
+        and the TCP_NATIVE socket options are done in the calling thread.
+
+        Args:
+            `proto_client` (ProtocolClient): The connected client to keep alive.
+            `options` (KeepAliveOptions): Keep alive options.
+            `proxy_options` (ProxyOptions): Proxy used by the UDP probes.
+            `on_dead` ((ProtocolClient) -> None): Callback for when the connection is
+                considered dead and closed.
+
+        Returns:
+            bool: True if the keep alive mechanism is active for the client.
+        """
+        mechanism = options.keepalive_mechanism
+        try:
+            if mechanism is KeepAliveMechanismType.TCP_NATIVE:
+                set_keepalive_native(proto_client.socket, options)
+                return True
+            payload = bytes((0,))
+            if mechanism is KeepAliveMechanismType.UDP_PROCHECK:
+                prockey = setup_procheck(proto_client, options)
+                if not prockey:
+                    proto_client.stop_connection()
+                    on_dead(proto_client)
+                    return False
+                payload = procheck_payload(prockey)
+            udp_sock = new_datagram_socket(proxy_options)
+            udp_sock.setblocking(False)
+        except IOError as e:
+            raise TfException(exception=e)
+        session = _KeepAliveSession(proto_client, options, udp_sock, payload, on_dead)
+        with self._lock:
+            previous = self._sessions.pop(id(proto_client), None)
+            if previous is not None:
+                previous.active = False
+            self._sessions[id(proto_client)] = session
+            self._pending.append(session)
+        self._wakeup()
+        return True
+
+    def unregister(self, proto_client: ProtocolClient):
+        """Stops the keep alive mechanism of a client, without closing it."""
+        with self._lock:
+            session = self._sessions.pop(id(proto_client), None)
+        if session is not None:
+            session.active = False
+            self._wakeup()
+
+    def stop(self):
+        """Stops the service thread, the registered connections remain open."""
+        self._stopping.set()
+        self._wakeup()
+
+    def _wakeup(self):
+        try:
+            self._wakeup_w.send(b'\0')
+        except IOError:
+            pass
+
+    def run(self) -> None:
+        while not self._stopping.is_set():
+            for key, _ in self._selector.select(self._wheel.next_timeout()):
+                if key.data is None:
+                    self._drain_wakeup()
+                else:
+                    self._on_answer(key.data)
+            self._attach_pending()
+            for session in self._wheel.advance():
+                self._probe(session)
+        for key in list(self._selector.get_map().values()):
+            if key.data is not None:
+                key.data.udp_sock.close()
+        self._selector.close()
+        self._wakeup_r.close()
+        self._wakeup_w.close()
+
+    def _drain_wakeup(self):
+        try:
+            while self._wakeup_r.recv(512):
+                pass
+        except IOError:
+            pass
+
+    def _attach_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for session in pending:
+            if session.active:
+                self._selector.register(session.udp_sock, selectors.EVENT_READ, session)
+                # FIRST PROBE ON THE NEXT TICK
+                self._wheel.schedule(0, session)
+            else:
+                session.udp_sock.close()
+
+    def _probe(self, session: _KeepAliveSession):
+        if not session.active or not session.client.is_connect():
+            self._detach(session)
+            return
+        if session.counter >= session.options.max_tries:
+            self._dead(session)
+            return
+        keepalive_logger.debug(
+            'probe %s:%s (tries: %s)', *session.addrs, session.counter
+        )
+        try:
+            session.udp_sock.sendto(session.payload, session.addrs)
+        except IOError as e:
+            keepalive_logger.warning('probe IOError: %s', e)
+        session.counter += 1
+        self._wheel.schedule(session.options.idle, session)
+
+    def _on_answer(self, session: _KeepAliveSession):
+        try:
+            data_recvd, _ = session.udp_sock.recvfrom(1)
+        except IOError:
+            return
+        if not data_recvd or not session.active:
+            return
+        if (
+            data_recvd[0] == 0
+            and session.options.keepalive_mechanism
+            is KeepAliveMechanismType.UDP_PROCHECK
+        ):
+            self._dead(session)
+        elif data_recvd[0] == 1:
+            session.counter = 0
+
+    def _detach(self, session: _KeepAliveSession):
+        session.active = False
+        with self._lock:
+            if self._sessions.get(id(session.client)) is session:
+                del self._sessions[id(session.client)]
+        try:
+            self._selector.unregister(session.udp_sock)
+        except (KeyError, ValueError):
+            pass
+        session.udp_sock.close()
+
+    def _dead(self, session: _KeepAliveSession):
+        keepalive_logger.info('session %s:%s considered dead', *session.addrs)
+        self._detach(session)
+        try:
+            session.client.stop_connection()
+        except IOError:
+            pass
+        session.on_dead(session.client)
@@ -13,6 +13,7 @@ import tfprotocol_client.connection.socks_prox as socks
 from tfprotocol_client.connection.protocol_client import ProtocolClient
 from tfprotocol_client.misc.build_utils import MessageUtils
 from tfprotocol_client.misc.constants import BYTE_SIZE, EMPTY_HANDLER
+from tfprotocol_client.misc.logs import keepalive_logger
 from tfprotocol_client.models.exceptions import TfException
 from tfprotocol_client.models.keepalive_options import (
     KeepAliveMechanismType,
@@ -45,57 +46,15 @@ class KeepAliveThread(Thread):
         self._on_connection_closed: Callable[[], None] = on_connection_closed
 
         try:
-            self._datagram_socket: Optional[socks.socksocket] = socks.socksocket(
-                socket.AF_INET, socket.SOCK_DGRAM
+            self._datagram_socket: Optional[socks.socksocket] = new_datagram_socket(
+                proxy_options, options.timeout
             )
-            if proxy_options is not None:
-                self._datagram_socket.set_proxy(
-                    proxy_options.proxy_type,
-                    proxy_options.address,
-                    proxy_options.port,
-                    username=proxy_options.username,
-                    password=proxy_options.password,
-                )
-            self._datagram_socket.settimeout(options.timeout)
-            success = False
             if options.keepalive_mechanism is KeepAliveMechanismType.TCP_NATIVE:
-                if current_operating_system() == 'Windows':
-                    set_keepalive_windows(
-                        self._proto_client.socket,
-                        self._idle,
-                        self._timeout,
-                        self._max_tries,
-                    )
-                elif current_operating_system() == 'Linux':
-                    set_keepalive_linux(
-                        self._proto_client.socket,
-                        self._idle,
-                        self._timeout,
-                        self._max_tries,
-                    )
-                elif current_operating_system() == 'MacOS':
-                    set_keepalive_linux(
-                        self._proto_client.socket,
-                        self._idle,
-                        self._timeout,
-                        self._max_tries,
-                    )
-
+                set_keepalive_native(self._proto_client.socket, options)
             if options.keepalive_mechanism is KeepAliveMechanismType.UDP_PROCHECK:
-                dflt_timout = self._proto_client.socket.gettimeout()
-                self._proto_client.socket.settimeout(options.timeout)
-                proto_wrapper = TfProtocolKeepAliveWrapper(self._proto_client)
-                for _ in range(options.max_tries):
-                    self._prockey = proto_wrapper.prockey_command()
-                    self.is_active = proto_wrapper.keepalive_command(
-                        True, 1, options.idle, options.max_tries
-                    )
-                    if not self._prockey or not self.is_active:
-                        continue
-                    self._proto_client.socket.settimeout(dflt_timout)
-                    success = True
-                    break
-                if not success:
+                self._prockey = setup_procheck(self._proto_client, options)
+                self.is_active = bool(self._prockey)
+                if not self.is_active:
                     self.stop_connection()
         except IOError as e:
             raise TfException(exception=e)
@@ -125,18 +84,18 @@ class KeepAliveThread(Thread):
         super()._stop()
 
     def udp_hostcheck(self):
-        print(f'KA: udp_hostcheck (tries: {self._counter})')
+        keepalive_logger.debug('udp_hostcheck (tries: %s)', self._counter)
         try:
             data_to_send = bytes((0,))
             _ = self.udp_sock.sendto(data_to_send, self.addrs)
             data_recvd, _ = self.udp_sock.recvfrom(1)
-            print(f'KA: udp_hostcheck (recv: {data_recvd})')
+            keepalive_logger.debug('udp_hostcheck (recv: %s)', data_recvd)
             if data_recvd[0] == 1:
                 self._counter = 0
         except IOError as e:
-            print('UDP_SOCKET-IOError: ', e.strerror, e.args)
+            keepalive_logger.warning('udp_hostcheck IOError: %s %s', e.strerror, e.args)
         except Exception as e:  # pylint: disable=broad-except
-            print('UDP_SOCKET-Error: ', e)
+            keepalive_logger.warning('udp_hostcheck error: %s', e)
         finally:
             if self._counter == self._max_tries:
                 self.stop_connection()
@@ -148,16 +107,14 @@ class KeepAliveThread(Thread):
             self._counter += 1
 
     def udp_procheck(self):
-        print('KA: udp_procheck')
+        keepalive_logger.debug('udp_procheck (tries: %s)', self._counter)
         try:
-            payload = BytesIO()
-            payload.write(MessageUtils.encode_value(1, size=BYTE_SIZE))
-            payload.write(MessageUtils.encode_value(self._prockey))
-            print('KA: udp_procheck - send', payload.getvalue())
-            _ = self.udp_sock.sendto(payload.getvalue(), self.addrs)
+            payload = procheck_payload(self._prockey)
+            keepalive_logger.debug('udp_procheck (send: %s)', payload)
+            _ = self.udp_sock.sendto(payload, self.addrs)
 
             data_recvd, _ = self.udp_sock.recvfrom(1)
-            print('KA: udp_procheck - recv', data_recvd)
+            keepalive_logger.debug('udp_procheck (recv: %s)', data_recvd)
             if data_recvd[0] == 0:
                 self.stop_connection()
                 return
@@ -177,7 +134,7 @@ class KeepAliveThread(Thread):
 
     def run(self) -> None:
         # return super().run()
-        print('KA: run')
+        keepalive_logger.debug('run %s:%s', *self.addrs)
         self.is_active = True
         while self.is_active and self.client.is_connect():
             if self._keepalive_mechanism is KeepAliveMechanismType.UDP_HOSTCHECK:
@@ -193,6 +150,65 @@ class KeepAliveThread(Thread):
                 sys.exit(1)
 
 
+def new_datagram_socket(
+    proxy_options: Optional[ProxyOptions] = None, timeout: Optional[float] = None
+) -> socks.socksocket:
+    """Creates the UDP socket used to send the keep alive probes, going through the
+    proxy if any.
+    """
+    datagram_socket = socks.socksocket(socket.AF_INET, socket.SOCK_DGRAM)
+    if proxy_options is not None:
+        datagram_socket.set_proxy(
+            proxy_options.proxy_type,
+            proxy_options.address,
+            proxy_options.port,
+            username=proxy_options.username,
+            password=proxy_options.password,
+        )
+    datagram_socket.settimeout(timeout)
+    return datagram_socket
+
+
+def set_keepalive_native(sock, options: KeepAliveOptions):
+    """Set TCP keepalive on an open socket according to the current operating system."""
+    if current_operating_system() == 'Windows':
+        set_keepalive_windows(sock, options.idle, options.timeout, options.max_tries)
+    elif current_operating_system() == 'Linux':
+        set_keepalive_linux(sock, options.idle, options.timeout, options.max_tries)
+    elif current_operating_system() == 'MacOS':
+        set_keepalive_linux(sock, options.idle, options.timeout, options.max_tries)
+
+
+def setup_procheck(proto_client: ProtocolClient, options: KeepAliveOptions) -> str:
+    """Asks the server for the process key and enables the server side keep alive,
+    needed by the UDP_PROCHECK mechanism.
+
+    Returns:
+        str: The process key, or an empty string if the server could not be set up.
+    """
+    dflt_timout = proto_client.socket.gettimeout()
+    proto_client.socket.settimeout(options.timeout)
+    proto_wrapper = TfProtocolKeepAliveWrapper(proto_client)
+    for _ in range(options.max_tries):
+        prockey = proto_wrapper.prockey_command()
+        enabled = proto_wrapper.keepalive_command(
+            True, 1, options.idle, options.max_tries
+        )
+        if not prockey or not enabled:
+            continue
+        proto_client.socket.settimeout(dflt_timout)
+        return prockey
+    return ''
+
+
+def procheck_payload(prockey: str) -> bytes:
+    """Builds the UDP_PROCHECK datagram for the given process key."""
+    payload = BytesIO()
+    payload.write(MessageUtils.encode_value(1, size=BYTE_SIZE))
+    payload.write(MessageUtils.encode_value(prockey))
+    return payload.getvalue()
+
+
 def set_keepalive_linux(sock, after_idle_sec=3600, interval_sec=3, max_fails=5):
     """Set TCP keepalive on an open socket.
 
@@ -1,20 +1,31 @@
 # coded by lagcleaner
 # email: lagcleaner@gmail.com
 
-from typing import Optional, Union
+from contextlib import contextmanager
+from logging import DEBUG
+from time import monotonic, perf_counter, thread_time
+from typing import Callable, Iterator, List, Optional, Sequence, Union
 from multipledispatch import dispatch
 from tfprotocol_client.connection.client import SocketClient
 from tfprotocol_client.misc.constants import (
+    DFLT_CRYPTO_PIPELINE_DEPTH,
+    DFLT_HEADER_SIZE,
     DFLT_MAX_BUFFER_SIZE,
     ENDIANESS_NAME,
     INT_SIZE,
+    KEY_LEN_INTERVAL,
 )
 from tfprotocol_client.misc.build_utils import MessageUtils
+from tfprotocol_client.misc.logs import client_logger
+from tfprotocol_client.misc.metrics import Metrics
 from tfprotocol_client.models.exceptions import TfException
 from tfprotocol_client.models.message import TfProtocolMessage
 from tfprotocol_client.models.proxy_options import ProxyOptions
+from tfprotocol_client.models.rekey_policy import RekeyPolicy
 from tfprotocol_client.models.status_info import StatusInfo
+from tfprotocol_client.models.status_server_code import StatusServerCode
 from tfprotocol_client.security.cryptography import Xor
+from tfprotocol_client.security.keystream import KeystreamBuffer, KeystreamPipeline
 
 
 class ProtocolClient(SocketClient):
@@ -43,6 +54,19 @@ class ProtocolClient(SocketClient):
         self.xor_input = None
         self.xor_output = None
         self._session_key = None
+        self._input_keystream: Optional[KeystreamPipeline] = None
+        self._output_keystream: Optional[KeystreamPipeline] = None
+        self._keystream_buffer_size = 0
+        self._input_buffer: Optional[KeystreamBuffer] = None
+        self._output_buffer: Optional[KeystreamBuffer] = None
+        self.rekey_policy: Optional[RekeyPolicy] = None
+        # EXTENDED SUBSYSTEM THE SERVER IS IN, NONE AT THE MAIN COMMAND INTERFACE
+        self.subsystem: Optional[str] = None
+        # NESTING OF THE COMMANDS IN PROGRESS, THE KEY IS ONLY RENEWED OUTSIDE THEM
+        self._command_depth = 0
+        self._key_stamp = monotonic()
+        self._key_ciphered = 0
+        self._last_activity = monotonic()
 
     def get_sessionkey(self):
         return self._session_key
@@ -52,19 +76,116 @@ class ProtocolClient(SocketClient):
             self.xor_input = Xor(session_key)
             self.xor_output = Xor(session_key)
         self._session_key = session_key
+        self._key_stamp = monotonic()
+        self._key_ciphered = 0
+        self._start_keystream_buffers()
 
     session_key = property(fget=get_sessionkey, fset=set_sessionkey)
 
+    @property
+    def keystream_buffer_size(self) -> int:
+        """Bytes of keystream computed ahead in each direction while the session is
+        idle, 0 if the keystream is computed when a message is ciphered.
+        """
+        return self._keystream_buffer_size
+
+    @keystream_buffer_size.setter
+    def keystream_buffer_size(self, value: int):
+        self._keystream_buffer_size = value
+        self._start_keystream_buffers()
+
+    def _start_keystream_buffers(self):
+        self._stop_keystream_buffers()
+        if self._keystream_buffer_size > 0 and self.xor_input is not None:
+            self._input_buffer = KeystreamBuffer(
+                self.xor_input, self._keystream_buffer_size
+            )
+            self._output_buffer = KeystreamBuffer(
+                self.xor_output, self._keystream_buffer_size
+            )
+
+    def _stop_keystream_buffers(self):
+        # IT MAY RUN FROM __del__ WITH THE CLIENT NOT FULLY INITIALIZED
+        for buffer in (
+            getattr(self, '_input_buffer', None),
+            getattr(self, '_output_buffer', None),
+        ):
+            if buffer is not None:
+                buffer.close()
+        self._input_buffer = self._output_buffer = None
+
+    def stop_connection(self):
+        self._stop_keystream_buffers()
+        super().stop_connection()
+
     def _decrypt(self, payload: bytes) -> bytes:
         if self.xor_input is not None:
-            payload = self.xor_input.decrypt(payload)
+            if self.metrics is None:
+                return self._cipher(payload, decrypt=True)
+            start = thread_time()
+            payload = self._cipher(payload, decrypt=True)
+            self.metrics.add_crypto_time(thread_time() - start)
         return payload
 
     def _encrypt(self, payload: bytes) -> bytes:
         if self.xor_output is not None:
-            payload = self.xor_output.encrypt(payload)
+            if self.metrics is None:
+                return self._cipher(payload, decrypt=False)
+            start = thread_time()
+            payload = self._cipher(payload, decrypt=False)
+            self.metrics.add_crypto_time(thread_time() - start)
         return payload
 
+    def _cipher(self, payload: bytes, decrypt: bool) -> bytes:
+        self._last_activity = monotonic()
+        cipher, pipeline = (
+            (self.xor_input, self._input_keystream)
+            if decrypt
+            else (self.xor_output, self._output_keystream)
+        )
+        keystream = pipeline.take(cipher, len(payload)) if pipeline else None
+        if keystream is None:
+            buffer = self._input_buffer if decrypt else self._output_buffer
+            keystream = (buffer or cipher).keystream(len(payload))
+        if decrypt:
+            return Xor.apply_decrypt(payload, *keystream)
+        return Xor.apply_encrypt(payload, *keystream)
+
+    @contextmanager
+    def pipelined_crypto(
+        self,
+        input_sizes: Sequence[int] = (),
+        output_sizes: Sequence[int] = (),
+        depth: int = DFLT_CRYPTO_PIPELINE_DEPTH,
+    ) -> Iterator[None]:
+        """Computes the keystreams of the next payloads in background threads while
+        the socket is used, for the transferences whose payloads have a repeating
+        pattern of sizes. Inside the context the payloads are ciphered with the
+        keystreams computed ahead while they follow the pattern, and as usual after.
+
+        Args:
+            `input_sizes` (Sequence[int]): Sizes of the payloads to be received, a
+                header and a chunk for instance, empty to not pipeline them.
+            `output_sizes` (Sequence[int]): Sizes of the payloads to be sent, empty to
+                not pipeline them.
+            `depth` (int): Keystreams computed ahead in each direction, 0 disables it.
+        """
+        if depth > 0 and input_sizes and self.xor_input is not None:
+            self._input_keystream = KeystreamPipeline(
+                self.xor_input, input_sizes, depth
+            )
+        if depth > 0 and output_sizes and self.xor_output is not None:
+            self._output_keystream = KeystreamPipeline(
+                self.xor_output, output_sizes, depth
+            )
+        try:
+            yield
+        finally:
+            for pipeline in (self._input_keystream, self._output_keystream):
+                if pipeline is not None:
+                    pipeline.close()
+            self._input_keystream = self._output_keystream = None
+
     def just_recv_int(self, size: int = INT_SIZE, signed=False) -> int:
         # RECEIVE, DECRYPT AND DECODE INTEGER
         decrypted_data = self.just_recv(size)
@@ -115,9 +236,11 @@ class ProtocolClient(SocketClient):
         self.exception_guard()
         # BUILD
         header, encoded_message = message
-        if self.verbosity_mode:
-            print(
-                f'CLIENT: {int.from_bytes(header, byteorder=ENDIANESS_NAME)} {encoded_message}'
+        if client_logger.isEnabledFor(DEBUG):
+            client_logger.debug(
+                'CLIENT: %s %s',
+                int.from_bytes(header, byteorder=ENDIANESS_NAME),
+                encoded_message,
             )
 
         # ENCRYPT
@@ -128,6 +251,28 @@ class ProtocolClient(SocketClient):
         self._send(encrypted_header)
         self._send(encrypted_message)
 
+    def send_frame(
+        self,
+        payload: Union[bytes, bytearray, memoryview],
+        header_size: int = DFLT_HEADER_SIZE,
+    ):
+        """Sends a payload already laid out by the caller (a slice of a reusable buffer
+        for instance), without building a message around it.
+
+        Args:
+            `payload` (Union[bytes, bytearray, memoryview]): The body of the message.
+            `header_size` (int): Size of the length header.
+        """
+        self.exception_guard()
+        # BUILD
+        header = MessageUtils.encode_value(len(payload), size=header_size, signed=True)
+        if client_logger.isEnabledFor(DEBUG):
+            client_logger.debug('CLIENT: %s %s', len(payload), bytes(payload))
+
+        # ENCRYPT AND SEND
+        self._send(self._encrypt(header))
+        self._send(self._encrypt(payload))
+
     # pylint: disable=function-redefined
     @dispatch((str, bytes))
     def send(
@@ -158,7 +303,6 @@ class ProtocolClient(SocketClient):
         received_header = self._recv(header_size)
         decrypted_header = self._decrypt(received_header)
         decoded_header = MessageUtils.decode_int(decrypted_header, signed=header_signed)
-        # print(f'SERVER: Header({decoded_header})')
 
         # RECEIVE AND DECRYPT BODY
         received_body = self._recv(decoded_header)
@@ -168,8 +312,7 @@ class ProtocolClient(SocketClient):
             decrypted_body,
             parse_code=parse_front_code_response,
         )
-        if self.verbosity_mode:
-            print(f'SERVER: {decoded_header} {status}')
+        client_logger.debug('SERVER: %s %s', decoded_header, status)
         return status
 
     @dispatch(TfProtocolMessage)
@@ -181,12 +324,21 @@ class ProtocolClient(SocketClient):
         **_,
     ) -> StatusInfo:
         self.exception_guard()
-        self.send(message)
-        return self.recv(
-            header_size=message.header_size,
-            header_signed=recv_header_signed,
-            parse_front_code_response=parse_front_code_response,
-        )
+        with self.command():
+            if self.metrics is not None and not self.metrics.in_command:
+                with self.metrics.command(Metrics.verb_of(message.payload)):
+                    self.send(message)
+                    return self.recv(
+                        header_size=message.header_size,
+                        header_signed=recv_header_signed,
+                        parse_front_code_response=parse_front_code_response,
+                    )
+            self.send(message)
+            return self.recv(
+                header_size=message.header_size,
+                header_signed=recv_header_signed,
+                parse_front_code_response=parse_front_code_response,
+            )
 
     # pylint: disable=function-redefined
     @dispatch((str, bytes))
@@ -206,3 +358,159 @@ class ProtocolClient(SocketClient):
             recv_header_signed=recv_header_signed,
             parse_front_code_response=parse_front_code_response,
         )
+
+    def pipeline(
+        self, messages: Sequence[TfProtocolMessage], depth: int = 32
+    ) -> List[StatusInfo]:
+        """Sends several requests without waiting for each answer, keeping up to `depth`
+        of them in flight. The server answers in order, so the responses are returned in
+        the same order as the messages.
+
+        Args:
+            `messages` (Sequence[TfProtocolMessage]): The requests to be sent.
+            `depth` (int): Maximum number of requests sent and not yet answered.
+
+        Returns:
+            List[StatusInfo]: The response of every request.
+        """
+        self.exception_guard()
+        responses: List[StatusInfo] = []
+        sent = 0
+        with self.command():
+            while len(responses) < len(messages):
+                while sent < len(messages) and sent - len(responses) < max(depth, 1):
+                    self.send(messages[sent])
+                    sent += 1
+                pending = messages[len(responses)]
+                responses.append(self.recv(header_size=pending.header_size))
+        return responses
+
+    def stream_cont(
+        self,
+        message: TfProtocolMessage,
+        write: Callable[[memoryview], object],
+    ) -> StatusInfo:
+        """Sends a request answered by a stream of CONT messages (each one requested
+        with CONT) and hands their payloads to `write` as they arrive, no status is
+        built for them.
+
+        Args:
+            `message` (TfProtocolMessage): The request.
+            `write` (Callable[[memoryview], object]): Receives the payload of each CONT.
+
+        Returns:
+            StatusInfo: The answer that ended the stream.
+        """
+        self.exception_guard()
+        cont = TfProtocolMessage('CONT')
+        with self.command():
+            self.send(message)
+            while True:
+                header = MessageUtils.decode_int(
+                    self._decrypt(self._recv(message.header_size)), signed=True
+                )
+                body = self._decrypt(self._recv(header))
+                if body[:4] != b'CONT' or (len(body) > 4 and body[4] != 0x20):
+                    status = StatusInfo.build_status(header, body)
+                    client_logger.debug('SERVER: %s %s', header, status)
+                    return status
+                if len(body) > 5:
+                    write(memoryview(body)[5:])
+                self.send(cont)
+
+    @property
+    def key_ciphered(self) -> int:
+        """Bytes sent and received with the current session key."""
+        if self.xor_input is None:
+            return 0
+        return self.xor_input.position + self.xor_output.position - self._key_ciphered
+
+    def rekey(self, keylen: Optional[int] = None) -> StatusInfo:
+        """Renews the session key with NIGMA, the new key is generated by the server
+        and sent ciphered with the current one. It must be called between commands,
+        the keystreams computed ahead with the old key are discarded.
+
+        Args:
+            `keylen` (int): Length of the new key, equal or greater than 8 and multiple
+                of 4. The length of the current key if it is not given.
+
+        Raises:
+            TfException: In case of invalid keylen.
+
+        Returns:
+            StatusInfo: OK with the new key as payload, or the failure of the server.
+        """
+        if keylen is None:
+            keylen = (
+                len(self._session_key) if self._session_key else KEY_LEN_INTERVAL[0]
+            )
+        if keylen % 4 != 0 or keylen < 8:
+            raise TfException(
+                code=-1,
+                message='Invalid key length,'
+                ' key length must be multiple of 4'
+                ' and greater or equals than 8...',
+            )
+        start = perf_counter()
+        with self.command(renew_key=False):
+            if self.metrics is None:
+                response = self._nigma(keylen)
+            else:
+                with self.metrics.untimed():
+                    response = self._nigma(keylen)
+        if self.metrics is not None and response.status is StatusServerCode.OK:
+            self.metrics.observe_rekey(perf_counter() - start)
+        return response
+
+    def _nigma(self, keylen: int) -> StatusInfo:
+        response = self.translate(TfProtocolMessage('NIGMA', str(keylen)))
+        if response.status is not StatusServerCode.OK:
+            return response
+        hdr = self.just_recv_int(signed=True)
+        self.session_key = bytes(self.just_recv(size=hdr))
+        return StatusInfo(
+            status=StatusServerCode.OK,
+            message=str(bytes(self.session_key)),
+            payload=self.session_key,
+        )
+
+    @contextmanager
+    def command(self, renew_key: bool = True) -> Iterator[None]:
+        """Runs the enclosed requests as a single command. Before the outermost one the
+        session key is renewed if the `rekey_policy` says it is due, never in the
+        middle of a command. Every request entry point of the client enters it.
+
+        Args:
+            `renew_key` (bool): Whether the due key can be renewed before the command,
+                False for the commands renewing the key by themselves.
+        """
+        if renew_key and self._command_depth == 0:
+            self.rekey_if_due()
+        self._command_depth += 1
+        try:
+            yield
+        finally:
+            self._command_depth -= 1
+
+    def rekey_if_due(self) -> bool:
+        """Renews the session key if the `rekey_policy` says it is due, to be called
+        between commands (the client does it by itself before every command). The key is
+        only renewed at the main command interface, the subsystems do not know KEY/NIGMA.
+
+        Returns:
+            bool: Whether the key was renewed.
+        """
+        policy = self.rekey_policy
+        if policy is None or self.xor_input is None or self.subsystem is not None:
+            return False
+        now = monotonic()
+        if not policy.due(
+            self.key_ciphered, now - self._key_stamp, now - self._last_activity
+        ):
+            return False
+        if self.rekey(policy.keylen).status is StatusServerCode.OK:
+            return True
+        # THE SERVER REFUSED, TRY AGAIN AFTER ANOTHER PERIOD
+        self._key_stamp = monotonic()
+        self._key_ciphered += self.key_ciphered
+        return False
@@ -0,0 +1,162 @@
+from io import BytesIO
+from typing import Optional, Tuple, Union
+from uuid import uuid4
+
+from tfprotocol_client.misc.constants import EMPTY_HANDLER, INT_SIZE, LONG_SIZE
+from tfprotocol_client.misc.handlers_aliases import ResponseHandler
+from tfprotocol_client.models.message import TfProtocolMessage
+from tfprotocol_client.models.status_info import StatusInfo
+from tfprotocol_client.models.status_server_code import StatusServerCode
+from tfprotocol_client.tfprotocol import TfProtocol
+
+
+class XSBlobStreamMixin:
+    """Streams local data into and out of database blobs for the XS SQL like modules
+    that implement BLOBIN and BLOBOUT. The data travels through a temporary server file
+    using SUP/SDOWN, so it is never held entirely in memory.
+
+    Classes using this mixin must define `SUBSYSTEM_NAME`, the command used to enter
+    the subsystem, and the `blobin_command`/`blobout_command` methods.
+    """
+
+    SUBSYSTEM_NAME: str = None
+
+    def put_blob(
+        self,
+        db_id: Union[int, str],
+        bd_table: str,
+        filename: str,
+        data_stream: BytesIO,
+        tmp_dir: str = '',
+        timeout: float = 0,
+        transfer_session: Optional[TfProtocol] = None,
+        response_handler: ResponseHandler = EMPTY_HANDLER,
+    ) -> bool:
+        """Stores the content of a local stream as a blob named `filename` in the table
+        `bd_table`. When no `transfer_session` is given the upload is done through this
+        same connection, leaving and entering again the subsystem around it (opened
+        databases remain valid meanwhile).
+
+        Args:
+            `db_id` (int, str): The ID of the database to store the blob.
+            `bd_table` (str): The database table to store the blob.
+            `filename` (str): The name of the blob to store.
+            `data_stream` (BytesIO): Data stream open in read mode.
+            `tmp_dir` (str): Server directory for the temporary file.
+            `timeout` (float): Time out (in seconds) used by the SUP transfer.
+            `transfer_session` (TfProtocol, optional): Another connected session used
+                to transfer the temporary file without leaving the subsystem.
+            `response_handler` (ResponseHandler): The function to handle the BLOBIN
+                command response.
+
+        Returns:
+            bool: True if the blob was stored successfully.
+        """
+        tmp_path = self._blob_tmp_path(tmp_dir)
+        proto, leave = self._blob_transfer_session(transfer_session)
+        if leave:
+            self.exit_command()
+        try:
+            uploaded = proto.sup_command(tmp_path, data_stream, timeout)
+        finally:
+            if leave:
+                self._enter_subsystem()
+        responses = [
+            StatusInfo(
+                StatusServerCode.FAILED,
+                message=f'Cannot upload blob data to {tmp_path}',
+            )
+        ]
+        if uploaded:
+            self.blobin_command(
+                db_id, bd_table, filename, tmp_path, response_handler=responses.append
+            )
+        self._remove_blob_tmp(tmp_path, proto, leave)
+        status: StatusInfo = responses[-1]
+        response_handler(status)
+        return status.status is StatusServerCode.OK
+
+    def get_blob(
+        self,
+        db_id: Union[int, str],
+        bd_table: str,
+        filename: str,
+        data_sink: BytesIO,
+        tmp_dir: str = '',
+        timeout: float = 0,
+        transfer_session: Optional[TfProtocol] = None,
+        response_handler: ResponseHandler = EMPTY_HANDLER,
+    ) -> bool:
+        """Writes into a local sink the blob named `filename` from the table `bd_table`.
+        When no `transfer_session` is given the download is done through this same
+        connection, leaving and entering again the subsystem around it.
+
+        Args:
+            `db_id` (int, str): The ID of the database to extract the blob.
+            `bd_table` (str): The database table to extract the blob.
+            `filename` (str): The name of the blob to extract.
+            `data_sink` (BytesIO): Data sink open in write/append mode.
+            `tmp_dir` (str): Server directory for the temporary file.
+            `timeout` (float): Time out (in seconds) used by the SDOWN transfer.
+            `transfer_session` (TfProtocol, optional): Another connected session used
+                to transfer the temporary file without leaving the subsystem.
+            `response_handler` (ResponseHandler): The function to handle the BLOBOUT
+                command response.
+
+        Returns:
+            bool: True if the blob was extracted and downloaded successfully.
+        """
+        tmp_path = self._blob_tmp_path(tmp_dir)
+        responses = []
+        self.blobout_command(
+            db_id, bd_table, filename, tmp_path, response_handler=responses.append
+        )
+        status: StatusInfo = responses[-1]
+        if status.status is not StatusServerCode.OK:
+            response_handler(status)
+            return False
+        proto, leave = self._blob_transfer_session(transfer_session)
+        if leave:
+            self.exit_command()
+        try:
+            downloaded = proto.sdown_command(tmp_path, data_sink, timeout)
+        finally:
+            self._remove_blob_tmp(tmp_path, proto, leave)
+        if not downloaded:
+            status = StatusInfo(
+                StatusServerCode.FAILED,
+                message=f'Cannot download blob data from {tmp_path}',
+            )
+        response_handler(status)
+        return downloaded
+
+    def _enter_subsystem(self) -> StatusInfo:
+        return self._enter_subsystem_as(self.SUBSYSTEM_NAME)
+
+    def _blob_tmp_path(self, tmp_dir: str) -> str:
+        name = f'.blob_{uuid4().hex}.tmp'
+        return f'{tmp_dir.rstrip("/")}/{name}' if tmp_dir else name
+
+    def _blob_transfer_session(
+        self, transfer_session: Optional[TfProtocol]
+    ) -> Tuple[TfProtocol, bool]:
+        if transfer_session is not None:
+            return transfer_session, False
+        # THE CONSTRUCTOR IS DISPATCHED BY THE ARGUMENTS
+        # pylint: disable=no-value-for-parameter
+        return TfProtocol(self), True
+
+    def _remove_blob_tmp(self, tmp_path: str, proto: TfProtocol, leave: bool):
+        if not leave:
+            proto.del_command(tmp_path)
+            return
+        # PIPELINE: [EXIT] + DEL + SUBSYSTEM, THEN COLLECT BOTH ANSWERS
+        if self.client.subsystem is not None:
+            self.client.send(TfProtocolMessage('EXIT', header_size=LONG_SIZE))
+            self.client.subsystem = None
+        self.client.send(TfProtocolMessage('DEL', tmp_path))
+        self.client.send(TfProtocolMessage(self.SUBSYSTEM_NAME))
+        self.client.recv(header_size=INT_SIZE)
+        # BACK IN THE SUBSYSTEM ONLY IF THE SERVER LET IT IN
+        if self.client.recv(header_size=INT_SIZE).status is StatusServerCode.OK:
+            self.client.subsystem = self.SUBSYSTEM_NAME
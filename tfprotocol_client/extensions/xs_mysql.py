@@ -12,16 +12,19 @@ from tfprotocol_client.misc.constants import (
     KEY_LEN_INTERVAL,
     LONG_SIZE,
 )
+from tfprotocol_client.extensions.xs_blob_stream import XSBlobStreamMixin
 from tfprotocol_client.extensions.xs_sql_super import XSSQLSuper
 from tfprotocol_client.models.proxy_options import ProxyOptions
 from tfprotocol_client.models.status_info import StatusInfo
 
 
-class XSMySQL(XSSQLSuper):
+class XSMySQL(XSSQLSuper, XSBlobStreamMixin):
     """Tranference Protocol API extension for MySQL.
     `XSSQLSuper`: The Abstract mother class of XS SQL like modules.
     """
 
+    SUBSYSTEM_NAME = 'XS_MYSQL'
+
     # pylint: disable=super-init-not-called
     @dispatch(TfProtocolSuper, verbosity_mode=False)
     def __init__(
@@ -103,7 +106,7 @@ class XSMySQL(XSSQLSuper):
         Args:
             `response_handler` (ResponseHandler): The function to handle the command response.
         """
-        response_handler(self.client.translate('XS_MYSQL'))
+        response_handler(self._enter_subsystem_as(self.SUBSYSTEM_NAME))
 
     def open_command(
         self,
@@ -172,6 +175,7 @@ class XSMySQL(XSSQLSuper):
         bd_table: str,
         filename: str,
         filepath: str,
+        response_handler: ResponseHandler = EMPTY_HANDLER,
     ):
         """Stores in the database represented by the handle “BD-ID” a file read from “FILEPATH”
         which name will be “FILENAME” the table “DB-TABLE”.
@@ -181,17 +185,21 @@ class XSMySQL(XSSQLSuper):
             `bd_table` (str): The database table to store the file.
             `filename` (str): The name of the file to store.
             `filepath` (str): The path to the file to store.
+            `response_handler` (ResponseHandler): The function to handle the command response.
         """
-        self.client.translate(
-            TfProtocolMessage(
-                'BLOBIN',
-                str(db_id),
-                bd_table,
-                filename,
-                filepath,
-                header_size=LONG_SIZE,
-            ),
-            parse_front_code_response=True,
+        self._invalidate_query_cache()
+        response_handler(
+            self.client.translate(
+                TfProtocolMessage(
+                    'BLOBIN',
+                    str(db_id),
+                    bd_table,
+                    filename,
+                    filepath,
+                    header_size=LONG_SIZE,
+                ),
+                parse_front_code_response=True,
+            )
         )
 
     def blobout_command(
@@ -200,6 +208,7 @@ class XSMySQL(XSSQLSuper):
         bd_table: str,
         filename: str,
         filepath: str,
+        response_handler: ResponseHandler = EMPTY_HANDLER,
     ):
         """Extracts from the database represented by the handle “BD-ID” a file which name is
         “FILENAME” from the table “DB-TABLE” to a file written to “FILEPATH”.
@@ -209,15 +218,18 @@ class XSMySQL(XSSQLSuper):
             `bd_table` (str): The database table to extract the file.
             `filename` (str): The name of the file to extract.
             `filepath` (str): The path to the file to extract.
+            `response_handler` (ResponseHandler): The function to handle the command response.
         """
-        self.client.translate(
-            TfProtocolMessage(
-                'BLOBOUT',
-                str(db_id),
-                bd_table,
-                filename,
-                filepath,
-                header_size=LONG_SIZE,
-            ),
-            parse_front_code_response=True,
+        response_handler(
+            self.client.translate(
+                TfProtocolMessage(
+                    'BLOBOUT',
+                    str(db_id),
+                    bd_table,
+                    filename,
+                    filepath,
+                    header_size=LONG_SIZE,
+                ),
+                parse_front_code_response=True,
+            )
         )
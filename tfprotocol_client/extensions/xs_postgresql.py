@@ -103,7 +103,7 @@ class XSPostgreSQL(XSSQLSuper):
         Args:
             `response_handler` (ResponseHandler): The function to handle the command response.
         """
-        response_handler(self.client.translate('XS_POSTGRESQL'))
+        response_handler(self._enter_subsystem_as('XS_POSTGRESQL'))
 
     def open_command(
         self,
@@ -0,0 +1,137 @@
+import re
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import List, Optional, Tuple, Union
+
+from tfprotocol_client.models.status_info import StatusInfo
+
+# Splits a query keeping the quoted literals and identifiers as single parts.
+_QUOTED_SPLIT = re.compile(r'(\'(?:[^\']|\'\')*\'|"(?:[^"]|"")*")')
+_WHITESPACES = re.compile(r'\s+')
+_READ_ONLY_VERBS = ('SELECT', 'VALUES', 'EXPLAIN')
+_WRITE_VERBS = re.compile(
+    r'\b(INSERT|UPDATE|DELETE|REPLACE|UPSERT|CREATE|DROP|ALTER|ATTACH|DETACH)\b'
+)
+
+
+class XSQueryCacheEntry:
+    """Cached answer of a read only query, rows are kept as the raw received frames."""
+
+    __slots__ = ('status', 'frames', 'size', 'expires_at')
+
+    def __init__(
+        self, status: StatusInfo, frames: Tuple[bytes, ...], expires_at: float
+    ) -> None:
+        self.status = status
+        self.frames = frames
+        self.size = sum(len(frame) for frame in frames) + len(status.payload)
+        self.expires_at = expires_at
+
+
+class XSQueryCache:
+    """Result cache for read only statements executed through `XSSQLSuper.exec_command`.
+    Entries are keyed by the database ID and the normalized SQL, they expire after
+    `ttl` seconds and the least recently used ones are evicted when the stored frames
+    exceed `max_bytes`.
+    """
+
+    def __init__(self, ttl: float = 5.0, max_bytes: int = 4 * 1024 * 1024) -> None:
+        """Query cache initialization.
+
+        Args:
+            `ttl` (float): Seconds a cached result remains valid.
+            `max_bytes` (int): Memory budget for the cached row frames.
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Tuple[str, str], XSQueryCacheEntry]' = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        """Bytes currently used by the cached frames."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def normalize_sql(sql_query: str) -> str:
+        """Collapse whitespaces outside of quoted literals and drop the trailing `;`."""
+        parts = _QUOTED_SPLIT.split(sql_query.strip())
+        for i in range(0, len(parts), 2):
+            parts[i] = _WHITESPACES.sub(' ', parts[i])
+        return ''.join(parts).rstrip('; ')
+
+    @staticmethod
+    def is_read_only(sql_query: str) -> bool:
+        """Whether every statement of the query only reads from the database."""
+        parts = _QUOTED_SPLIT.split(sql_query)
+        unquoted = ' '.join(parts[i] for i in range(0, len(parts), 2)).upper()
+        statements = [st.strip() for st in unquoted.split(';') if st.strip()]
+        if not statements:
+            return False
+        for statement in statements:
+            verb = statement.split(None, 1)[0]
+            if verb == 'WITH':
+                if _WRITE_VERBS.search(statement):
+                    return False
+            elif verb not in _READ_ONLY_VERBS:
+                return False
+        return True
+
+    def get(
+        self, db_id: Union[int, str], sql_query: str
+    ) -> Optional[XSQueryCacheEntry]:
+        """Retrieve a fresh cached result, if any."""
+        key = (str(db_id), self.normalize_sql(sql_query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= monotonic():
+                self._pop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(
+        self,
+        db_id: Union[int, str],
+        sql_query: str,
+        status: StatusInfo,
+        frames: List[bytes],
+    ):
+        """Store the result of a read only query."""
+        entry = XSQueryCacheEntry(status, tuple(frames), monotonic() + self.ttl)
+        if entry.size > self.max_bytes:
+            return
+        key = (str(db_id), self.normalize_sql(sql_query))
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = entry
+            self._size += entry.size
+            while self._size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def invalidate(self, db_id: Union[int, str, None] = None):
+        """Drop the cached results of a database, or all of them if `db_id` is None."""
+        with self._lock:
+            if db_id is None:
+                self._entries.clear()
+                self._size = 0
+                return
+            db_id = str(db_id)
+            for key in [key for key in self._entries if key[0] == db_id]:
+                self._pop(key)
+
+    def _pop(self, key: Tuple[str, str]):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.size
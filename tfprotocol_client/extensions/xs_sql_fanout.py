@@ -0,0 +1,169 @@
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from time import perf_counter
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+from tfprotocol_client.extensions.xs_sql_super import XSSQLSuper
+from tfprotocol_client.misc.constants import EMPTY_HANDLER
+from tfprotocol_client.models.status_info import StatusInfo
+
+ShardRowsHandler = Callable[[int, list], None]
+ShardResponseHandler = Callable[[int, StatusInfo], None]
+
+# Sentinel pushed by a shard worker when its row stream is exhausted.
+_SHARD_DONE = object()
+
+
+class ShardResult:
+    """Outcome and timing of a query executed on a single shard."""
+
+    def __init__(
+        self,
+        index: int,
+        db_id: Union[int, str],
+        status: Optional[StatusInfo] = None,
+        rows: int = 0,
+        elapsed: float = 0.0,
+        first_row_elapsed: Optional[float] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        self.index = index
+        self.db_id = db_id
+        self.status = status
+        self.rows = rows
+        self.elapsed = elapsed
+        self.first_row_elapsed = first_row_elapsed
+        self.error = error
+
+    def __str__(self) -> str:
+        return (
+            f'ShardResult<{self.index}, {self.db_id}, rows={self.rows}, '
+            f'elapsed={self.elapsed:.6f}, error={self.error}>'
+        )
+
+    __repr__ = __str__
+
+
+class XSSQLFanOut:
+    """Runs the same SQL statement against several XS SQL like sessions concurrently
+    and merges their row streams. Every shard is a pair made by a connected session
+    (already inside its subsystem) and the ID of a database opened on it, each session
+    is driven by its own worker thread because a connection cannot be shared between
+    concurrent commands.
+    """
+
+    def __init__(
+        self,
+        shards: Sequence[Tuple[XSSQLSuper, Union[int, str]]],
+    ) -> None:
+        """Fan-out executor initialization.
+
+        Args:
+            `shards` (Sequence[Tuple[XSSQLSuper, int | str]]): The sessions and the
+                database IDs where the queries are going to be executed.
+        """
+        self._shards: List[Tuple[XSSQLSuper, Union[int, str]]] = list(shards)
+
+    @property
+    def shards(self) -> List[Tuple[XSSQLSuper, Union[int, str]]]:
+        return self._shards
+
+    def exec_command(
+        self,
+        sql_query: str,
+        rows_handler: ShardRowsHandler = EMPTY_HANDLER,
+        response_handler: ShardResponseHandler = EMPTY_HANDLER,
+        ordered: bool = False,
+    ) -> List[ShardResult]:
+        """Executes an SQL-Query in every shard at the same time. Rows are handed to the
+        `rows_handler` from the calling thread, so the handler does not need to be thread
+        safe.
+
+        Args:
+            `sql_query` (str): The SQL query to be executed.
+            `rows_handler` ((int, list) -> None): The function to handle each row, it
+                receives the index of the shard and the row itself.
+            `response_handler` ((int, StatusInfo) -> None): The function to handle the
+                command response of each shard.
+            `ordered` (bool): If True the rows are merged shard by shard in the order the
+                shards were given (later shards are buffered while they wait their turn),
+                otherwise the rows are delivered as soon as any shard produces them.
+
+        Returns:
+            List[ShardResult]: Status, row count and timing for every shard.
+        """
+        results = [ShardResult(i, db_id) for i, (_, db_id) in enumerate(self._shards)]
+        if not results:
+            return results
+        rows_queue: Queue = Queue()
+
+        def run_shard(index: int, session: XSSQLSuper, db_id: Union[int, str]):
+            result = results[index]
+            start = perf_counter()
+
+            def on_rows(row: list):
+                if result.first_row_elapsed is None:
+                    result.first_row_elapsed = perf_counter() - start
+                rows_queue.put((index, row))
+
+            def on_response(status: StatusInfo):
+                result.status = status
+                rows_queue.put((index, status))
+
+            try:
+                session.exec_command(
+                    db_id,
+                    sql_query,
+                    response_handler=on_response,
+                    rows_handler=on_rows,
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                result.error = e
+            finally:
+                result.elapsed = perf_counter() - start
+                rows_queue.put((index, _SHARD_DONE))
+
+        with ThreadPoolExecutor(
+            max_workers=len(self._shards), thread_name_prefix='xs_fanout'
+        ) as executor:
+            for index, (session, db_id) in enumerate(self._shards):
+                executor.submit(run_shard, index, session, db_id)
+            self._merge(rows_queue, results, rows_handler, response_handler, ordered)
+        return results
+
+    def _merge(
+        self,
+        rows_queue: Queue,
+        results: List[ShardResult],
+        rows_handler: ShardRowsHandler,
+        response_handler: ShardResponseHandler,
+        ordered: bool,
+    ):
+        pending: List[list] = [[] for _ in results]
+        done = [False] * len(results)
+        cursor = 0
+        remaining = len(results)
+
+        def deliver(index: int, item):
+            if isinstance(item, StatusInfo):
+                response_handler(index, item)
+            else:
+                results[index].rows += 1
+                rows_handler(index, item)
+
+        while remaining:
+            index, item = rows_queue.get()
+            if item is _SHARD_DONE:
+                done[index] = True
+                remaining -= 1
+            elif not ordered or index == cursor:
+                deliver(index, item)
+            else:
+                pending[index].append(item)
+            # FLUSH THE SHARDS WHOSE TURN ARRIVED
+            while ordered and cursor < len(results) and done[cursor]:
+                cursor += 1
+                if cursor < len(results):
+                    for buffered in pending[cursor]:
+                        deliver(cursor, buffered)
+                    pending[cursor].clear()
@@ -1,4 +1,5 @@
-from typing import Callable, Union
+from typing import Callable, List, Optional, Union
+from tfprotocol_client.extensions.xs_sql_cache import XSQueryCache
 from tfprotocol_client.models.status_server_code import StatusServerCode
 from tfprotocol_client.tfprotocol_super import TfProtocolSuper
 from tfprotocol_client.models.message import TfProtocolMessage
@@ -11,6 +12,7 @@ from tfprotocol_client.misc.constants import (
     KEY_LEN_INTERVAL,
     LONG_SIZE,
 )
+from tfprotocol_client.misc.metrics import timed_command
 from tfprotocol_client.models.proxy_options import ProxyOptions
 from tfprotocol_client.models.status_info import StatusInfo
 
@@ -20,6 +22,8 @@ class XSSQLSuper(TfProtocolSuper):
     `TfProtocolSuper`: The Abstract mother class of Tranference Protocol API.
     """
 
+    _query_cache: Optional[XSQueryCache] = None
+
     def __init__(
         self,
         protocol_version: str,
@@ -63,6 +67,45 @@ class XSSQLSuper(TfProtocolSuper):
             verbosity_mode=verbosity_mode,
         )
 
+    @property
+    def query_cache(self) -> Optional[XSQueryCache]:
+        """Gets the result cache for read only queries, None if it is disabled.
+
+        Returns:
+            Optional[XSQueryCache]: `query_cache`
+        """
+        return self._query_cache
+
+    def enable_query_cache(
+        self, ttl: float = 5.0, max_bytes: int = 4 * 1024 * 1024
+    ) -> XSQueryCache:
+        """Enables the result cache for read only statements issued with `exec_command`.
+        Any write statement issued through this instance invalidates the cache.
+
+        Args:
+            `ttl` (float): Seconds a cached result remains valid.
+            `max_bytes` (int): Memory budget for the cached rows.
+
+        Returns:
+            XSQueryCache: The enabled cache.
+        """
+        self._query_cache = XSQueryCache(ttl=ttl, max_bytes=max_bytes)
+        return self._query_cache
+
+    def disable_query_cache(self):
+        """Disables and drops the result cache for read only statements."""
+        self._query_cache = None
+
+    def _enter_subsystem_as(self, name: str) -> StatusInfo:
+        response = self.client.translate(name)
+        if response.status is StatusServerCode.OK:
+            self.client.subsystem = name
+        return response
+
+    def _invalidate_query_cache(self, db_id: Union[int, str, None] = None):
+        if self._query_cache is not None:
+            self._query_cache.invalidate(db_id)
+
     def close_command(
         self,
         db_id: Union[int, str],
@@ -75,6 +118,8 @@ class XSSQLSuper(TfProtocolSuper):
             `db_id` (int,str): The ID of the database to be closed.
             `response_handler` (ResponseHandler): The function to handle the command response.
         """
+        # THE HANDLE COULD BE REUSED BY ANOTHER DATABASE
+        self._invalidate_query_cache(db_id)
         response_handler(
             self.client.translate(
                 TfProtocolMessage('CLOSE', str(db_id), header_size=LONG_SIZE),
@@ -82,6 +127,7 @@ class XSSQLSuper(TfProtocolSuper):
             )
         )
 
+    @timed_command('EXEC')
     def exec_command(
         self,
         db_id: Union[int, str],
@@ -90,12 +136,25 @@ class XSSQLSuper(TfProtocolSuper):
         rows_handler: Callable[[list], None] = EMPTY_HANDLER,
     ):
         """Executes an SQL-Query in the database represented by the specified handle in “DB-ID”.
+        If the query cache is enabled, read only queries are answered from it when possible.
 
         Args:
             `db_id` (int, str): The ID of the database to execute the query.
             `sql_query` (str): The SQL query to be executed.
             `response_handler` (ResponseHandler): The function to handle the command response.
+            `rows_handler` (Callable[[list], None]): The function to handle each row.
         """
+        cache = self._query_cache
+        cacheable = cache is not None and XSQueryCache.is_read_only(sql_query)
+        if cacheable:
+            entry = cache.get(db_id, sql_query)
+            if entry is not None:
+                response_handler(entry.status)
+                for frame in entry.frames:
+                    rows_handler(frame.split(b'@@'))
+                return
+        elif cache is not None:
+            cache.invalidate()
         resp: StatusInfo = self.client.translate(
             TfProtocolMessage('EXEC', str(db_id), sql_query, header_size=LONG_SIZE),
             parse_front_code_response=True,
@@ -103,13 +162,26 @@ class XSSQLSuper(TfProtocolSuper):
         response_handler(resp)
         if resp.status != StatusServerCode.OK:
             return
+        frames: List[bytes] = []
+        frames_size = 0
         header = -1
         while True:
             header = self.client.just_recv_int(size=LONG_SIZE)
             if header <= 0:
                 break
-            data = self.client.just_recv(size=header)
-            rows_handler(data.split(b'@@'))
+            # THE ROWS ARE bytes WHETHER THEY COME FROM THE SERVER OR THE CACHE
+            frame = bytes(self.client.just_recv(size=header))
+            if cacheable:
+                frames_size += len(frame)
+                if frames_size <= cache.max_bytes:
+                    frames.append(frame)
+                else:
+                    # TOO BIG TO BE CACHED, STOP COLLECTING
+                    cacheable = False
+                    frames = []
+            rows_handler(frame.split(b'@@'))
+        if cacheable:
+            cache.put(db_id, sql_query, resp, frames)
 
     def execof_command(
         self,
@@ -127,6 +199,8 @@ class XSSQLSuper(TfProtocolSuper):
             `sql_query` (str): The SQL query to be executed.
             `response_handler` (ResponseHandler): The function to handle the command response.
         """
+        if not XSQueryCache.is_read_only(sql_query):
+            self._invalidate_query_cache()
         response_handler(
             self.client.translate(
                 TfProtocolMessage(
@@ -146,6 +220,7 @@ class XSSQLSuper(TfProtocolSuper):
         self.client.send(
             TfProtocolMessage('EXIT', header_size=LONG_SIZE),
         )
+        self.client.subsystem = None
 
     def terminate_command(self):
         """Exits the XS_SQL like module, unlike EXIT command, freeing the previously allocated
@@ -154,4 +229,6 @@ class XSSQLSuper(TfProtocolSuper):
         Now you are in the main command interface of the TF PROTOCOL. You may enter the subsystem
         again by using the XS_SQL like command.
         """
+        self._invalidate_query_cache()
         self.client.send('TERMINATE', header_size=LONG_SIZE)
+        self.client.subsystem = None
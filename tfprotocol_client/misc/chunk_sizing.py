@@ -0,0 +1,150 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+from threading import Lock
+from time import perf_counter
+from typing import Optional, Union
+
+from tfprotocol_client.misc.constants import (
+    DFLT_MAX_BUFFER_SIZE,
+    MAX_ADAPTIVE_BUFFER_SIZE,
+    MIN_ADAPTIVE_BUFFER_SIZE,
+)
+
+# Relative change of the throughput considered a real improvement or degradation.
+DFLT_THROUGHPUT_TOLERANCE = 0.1
+
+
+class AdaptiveChunkSize:
+    """Chunk size of the transferences tuned by their measured throughput. The size is
+    doubled while the throughput of a measurement window improves and halved back when
+    it degrades, within the limits granted by the server for the current transference.
+    Pass an instance as the `buffer_size` of GET, PUT, GETCAN and PUTCAN, the same
+    instance can be reused (and keeps learning) across transferences and sessions.
+    """
+
+    def __init__(
+        self,
+        initial: int = DFLT_MAX_BUFFER_SIZE,
+        minimum: int = MIN_ADAPTIVE_BUFFER_SIZE,
+        maximum: int = MAX_ADAPTIVE_BUFFER_SIZE,
+        window: float = 0.05,
+        tolerance: float = DFLT_THROUGHPUT_TOLERANCE,
+    ) -> None:
+        """Adaptive chunk size initialization.
+
+        Args:
+            `initial` (int): Chunk size of the first measurement window.
+            `minimum` (int): Smallest chunk size proposed.
+            `maximum` (int): Biggest chunk size proposed.
+            `window` (float): Seconds of transference measured before each decision.
+            `tolerance` (float): Relative change of the throughput ignored as noise.
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.window = window
+        self.tolerance = tolerance
+        self.size: int = max(minimum, min(initial, maximum))
+        self.throughput: float = 0.0
+        self._grow = True
+        self._bytes = 0
+        self._elapsed = 0.0
+        self._lock = Lock()
+
+    def propose(self, granted: Optional[int] = None) -> int:
+        """The chunk size to be used now. Without `granted` a new transference is
+        starting and the size is the one to request to the server, with it the size is
+        capped by the buffer the server granted. The grant only caps the returned size,
+        so the transferences sharing the instance do not cap each other.
+        """
+        with self._lock:
+            if granted is not None and granted > 0:
+                return min(self.size, granted)
+            return self.size
+
+    def record(
+        self,
+        chunk_size: int,
+        nbytes: int,
+        seconds: float,
+        granted: Optional[int] = None,
+    ):
+        """Accounts the transference of `nbytes` in chunks of `chunk_size` bytes, under
+        the buffer `granted` by the server. The measurements made with another size than
+        the current one, older or capped by a smaller grant, are discarded.
+        """
+        with self._lock:
+            if chunk_size != self.size:
+                return
+            self._bytes += nbytes
+            self._elapsed += seconds
+            if self._elapsed < self.window:
+                return
+            throughput = self._bytes / self._elapsed
+            self._bytes, self._elapsed = 0, 0.0
+            if not self.throughput or throughput > self.throughput * (1 + self.tolerance):
+                # FIRST MEASUREMENT OR BETTER: KEEP MOVING IN THE SAME DIRECTION
+                self._step(granted)
+            elif throughput < self.throughput * (1 - self.tolerance):
+                # WORSE: UNDO THE LAST STEP
+                self._grow = not self._grow
+                self._step(granted)
+            self.throughput = throughput
+
+    def _step(self, granted: Optional[int]):
+        limit = min(self.maximum, granted) if granted and granted > 0 else self.maximum
+        size = self.size * 2 if self._grow else self.size // 2
+        size = max(self.minimum, min(size, limit))
+        if size == self.size:
+            # A LIMIT WAS REACHED, EXPLORE THE OTHER DIRECTION NEXT TIME
+            self._grow = not self._grow
+        self.size = size
+
+    def timer(self, granted: Optional[int] = None) -> 'ChunkTimer':
+        """Measures a transference under the buffer `granted` by the server."""
+        return ChunkTimer(self, granted)
+
+    def copy(self) -> 'AdaptiveChunkSize':
+        """A new instance with the same settings, starting from the current size."""
+        with self._lock:
+            return AdaptiveChunkSize(
+                self.size, self.minimum, self.maximum, self.window, self.tolerance
+            )
+
+    def __str__(self) -> str:
+        return (
+            f'AdaptiveChunkSize<size={self.size}, '
+            f'throughput={self.throughput:.0f} B/s>'
+        )
+
+    __repr__ = __str__
+
+
+class ChunkTimer:
+    """Measures the chunks of a transference for an `AdaptiveChunkSize`, keeping the
+    buffer granted by the server to that transference.
+    """
+
+    __slots__ = ('sizer', 'granted', 'start')
+
+    def __init__(self, sizer: AdaptiveChunkSize, granted: Optional[int] = None) -> None:
+        self.sizer = sizer
+        self.granted = granted
+        self.start = perf_counter()
+
+    def propose(self) -> int:
+        """The chunk size to be used now by the transference."""
+        return self.sizer.propose(self.granted)
+
+    def lap(self, chunk_size: int, nbytes: int):
+        """Records a chunk transferred since the previous lap."""
+        now = perf_counter()
+        self.sizer.record(chunk_size, nbytes, now - self.start, self.granted)
+        self.start = now
+
+
+def requested_size(buffer_size: Union[int, AdaptiveChunkSize]) -> int:
+    """The buffer size to request to the server for a transference."""
+    if isinstance(buffer_size, AdaptiveChunkSize):
+        return buffer_size.propose()
+    return buffer_size
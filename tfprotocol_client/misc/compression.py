@@ -0,0 +1,295 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import io
+import sys
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Union
+
+from tfprotocol_client.models.exceptions import TfException
+
+# Marks the start of a compressed object, followed by the length of the codec name and
+# the name itself.
+COMPRESSION_MAGIC = b'TFZ\x01'
+# Bytes of the source read at once to be compressed.
+DFLT_COMPRESSION_CHUNK = 64 * 1024
+
+
+class CompressionCodec(ABC):
+    """Compression algorithm of the uploads and downloads. A codec builds compressor and
+    decompressor objects with the interface of the ones from `zlib`, `bz2` and `lzma`:
+    `compress(data)`/`flush()` and `decompress(data)`/`flush()`. Register new codecs
+    with `register_codec` so the downloads can find them by the name in the header.
+    """
+
+    name: str = ''
+
+    @abstractmethod
+    def compressor(self):
+        """A new compressor object, with `compress(data)` and `flush()`."""
+
+    @abstractmethod
+    def decompressor(self):
+        """A new decompressor object, with `decompress(data)` and `flush()`."""
+
+    def __str__(self) -> str:
+        return f'{type(self).__name__}<{self.name}>'
+
+    __repr__ = __str__
+
+
+class ZlibCodec(CompressionCodec):
+    """Deflate compression in the zlib format."""
+
+    name = 'zlib'
+    wbits = zlib.MAX_WBITS
+
+    def __init__(self, level: int = 6) -> None:
+        self.level = level
+
+    def compressor(self):
+        return zlib.compressobj(self.level, zlib.DEFLATED, self.wbits)
+
+    def decompressor(self):
+        return zlib.decompressobj(self.wbits)
+
+
+class GzipCodec(ZlibCodec):
+    """Deflate compression in the gzip format."""
+
+    name = 'gzip'
+    wbits = zlib.MAX_WBITS | 16
+
+
+CODECS: Dict[str, CompressionCodec] = {}
+
+
+def register_codec(codec: CompressionCodec):
+    """Makes the objects compressed with `codec` readable by the downloads."""
+    CODECS[codec.name] = codec
+
+
+register_codec(ZlibCodec())
+register_codec(GzipCodec())
+
+
+def compression_header(codec: CompressionCodec) -> bytes:
+    """The header stored before the data of an object compressed with `codec`."""
+    name = codec.name.encode('ascii')
+    return COMPRESSION_MAGIC + bytes((len(name),)) + name
+
+
+class CompressingReader:
+    """Readable stream with the compressed object of the data read from `source`, the
+    data is compressed chunk by chunk while it is read. It can seek forward (and back
+    to the start when `source` is seekable) by compressing again, so an interrupted
+    upload can be resumed from the offset stored in the server.
+    """
+
+    def __init__(
+        self,
+        source: io.BytesIO,
+        codec: CompressionCodec,
+        chunk_size: int = DFLT_COMPRESSION_CHUNK,
+    ) -> None:
+        """Compressing reader initialization.
+
+        Args:
+            `source` (BytesIO): Stream open in read mode with the data to compress.
+            `codec` (CompressionCodec): The compression algorithm.
+            `chunk_size` (int): Bytes of the source compressed at once.
+        """
+        self.source = source
+        self.codec = codec
+        self.chunk_size = chunk_size
+        try:
+            self._start: Optional[int] = source.tell()
+        except (AttributeError, OSError):
+            self._start = None
+        self._compressor = codec.compressor()
+        self._pending = bytearray(compression_header(codec))
+        self._position = 0
+        self._eof = False
+        self.read_bytes = 0
+
+    def _restart(self):
+        self._compressor = self.codec.compressor()
+        self._pending = bytearray(compression_header(self.codec))
+        self._position = 0
+        self._eof = False
+        self.read_bytes = 0
+
+    def _fill(self, size: int):
+        while len(self._pending) < size and not self._eof:
+            data = self.source.read(self.chunk_size)
+            if data:
+                self.read_bytes += len(data)
+                self._pending += self._compressor.compress(data)
+            else:
+                self._pending += self._compressor.flush()
+                self._eof = True
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = sys.maxsize
+        self._fill(size)
+        data = bytes(self._pending[:size])
+        del self._pending[:size]
+        self._position += len(data)
+        return data
+
+    def readinto(self, view: memoryview) -> int:
+        self._fill(len(view))
+        nbytes = min(len(view), len(self._pending))
+        view[:nbytes] = self._pending[:nbytes]
+        del self._pending[:nbytes]
+        self._position += nbytes
+        return nbytes
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Moves to `offset` of the compressed object, only from its start."""
+        if whence != io.SEEK_SET:
+            raise io.UnsupportedOperation('compressed streams seek from the start')
+        if offset < self._position:
+            if self._start is None:
+                raise io.UnsupportedOperation('the source stream is not seekable')
+            self.source.seek(self._start)
+            self._restart()
+        while self._position < offset and self.read(
+            min(offset - self._position, self.chunk_size)
+        ):
+            pass
+        return self._position
+
+
+class DecompressingWriter:
+    """Writable stream that decompresses the compressed object written to it into
+    `sink`. The codec is the one named by the header of the object.
+    """
+
+    def __init__(
+        self, sink: io.BytesIO, codec: Optional[CompressionCodec] = None
+    ) -> None:
+        """Decompressing writer initialization.
+
+        Args:
+            `sink` (BytesIO): Stream open in write mode receiving the data.
+            `codec` (CompressionCodec): Codec used when the header names it, besides
+                the registered ones.
+        """
+        self.sink = sink
+        self.codec = codec
+        self.written_bytes = 0
+        self._header = bytearray()
+        self._decompressor = None
+        self._position = 0
+
+    def _codec(self, name: str) -> CompressionCodec:
+        if self.codec is not None and self.codec.name == name:
+            return self.codec
+        if name not in CODECS:
+            raise TfException(message=f'Unknown compression codec: {name}')
+        return CODECS[name]
+
+    def _read_header(self, data: Union[bytes, memoryview]) -> memoryview:
+        # THE HEADER MAY ARRIVE SPLIT IN SEVERAL CHUNKS
+        self._header += data
+        prefix = len(COMPRESSION_MAGIC) + 1
+        if len(self._header) < prefix:
+            return memoryview(b'')
+        if self._header[: len(COMPRESSION_MAGIC)] != COMPRESSION_MAGIC:
+            raise TfException(message='The data is not a compressed object')
+        end = prefix + self._header[prefix - 1]
+        if len(self._header) < end:
+            return memoryview(b'')
+        name = self._header[prefix:end].decode('ascii')
+        self._decompressor = self._codec(name).decompressor()
+        rest = memoryview(bytes(self._header[end:]))
+        self._header.clear()
+        return rest
+
+    def write(self, data: Union[bytes, memoryview]) -> int:
+        nbytes = len(data)
+        self._position += nbytes
+        if self._decompressor is None:
+            data = self._read_header(data)
+            if self._decompressor is None:
+                return nbytes
+        try:
+            self._output(self._decompressor.decompress(data))
+        except (zlib.error, OSError, ValueError) as e:
+            raise TfException(message='Corrupted compressed data', exception=e)
+        return nbytes
+
+    def _output(self, data: bytes):
+        if data:
+            self.sink.write(data)
+            self.written_bytes += len(data)
+
+    @property
+    def complete(self) -> bool:
+        """Whether the whole compressed object was written."""
+        return self._decompressor is not None and getattr(
+            self._decompressor, 'eof', True
+        )
+
+    def finish(self) -> bool:
+        """Writes the data left in the decompressor.
+
+        Returns:
+            bool: Whether the whole compressed object was written, an interrupted
+                transference leaves in the sink only the data decompressed so far.
+        """
+        if self._decompressor is None:
+            return False
+        try:
+            self._output(self._decompressor.flush())
+        except (zlib.error, OSError, ValueError) as e:
+            raise TfException(message='Corrupted compressed data', exception=e)
+        return self.complete
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Only the start of the compressed object can be sought."""
+        if whence != io.SEEK_SET or offset != self._position:
+            raise io.UnsupportedOperation('compressed objects are written in order')
+        return self._position
+
+
+def compressed(
+    stream: io.BytesIO, codec: Optional[CompressionCodec]
+) -> Union[io.BytesIO, CompressingReader]:
+    """`stream` compressed with `codec`, itself if there is no codec."""
+    return CompressingReader(stream, codec) if codec is not None else stream
+
+
+def decompressed(
+    sink: io.BytesIO, codec: Optional[CompressionCodec]
+) -> Union[io.BytesIO, DecompressingWriter]:
+    """A writer decompressing into `sink` if there is a codec, `sink` otherwise."""
+    return DecompressingWriter(sink, codec) if codec is not None else sink
+
+
+def finish_decompression(sink: Union[io.BytesIO, DecompressingWriter]) -> bool:
+    """Flushes `sink` if it is decompressing, False if its object is incomplete."""
+    if isinstance(sink, DecompressingWriter):
+        return sink.finish()
+    return True
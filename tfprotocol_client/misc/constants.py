@@ -8,6 +8,20 @@ BYTE_SIZE = 1
 
 DFLT_MAX_BUFFER_SIZE = 8 * 1024  # 512 * 1024
 DFLT_HEADER_SIZE = INT_SIZE
+# Buffer size of the transferences made by the synchronization helpers
+DFLT_SYNC_BUFFER_SIZE = 64 * 1024
+# Seconds between the progress reports of the transferences
+DFLT_PROGRESS_INTERVAL = 0.5
+# Bounds of the buffer sizes proposed by the adaptive chunk sizing
+MIN_ADAPTIVE_BUFFER_SIZE = 4 * 1024
+MAX_ADAPTIVE_BUFFER_SIZE = 4 * 1024 * 1024
+# Keystreams of the transferences computed ahead by a background thread (0 disables it)
+DFLT_CRYPTO_PIPELINE_DEPTH = 4
+# Bytes of keystream computed ahead by the keystream buffers of a session
+DFLT_KEYSTREAM_BUFFER_SIZE = 16 * 1024
+
+# Milliseconds between the starts of the parallel connection attempts (RFC 8305)
+DFLT_CONNECT_ATTEMPT_DELAY = 250
 
 # Key len interval in bytes
 KEY_LEN_INTERVAL = (16, 40)
@@ -2,14 +2,18 @@
 # email: lagcleaner@gmail.com
 
 from io import BytesIO
-from typing import Callable
+from typing import Callable, Union
 
 from tfprotocol_client.connection.codes_sender_recvr import CodesSenderRecvr
 from tfprotocol_client.connection.protocol_client import ProtocolClient
 from tfprotocol_client.models.status_info import StatusInfo
+from tfprotocol_client.models.transfer_progress import TransferProgress
 from tfprotocol_client.models.transfer_state import TransferStatus
 
 ResponseHandler = Callable[[StatusInfo], None]
 SendRecvFileHandler = Callable[[bool, str, StatusInfo, BytesIO], None]
 TransferHandler = Callable[[ProtocolClient, TransferStatus], None]
 TransferAsyncHandler = Callable[[CodesSenderRecvr], None]
+ProgressHandler = Callable[[TransferProgress], None]
+# Destination of a received stream: a writable stream or a function called per chunk
+DataSink = Union[BytesIO, Callable[[memoryview], None]]
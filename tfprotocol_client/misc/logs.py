@@ -0,0 +1,79 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import logging
+from threading import Lock
+from typing import Optional
+
+LOGGER_NAME = 'tfprotocol_client'
+
+# Per subsystem loggers, all of them children of the library logger.
+client_logger = logging.getLogger(f'{LOGGER_NAME}.client')
+commands_logger = logging.getLogger(f'{LOGGER_NAME}.commands')
+keepalive_logger = logging.getLogger(f'{LOGGER_NAME}.keepalive')
+
+_library_logger = logging.getLogger(LOGGER_NAME)
+_library_logger.addHandler(logging.NullHandler())
+_tracing_handler: Optional[logging.Handler] = None
+# CLIENTS IN VERBOSITY MODE, THE TRACING THEY ENABLED LASTS WHILE ANY OF THEM IS OPEN
+_verbose_lock = Lock()
+_verbose_clients = 0
+_verbose_tracing = False
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """Logger of a subsystem of the library (client, commands, keepalive, ...)."""
+    return logging.getLogger(f'{LOGGER_NAME}.{subsystem}')
+
+
+def enable_tracing(
+    level: int = logging.DEBUG, handler: Optional[logging.Handler] = None
+):
+    """Shows the traces of the library, it is what the `verbosity_mode` flag does. Users
+    with their own logging configuration only need to enable the `tfprotocol_client`
+    loggers they care about instead.
+
+    Args:
+        `level` (int): The minimum level of the traces shown.
+        `handler` (logging.Handler, optional): Where the traces go, defaults to stderr.
+    """
+    global _tracing_handler  # pylint: disable=global-statement
+    if _tracing_handler is None:
+        _tracing_handler = handler or logging.StreamHandler()
+        _tracing_handler.setFormatter(
+            logging.Formatter('%(asctime)s %(name)s %(threadName)s: %(message)s')
+        )
+        _library_logger.addHandler(_tracing_handler)
+    _library_logger.setLevel(level)
+
+
+def disable_tracing():
+    """Removes the handler installed by `enable_tracing`."""
+    global _tracing_handler  # pylint: disable=global-statement
+    if _tracing_handler is not None:
+        _library_logger.removeHandler(_tracing_handler)
+        _tracing_handler = None
+    _library_logger.setLevel(logging.NOTSET)
+
+
+def hold_tracing():
+    """Enables the tracing for a client in `verbosity_mode` until it calls
+    `release_tracing`. The tracing is disabled when the last of those clients releases
+    it, unless it was already enabled (by the user) when the first one held it.
+    """
+    global _verbose_clients, _verbose_tracing  # pylint: disable=global-statement
+    with _verbose_lock:
+        if _verbose_clients == 0 and _tracing_handler is None:
+            enable_tracing()
+            _verbose_tracing = True
+        _verbose_clients += 1
+
+
+def release_tracing():
+    """Releases the tracing held with `hold_tracing`."""
+    global _verbose_clients, _verbose_tracing  # pylint: disable=global-statement
+    with _verbose_lock:
+        _verbose_clients = max(_verbose_clients - 1, 0)
+        if _verbose_clients == 0 and _verbose_tracing:
+            disable_tracing()
+            _verbose_tracing = False
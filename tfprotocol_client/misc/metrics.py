@@ -0,0 +1,233 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import re
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from threading import Lock, local
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Upper bounds (in seconds) of the latency histogram buckets.
+DFLT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+_VERB = re.compile(rb'[A-Z][A-Z0-9_]{0,31}')
+
+
+class LatencyHistogram:
+    """Cumulative histogram of durations, Prometheus style."""
+
+    __slots__ = ('bounds', 'buckets', 'count', 'sum')
+
+    def __init__(self, bounds: Sequence[float] = DFLT_LATENCY_BUCKETS) -> None:
+        self.bounds: Tuple[float, ...] = tuple(bounds)
+        self.buckets: List[int] = [0] * (len(self.bounds) + 1)
+        self.count: int = 0
+        self.sum: float = 0.0
+
+    def observe(self, seconds: float):
+        self.buckets[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        """Pairs (upper bound, observations lower or equal) including `+Inf`."""
+        total = 0
+        for bound, amount in zip(self.bounds + (float('inf'),), self.buckets):
+            total += amount
+            yield ('+Inf' if bound == float('inf') else repr(bound)), total
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': dict(self.cumulative()),
+        }
+
+
+class Metrics:
+    """Metrics hook for the protocol clients. It records the latency of every command
+    (keyed by its verb), the bytes sent and received, the CPU time spent encrypting and
+    decrypting and the duration of the connection handshakes and session key renewals
+    (NIGMA). Assign an instance to the
+    `metrics` attribute of a protocol (before connecting) to enable it, the same instance
+    can be shared by several connections.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DFLT_LATENCY_BUCKETS) -> None:
+        """Metrics initialization.
+
+        Args:
+            `buckets` (Sequence[float]): Upper bounds (in seconds) of the latency
+                histograms buckets.
+        """
+        self._buckets = tuple(buckets)
+        self._lock = Lock()
+        self._local = local()
+        self.reset()
+
+    def reset(self):
+        """Discards everything recorded so far."""
+        with self._lock:
+            self.commands: Dict[str, LatencyHistogram] = {}
+            self.errors: Dict[str, int] = {}
+            self.handshake = LatencyHistogram(self._buckets)
+            self.rekey = LatencyHistogram(self._buckets)
+            self.bytes_sent: int = 0
+            self.bytes_received: int = 0
+            self.crypto_seconds: float = 0.0
+
+    @staticmethod
+    def verb_of(payload: bytes) -> str:
+        """The command verb of a request payload, `OTHER` if it does not have one."""
+        match = _VERB.match(payload)
+        if match is None or (len(payload) > match.end() and payload[match.end()] != 32):
+            return 'OTHER'
+        return match.group().decode()
+
+    def observe_command(self, verb: str, seconds: float, failed: bool = False):
+        with self._lock:
+            histogram = self.commands.get(verb)
+            if histogram is None:
+                histogram = self.commands[verb] = LatencyHistogram(self._buckets)
+            histogram.observe(seconds)
+            if failed:
+                self.errors[verb] = self.errors.get(verb, 0) + 1
+
+    def observe_handshake(self, seconds: float):
+        with self._lock:
+            self.handshake.observe(seconds)
+
+    def observe_rekey(self, seconds: float):
+        with self._lock:
+            self.rekey.observe(seconds)
+
+    def add_sent(self, amount: int):
+        with self._lock:
+            self.bytes_sent += amount
+
+    def add_received(self, amount: int):
+        with self._lock:
+            self.bytes_received += amount
+
+    def add_crypto_time(self, seconds: float):
+        with self._lock:
+            self.crypto_seconds += seconds
+
+    @property
+    def in_command(self) -> bool:
+        """Whether the current thread is running a command already being timed."""
+        return getattr(self._local, 'depth', 0) > 0
+
+    @contextmanager
+    def command(self, verb: str):
+        """Times the enclosed block as the command `verb`, the requests made inside it
+        are not timed on their own.
+        """
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
+        failed = True
+        start = perf_counter()
+        try:
+            yield
+            failed = False
+        finally:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                self.observe_command(verb, perf_counter() - start, failed)
+
+    @contextmanager
+    def untimed(self):
+        """The requests made inside the enclosed block are not timed as commands."""
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+
+    def snapshot(self) -> dict:
+        """Copy of the current values as plain python objects."""
+        with self._lock:
+            return {
+                'commands': {
+                    verb: histogram.to_dict()
+                    for verb, histogram in sorted(self.commands.items())
+                },
+                'errors': dict(self.errors),
+                'handshake': self.handshake.to_dict(),
+                'rekey': self.rekey.to_dict(),
+                'bytes_sent': self.bytes_sent,
+                'bytes_received': self.bytes_received,
+                'crypto_seconds': self.crypto_seconds,
+            }
+
+    def to_prometheus(self, prefix: str = 'tfprotocol') -> str:
+        """Current values in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = [
+            f'# HELP {prefix}_command_duration_seconds Latency of the commands.',
+            f'# TYPE {prefix}_command_duration_seconds histogram',
+        ]
+        for verb, histogram in snapshot['commands'].items():
+            lines.extend(
+                _prometheus_histogram(
+                    f'{prefix}_command_duration_seconds', histogram, f'verb="{verb}"'
+                )
+            )
+        lines.append(f'# HELP {prefix}_command_errors_total Commands that raised.')
+        lines.append(f'# TYPE {prefix}_command_errors_total counter')
+        for verb, amount in sorted(snapshot['errors'].items()):
+            lines.append(f'{prefix}_command_errors_total{{verb="{verb}"}} {amount}')
+        lines.append(f'# HELP {prefix}_handshake_duration_seconds Connection handshakes.')
+        lines.append(f'# TYPE {prefix}_handshake_duration_seconds histogram')
+        lines.extend(
+            _prometheus_histogram(
+                f'{prefix}_handshake_duration_seconds', snapshot['handshake']
+            )
+        )
+        lines.append(f'# HELP {prefix}_rekey_duration_seconds Session key renewals.')
+        lines.append(f'# TYPE {prefix}_rekey_duration_seconds histogram')
+        lines.extend(
+            _prometheus_histogram(f'{prefix}_rekey_duration_seconds', snapshot['rekey'])
+        )
+        for name, key, help_text in (
+            ('sent_bytes_total', 'bytes_sent', 'Bytes sent to the server.'),
+            ('received_bytes_total', 'bytes_received', 'Bytes received from the server.'),
+            ('crypto_cpu_seconds_total', 'crypto_seconds', 'CPU time spent ciphering.'),
+        ):
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} counter')
+            lines.append(f'{prefix}_{name} {snapshot[key]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _prometheus_histogram(name: str, histogram: dict, labels: str = '') -> List[str]:
+    sep = ',' if labels else ''
+    lines = [
+        f'{name}_bucket{{{labels}{sep}le="{bound}"}} {amount}'
+        for bound, amount in histogram['buckets'].items()
+    ]
+    suffix = f'{{{labels}}}' if labels else ''
+    lines.append(f'{name}_sum{suffix} {histogram["sum"]}')
+    lines.append(f'{name}_count{suffix} {histogram["count"]}')
+    return lines
+
+
+def timed_command(verb: str, renew_key: bool = True):
+    """Decorator timing a whole protocol command (with all its requests and transfers)
+    when the metrics of its client are enabled. All its requests run as a single
+    command of the client, see `ProtocolClient.command`.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.client.command(renew_key=renew_key):
+                metrics: Optional[Metrics] = self.client.metrics
+                if metrics is None:
+                    return func(self, *args, **kwargs)
+                with metrics.command(verb):
+                    return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -7,6 +7,12 @@ from typing import Tuple, Union
 from tfprotocol_client.misc.constants import STRING_ENCODING
 from tfprotocol_client.models.status_server_code import StatusServerCode
 
+_WHITESPACE = b' \t\n\r\x0b\x0c'
+_SIGNS = b'-+'
+_STATUS_NAMES = {sc.name.encode(STRING_ENCODING): sc for sc in StatusServerCode}
+# THE TWO FIRST BYTES OF THE STATUS NAMES ARE UNIQUE, SO THEY INDEX THE CANDIDATE STATUS
+_STATUS_PREFIXES = {name[:2]: (name, sc) for name, sc in _STATUS_NAMES.items()}
+
 
 def separate_status(string: str):
     res = re.split(r'\s+', string, maxsplit=1)
@@ -18,14 +24,13 @@ def separate_status(string: str):
 
 
 def separate_status_b(data: bytes) -> Tuple[StatusServerCode, bytes]:
-    res = re.split(br'\s+', data, maxsplit=1)
-    # res_f = [r.strip() for r in res if r is not None and r.strip() != '']
-    status: StatusServerCode = StatusServerCode.from_str(
-        str(res[0], encoding=STRING_ENCODING).upper()
-    )
+    if not data or data[0] in _WHITESPACE:
+        return None, data
+    res = data.split(None, 1)
+    status: StatusServerCode = _STATUS_NAMES.get(bytes(res[0]).upper())
 
     if status is not None:
-        return status, b''.join(res[1:]) if len(res) > 1 else b''
+        return status, res[1] if len(res) > 1 else b''
     return None, data
 
 
@@ -39,11 +44,64 @@ def separate_status_codenumber(string: str) -> Tuple[str, str]:
 
 
 def separate_status_codenumber_b(data: bytes):
-    res = re.split(br'([-+]?\d+\.\d+)|([-+]?\d+)', data.lstrip(), maxsplit=1)
-    res_f = [r for r in res if r is not None and r.strip() != b'']
-    if len(res_f) > 1 and isnumber(res_f[0]):
-        return res_f[0], b''.join(res_f[1:]).lstrip()
-    return b'', b''.join(res_f)
+    data = data.lstrip()
+    end = _number_end(data, 0)
+    if end and data[0] not in _SIGNS and data[end:].strip():
+        return data[:end], data[end:].lstrip()
+    if data[-1:].isspace() and _first_number_end(data) == len(data.rstrip()):
+        # THE WHITESPACES AFTER A NUMBER ENDING THE DATA ARE DROPPED
+        return b'', data.rstrip()
+    return b'', data
+
+
+def find_status_b(data: bytes) -> Tuple[StatusServerCode, bool]:
+    """Finds the status named in a response.
+
+    Args:
+        `data` (bytes): The response, without the front code.
+
+    Returns:
+        Tuple[StatusServerCode, bool]: The status (UNKNOWN if there is none) and whether
+            the response starts with it. When it is not at the start the last status, in
+            declaration order, found in the response is returned.
+    """
+    candidate = _STATUS_PREFIXES.get(bytes(data[:2]))
+    if candidate is not None and data.startswith(candidate[0]):
+        return candidate[1], True
+    status = StatusServerCode.UNKNOWN
+    for name, status_code in _STATUS_NAMES.items():
+        if name in data:
+            status = status_code
+    return status, False
+
+
+def _digits_end(data: bytes, start: int) -> int:
+    end = start
+    while end < len(data) and 48 <= data[end] <= 57:
+        end += 1
+    return end
+
+
+def _number_end(data: bytes, start: int) -> int:
+    """End of the number (optionally signed and decimal) at `start`, or `start` if there
+    is not one.
+    """
+    digits = start + 1 if data[start : start + 1] in (b'-', b'+') else start
+    end = _digits_end(data, digits)
+    if end == digits:
+        return start
+    if data[end : end + 1] == b'.':
+        fraction_end = _digits_end(data, end + 1)
+        if fraction_end > end + 1:
+            end = fraction_end
+    return end
+
+
+def _first_number_end(data: bytes) -> int:
+    for index, byte in enumerate(data):
+        if 48 <= byte <= 57:
+            return _number_end(data, index)
+    return -1
 
 
 def isnumber(data: bytes):
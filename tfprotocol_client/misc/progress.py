@@ -0,0 +1,94 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+from io import BytesIO
+from time import perf_counter
+from typing import Callable, Optional
+
+from tfprotocol_client.models.transfer_progress import TransferProgress
+
+# Weight of the last interval in the average rate of the progress reports.
+DFLT_RATE_SMOOTHING = 0.3
+
+
+class ProgressTracker:
+    """Counts the bytes of a transference and reports a `TransferProgress` to a handler
+    at most once per `interval` seconds, and once more when it finishes. The cost of a
+    chunk in between is a clock read.
+    """
+
+    __slots__ = (
+        'command',
+        'path',
+        'total',
+        'done',
+        'handler',
+        'interval',
+        'smoothing',
+        'average_rate',
+        '_start',
+        '_last',
+        '_last_done',
+    )
+
+    def __init__(
+        self,
+        command: str,
+        path: str,
+        handler: Callable[[TransferProgress], None],
+        total: Optional[int] = None,
+        done: int = 0,
+        interval: float = 0.5,
+        smoothing: float = DFLT_RATE_SMOOTHING,
+    ) -> None:
+        self.command = command
+        self.path = path
+        self.handler = handler
+        self.total = total
+        self.done = done
+        self.interval = interval
+        self.smoothing = smoothing
+        self.average_rate: Optional[float] = None
+        self._start = self._last = perf_counter()
+        self._last_done = done
+
+    def update(self, nbytes: int):
+        self.done += nbytes
+        now = perf_counter()
+        if now - self._last >= self.interval:
+            self._report(now, False)
+
+    def finish(self):
+        self._report(perf_counter(), True)
+
+    def _report(self, now: float, finished: bool):
+        span = now - self._last
+        rate = (self.done - self._last_done) / span if span > 0 else 0.0
+        if self.average_rate is None:
+            self.average_rate = rate
+        elif span > 0:
+            self.average_rate += self.smoothing * (rate - self.average_rate)
+        self._last, self._last_done = now, self.done
+        self.handler(
+            TransferProgress(
+                self.command,
+                self.path,
+                self.done,
+                self.total,
+                now - self._start,
+                rate,
+                self.average_rate,
+                finished,
+            )
+        )
+
+
+def stream_left(stream: BytesIO) -> Optional[int]:
+    """Bytes left to read from a stream, None if it is not seekable."""
+    try:
+        position = stream.tell()
+        end = stream.seek(0, 2)
+        stream.seek(position)
+    except (AttributeError, OSError, ValueError):
+        return None
+    return end - position
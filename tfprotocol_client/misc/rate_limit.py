@@ -0,0 +1,130 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+from heapq import heapify, heappop, heappush
+from itertools import count
+from threading import Condition
+from time import monotonic
+from typing import List, Optional, Tuple, Union
+
+# Seconds of traffic a bucket can accumulate when no burst size is given.
+DFLT_BURST_SECONDS = 0.1
+
+
+class RateLimiter:
+    """Token bucket limiting the bytes per second of the transferences going through it.
+    The transferences sharing a limiter get bandwidth in proportion to the weight of
+    their `RateFlow` (start-time fair queuing), so a big download does not starve the
+    rest. A limiter can be attached to a single transference, to a session (the
+    `rate_limiter` of a protocol) or shared by several sessions to limit the whole
+    process, and it can have a `parent` limiter that also applies.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[int] = None,
+        parent: Optional['RateLimiter'] = None,
+    ) -> None:
+        """Rate limiter initialization.
+
+        Args:
+            `rate` (float): Bytes per second allowed.
+            `burst` (int): Bytes that can go through at once after an idle period.
+            `parent` (RateLimiter): Another limiter every transference also goes through.
+        """
+        self.rate = rate
+        self.burst = burst if burst else max(int(rate * DFLT_BURST_SECONDS), 1)
+        self.parent = parent
+        self._tokens = float(self.burst)
+        self._stamp = monotonic()
+        self._virtual = 0.0
+        self._waiting: List[Tuple[float, int]] = []
+        self._sequence = count()
+        self._cond = Condition()
+
+    def flow(self, weight: float = 1.0) -> 'RateFlow':
+        """A new transference going through the limiter, `weight` is its share of the
+        bandwidth relative to the other flows.
+        """
+        return RateFlow(self, weight)
+
+    def _refill(self):
+        now = monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def acquire(self, flow: 'RateFlow', nbytes: int):
+        """Blocks until `nbytes` of `flow` can go through this limiter, after the bytes
+        of the flows with an earlier turn.
+        """
+        needed = min(nbytes, self.burst)
+        with self._cond:
+            start = max(self._virtual, flow.finish)
+            flow.finish = start + nbytes / flow.weight
+            entry = (start, next(self._sequence))
+            heappush(self._waiting, entry)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiting[0] == entry:
+                        if self._tokens >= needed:
+                            # THE TOKENS MAY GO NEGATIVE, THE DEBT DELAYS THE NEXT ONES
+                            self._tokens -= nbytes
+                            self._virtual = start
+                            return
+                        self._cond.wait((needed - self._tokens) / self.rate)
+                    else:
+                        self._cond.wait()
+            finally:
+                # ALSO WHEN THE WAIT FAILED, OR THE ENTRY WOULD BLOCK THE NEXT ONES
+                if self._waiting[0] == entry:
+                    heappop(self._waiting)
+                else:
+                    self._waiting.remove(entry)
+                    heapify(self._waiting)
+                self._cond.notify_all()
+
+
+class RateFlow:
+    """A transference going through a `RateLimiter` (and its parents)."""
+
+    __slots__ = ('limiter', 'weight', 'finish', 'parent')
+
+    def __init__(self, limiter: RateLimiter, weight: float = 1.0) -> None:
+        self.limiter = limiter
+        self.weight = weight
+        self.finish = 0.0
+        self.parent: Optional[RateFlow] = (
+            limiter.parent.flow(weight) if limiter.parent is not None else None
+        )
+
+    def consume(self, nbytes: int):
+        """Blocks until `nbytes` can go through every limiter of the flow."""
+        flow: Optional[RateFlow] = self
+        while flow is not None:
+            flow.limiter.acquire(flow, nbytes)
+            flow = flow.parent
+
+
+RateLimit = Union[RateLimiter, RateFlow, None]
+
+
+class Throttle:
+    """The flows a single transference goes through."""
+
+    __slots__ = ('flows',)
+
+    def __init__(self, *limits: RateLimit) -> None:
+        self.flows: List[RateFlow] = [
+            limit if isinstance(limit, RateFlow) else limit.flow()
+            for limit in limits
+            if limit is not None
+        ]
+
+    def __bool__(self) -> bool:
+        return bool(self.flows)
+
+    def consume(self, nbytes: int):
+        for flow in self.flows:
+            flow.consume(nbytes)
@@ -0,0 +1,30 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+from io import BytesIO
+from typing import Callable, Union
+
+
+def read_into(stream: BytesIO, view: memoryview) -> int:
+    """Fills `view` with the next bytes of `stream`, without intermediate copies when
+    the stream supports `readinto`.
+
+    Args:
+        `stream` (BytesIO): Stream open in read mode.
+        `view` (memoryview): Writable view where the data is placed.
+
+    Returns:
+        int: Number of bytes placed at the start of `view`, 0 at the end of the stream.
+    """
+    readinto = getattr(stream, 'readinto', None)
+    if readinto is not None:
+        return readinto(view) or 0
+    data = stream.read(len(view))
+    view[: len(data)] = data
+    return len(data)
+
+
+def sink_writer(sink: Union[BytesIO, Callable[[memoryview], object]]) -> Callable:
+    """The function that writes a chunk into `sink`, a writable stream or a function."""
+    write = getattr(sink, 'write', None)
+    return write if write is not None else sink
@@ -10,7 +10,8 @@ class TimeLimitExpired(Exception):
 
 def timelimit(timeout, func, *args, **kwargs):
     """ Run func with the given timeout. If func didn't finish running
-        within the timeout, raise TimeLimitExpired
+        within the timeout, raise TimeLimitExpired, the exception raised
+        by func is raised again otherwise.
     """
 
     class FuncThread(Thread):
@@ -19,9 +20,13 @@ def timelimit(timeout, func, *args, **kwargs):
         def __init__(self):
             Thread.__init__(self)
             self.result = None
+            self.error = None
 
         def run(self):
-            self.result = func(*args, **kwargs)
+            try:
+                self.result = func(*args, **kwargs)
+            except Exception as e:  # pylint: disable=broad-except
+                self.error = e
 
         def stop(self):
             if self.is_alive():
@@ -34,4 +39,6 @@ def timelimit(timeout, func, *args, **kwargs):
         it.stop()
         raise TimeLimitExpired()
     else:
+        if it.error is not None:
+            raise it.error
         return it.result
@@ -0,0 +1,62 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+from math import ceil
+from time import monotonic
+from typing import Any, List, Optional, Tuple
+
+
+class TimerWheel:
+    """Hashed timing wheel. Timers are stored in the slot of the tick when they expire,
+    so scheduling and expiring are constant time regardless of how many timers exist.
+    Timers farther than a full wheel turn simply stay in their slot for more rounds.
+    """
+
+    def __init__(self, tick: float = 0.1, size: int = 512, start: float = None) -> None:
+        """Timer wheel initialization.
+
+        Args:
+            `tick` (float): Resolution of the wheel in seconds.
+            `size` (int): Number of slots of the wheel.
+            `start` (float, optional): Monotonic time of the tick zero. Defaults to now.
+        """
+        self.tick = tick
+        self._slots: List[List[Tuple[int, Any]]] = [[] for _ in range(size)]
+        self._start = monotonic() if start is None else start
+        self._current = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def schedule(self, delay: float, item: Any):
+        """Schedule `item` to expire after `delay` seconds (at least one tick)."""
+        target = self._current + max(1, ceil(delay / self.tick))
+        self._slots[target % len(self._slots)].append((target, item))
+        self._count += 1
+
+    def advance(self, now: float = None) -> List[Any]:
+        """Move the wheel up to `now` and return the items whose timer expired."""
+        now = monotonic() if now is None else now
+        expired = []
+        while self._start + (self._current + 1) * self.tick <= now:
+            self._current += 1
+            slot = self._slots[self._current % len(self._slots)]
+            if not slot:
+                continue
+            remaining = []
+            for target, item in slot:
+                if target <= self._current:
+                    expired.append(item)
+                else:
+                    remaining.append((target, item))
+            self._count -= len(slot) - len(remaining)
+            slot[:] = remaining
+        return expired
+
+    def next_timeout(self, now: float = None) -> Optional[float]:
+        """Seconds until the next tick, or None if there are no timers scheduled."""
+        if not self._count:
+            return None
+        now = monotonic() if now is None else now
+        return max(0.0, self._start + (self._current + 1) * self.tick - now)
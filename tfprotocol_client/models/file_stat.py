@@ -32,6 +32,8 @@ class FileStat:
     """File Stat object, used to contain file info.
     """
 
+    __slots__ = ('type', 'size', 'last_access', 'last_modification')
+
     def __init__(
         self,
         filestat_type: Union[int, str, FileStatTypeEnum],
@@ -23,9 +23,21 @@ class KeepAliveOptions:
         idle: int,
         timeout: int,
         max_tries: int,
+        multiplexed: bool = False,
     ) -> None:
+        """Keep alive options.
+
+        Args:
+            `keepalive_mechanism` (KeepAliveMechanismType): The mechanism to use.
+            `idle` (int): Seconds between probes.
+            `timeout` (int): Seconds to wait for a probe answer.
+            `max_tries` (int): Unanswered probes before the session is considered dead.
+            `multiplexed` (bool): Whether the probes are sent by the process wide
+                `KeepAliveService` instead of a dedicated thread for this connection.
+        """
         super().__init__()
         self.keepalive_mechanism: KeepAliveMechanismType = keepalive_mechanism
         self.idle: int = idle
         self.timeout: int = timeout
         self.max_tries: int = max_tries
+        self.multiplexed: bool = multiplexed
@@ -0,0 +1,63 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+from typing import Optional
+
+
+class RekeyPolicy:
+    """When the session key is renewed with NIGMA. The key is renewed before a command
+    once it ciphered `max_bytes` or it is `max_seconds` old, or earlier (past the `early`
+    fraction of those limits) if the session has been idle for `idle_seconds`, so the
+    renewals tend to fall in the quiet moments of the session instead of in a burst.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        keylen: Optional[int] = None,
+        early: float = 0.75,
+        idle_seconds: float = 1.0,
+    ) -> None:
+        """Rekey policy initialization.
+
+        Args:
+            `max_bytes` (int): Bytes ciphered (sent and received) with a key.
+            `max_seconds` (float): Seconds a key is used.
+            `keylen` (int): Length of the new keys, the length of the current key if it
+                is not given.
+            `early` (float): Fraction of the limits from which an idle session renews
+                its key.
+            `idle_seconds` (float): Seconds without traffic to consider a session idle.
+        """
+        self.max_bytes: Optional[int] = max_bytes
+        self.max_seconds: Optional[float] = max_seconds
+        self.keylen: Optional[int] = keylen
+        self.early: float = early
+        self.idle_seconds: float = idle_seconds
+
+    def usage(self, ciphered: int, age: float) -> float:
+        """Fraction of the limits reached by a key, 1 or more when it must be renewed."""
+        return max(
+            ciphered / self.max_bytes if self.max_bytes else 0.0,
+            age / self.max_seconds if self.max_seconds else 0.0,
+        )
+
+    def due(self, ciphered: int, age: float, idle: float) -> bool:
+        """Whether a key must be renewed now.
+
+        Args:
+            `ciphered` (int): Bytes ciphered with the key.
+            `age` (float): Seconds since the key is used.
+            `idle` (float): Seconds since the last message of the session.
+        """
+        usage = self.usage(ciphered, age)
+        return usage >= 1 or (usage >= self.early and idle >= self.idle_seconds)
+
+    def __str__(self) -> str:
+        return (
+            f'RekeyPolicy<max_bytes={self.max_bytes}, max_seconds={self.max_seconds}, '
+            f'keylen={self.keylen}>'
+        )
+
+    __repr__ = __str__
@@ -3,6 +3,7 @@
 
 from typing import Optional
 from tfprotocol_client.misc.parse_utils import (
+    find_status_b,
     separate_status,
     separate_status_b,
     separate_status_codenumber,
@@ -12,10 +13,14 @@ from tfprotocol_client.misc.parse_utils import (
 from tfprotocol_client.misc.constants import STRING_ENCODING
 from tfprotocol_client.models.status_server_code import StatusServerCode
 
+_STATUS_NAMES_B = {sc: sc.name.encode(STRING_ENCODING) for sc in StatusServerCode}
+
 
 class StatusInfo:
     """Status Info type from server responses."""
 
+    __slots__ = ('status', 'opcode', 'payload', 'code', 'sz', '_message')
+
     def __init__(
         self,
         status: StatusServerCode = None,
@@ -23,14 +28,39 @@ class StatusInfo:
         sz: int = None,  # pylint: disable=invalid-name
         payload: bytes = b'',
         code: int = 0,
-        message: str = '',
+        message: Optional[str] = '',
     ):
+        """Status info initialization, when `message` is None it is decoded from the
+        payload on first access.
+        """
         self.status: StatusServerCode = status
         self.opcode: int = opcode
         self.payload: bytes = payload if payload else b''
         self.code: int = code
         self.sz: int = sz  # pylint: disable=invalid-name
-        self.message: str = message
+        self._message: Optional[str] = message
+
+    @property
+    def message(self) -> str:
+        """Text of the response, the first 1024 bytes of the payload are decoded on first
+        access when it was not given.
+        """
+        if self._message is None:
+            payload = self.payload
+            self._message = str(
+                payload[:1024] + b'...' if len(payload) > 1024 else payload,
+                encoding=STRING_ENCODING,
+            )
+        return self._message
+
+    @message.setter
+    def message(self, value: str):
+        self._message = value
+
+    @property
+    def payload_view(self) -> memoryview:
+        """Read only view of the payload, to slice bulk responses without copies."""
+        return memoryview(self.payload).toreadonly()
 
     @staticmethod
     def parse(
@@ -87,17 +117,12 @@ class StatusInfo:
 
         if parse_code:
             str_code, msg = separate_status_codenumber_b(message)
-            code = tryparse_int(str_code, dflt_value=code)
-
-            min_index = len(msg)
-            for sc in StatusServerCode:
-                index = msg.find(sc.name.encode(STRING_ENCODING))
-                if index >= 0 and index < min_index:
-                    status = sc
-                    if index == 0:
-                        break
-            status_name = status.name.encode(STRING_ENCODING)
-            if index == 0:
+            if str_code:
+                code = tryparse_int(str_code, dflt_value=code)
+
+            status, at_start = find_status_b(msg)
+            status_name = _STATUS_NAMES_B[status]
+            if at_start:
                 msg = msg.replace(status_name + b' ', b'', 1).lstrip()
             elif msg[-len(status_name):] == status_name:
                 msg = msg.replace(b' ' + status_name, b'', 1).rstrip()
@@ -116,17 +141,13 @@ class StatusInfo:
                 # ? FAILED <str_code> : <msg>
                 str_code, msg = separate_status_codenumber_b(msg)
                 msg = msg.strip().replace(b': ', b'', 1)
-                code = tryparse_int(str_code, dflt_value=status.value)
+                code = (
+                    tryparse_int(str_code, dflt_value=status.value)
+                    if str_code
+                    else status.value
+                )
 
-        return StatusInfo(
-            status,
-            code=code,
-            message=str(
-                msg[:1024] + b'...' if len(msg) > 1024 else msg,
-                encoding=STRING_ENCODING,
-            ),
-            payload=msg,
-        )
+        return StatusInfo(status, code=code, message=None, payload=msg)
 
     def __eq__(self, __o: object) -> bool:
         if not isinstance(__o, type(self)):
@@ -0,0 +1,128 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+from enum import Enum
+from typing import Iterator, List, Optional, Tuple
+
+from tfprotocol_client.models.status_info import StatusInfo
+
+
+class SyncActionEnum(Enum):
+    """Operations of a synchronization plan."""
+
+    MKDIR = 0
+    RENAM = 1
+    PUT = 2
+    GET = 3
+    DEL = 4
+    RMDIR = 5
+
+
+class SyncAction:
+    """Single operation of a synchronization plan, the paths are relative to the
+    synchronized directories.
+    """
+
+    __slots__ = ('action', 'path', 'size', 'target')
+
+    def __init__(
+        self,
+        action: SyncActionEnum,
+        path: str,
+        size: int = 0,
+        target: Optional[str] = None,
+    ) -> None:
+        self.action: SyncActionEnum = action
+        self.path: str = path
+        self.size: int = size
+        self.target: Optional[str] = target
+
+    def __eq__(self, __o: object) -> bool:
+        return isinstance(__o, SyncAction) and (
+            self.action,
+            self.path,
+            self.size,
+            self.target,
+        ) == (__o.action, __o.path, __o.size, __o.target)
+
+    def __str__(self) -> str:
+        if self.target is not None:
+            return f'{self.action.name} {self.path} -> {self.target}'
+        if self.action in (SyncActionEnum.PUT, SyncActionEnum.GET):
+            return f'{self.action.name} {self.path} ({self.size} bytes)'
+        # THE EMPTY PATH IS THE SYNCHRONIZED DIRECTORY ITSELF
+        return f'{self.action.name} {self.path or "."}'
+
+    __repr__ = __str__
+
+
+class SyncPlan:
+    """Operations needed to synchronize two directory trees, in execution order."""
+
+    def __init__(self, actions: Optional[List[SyncAction]] = None, skipped: int = 0):
+        """Synchronization plan initialization.
+
+        Args:
+            `actions` (List[SyncAction]): The operations to be done.
+            `skipped` (int): Number of files already synchronized.
+        """
+        self.actions: List[SyncAction] = actions if actions is not None else []
+        self.skipped = skipped
+
+    def __iter__(self) -> Iterator[SyncAction]:
+        return iter(self.actions)
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def actions_of(self, *actions: SyncActionEnum) -> List[SyncAction]:
+        """The operations of the given types."""
+        return [action for action in self.actions if action.action in actions]
+
+    @property
+    def transfer_size(self) -> int:
+        """Bytes to be transferred."""
+        return sum(
+            action.size
+            for action in self.actions_of(SyncActionEnum.PUT, SyncActionEnum.GET)
+        )
+
+    def __str__(self) -> str:
+        lines = [str(action) for action in self.actions]
+        lines.append(
+            f'{len(self.actions)} operations, {self.transfer_size} bytes to transfer, '
+            f'{self.skipped} files up to date'
+        )
+        return '\n'.join(lines)
+
+    __repr__ = __str__
+
+
+class SyncReport:
+    """Outcome of the execution of a synchronization plan."""
+
+    def __init__(self, plan: SyncPlan, dry_run: bool = False) -> None:
+        self.plan: SyncPlan = plan
+        self.dry_run: bool = dry_run
+        self.done: List[SyncAction] = []
+        self.failed: List[Tuple[SyncAction, Optional[StatusInfo]]] = []
+        self.transferred: int = 0
+        self.elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:  # pylint: disable=invalid-name
+        return not self.failed
+
+    @property
+    def throughput(self) -> float:
+        """Transferred bytes per second."""
+        return self.transferred / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f'SyncReport<done={len(self.done)}, failed={len(self.failed)}, '
+            f'skipped={self.plan.skipped}, transferred={self.transferred}, '
+            f'elapsed={self.elapsed:.3f}, throughput={self.throughput:.0f} B/s>'
+        )
+
+    __repr__ = __str__
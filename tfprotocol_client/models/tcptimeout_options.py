@@ -2,13 +2,14 @@
 # email: lagcleaner@gmail.com
 
 from typing import Callable
+from tfprotocol_client.misc.constants import DFLT_CONNECT_ATTEMPT_DELAY
 from tfprotocol_client.models.status_server_code import StatusServerCode
 
 from tfprotocol_client.models.status_info import StatusInfo
 
 
 class TCPTimeoutOptions:
-    """TCP timeout options. """
+    """TCP timeout options, the times are expressed in milliseconds. """
 
     def __init__(
         self,
@@ -16,10 +17,12 @@ class TCPTimeoutOptions:
         connect_retry: int = 3,
         dns_resolution_timeout: int = 20 * 1000,
         status_server_callback: Callable[[StatusInfo], None] = None,
+        connect_attempt_delay: int = DFLT_CONNECT_ATTEMPT_DELAY,
     ) -> None:
         self._connect_retry: int = connect_retry
         self._connect_timeout: int = connect_timeout
         self._dns_resolution_timeout: int = dns_resolution_timeout
+        self.connect_attempt_delay: int = connect_attempt_delay
         self.status_server_callback = (
             (lambda _: None)
             if status_server_callback is None
@@ -31,7 +34,7 @@ class TCPTimeoutOptions:
         return self._connect_timeout
 
     @connect_timeout.setter
-    def set_connect_timeout(self, value: int):
+    def connect_timeout(self, value: int):
         if value < 0:
             self.status_server_callback(
                 StatusInfo(
@@ -48,7 +51,7 @@ class TCPTimeoutOptions:
         return self._connect_retry
 
     @connect_retry.setter
-    def set_connect_retry(self, value: int):
+    def connect_retry(self, value: int):
         if value < 0:
             self.status_server_callback(
                 StatusInfo(
@@ -65,5 +68,10 @@ class TCPTimeoutOptions:
         return self._dns_resolution_timeout
 
     @dns_resolution_timeout.setter
-    def set_dns_resolution_timeout(self, value: int):
+    def dns_resolution_timeout(self, value: int):
         self._dns_resolution_timeout = value
+
+    # DEPRECATED NAMES OF THE PROPERTIES, KEPT FOR THE EXISTING CODE
+    set_connect_timeout = connect_timeout
+    set_connect_retry = connect_retry
+    set_dns_resolution_timeout = dns_resolution_timeout
@@ -0,0 +1,64 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+from typing import Optional
+
+
+class TransferProgress:
+    """Snapshot of the progress of a transference, the rates are in bytes per second."""
+
+    __slots__ = (
+        'command',
+        'path',
+        'done',
+        'total',
+        'elapsed',
+        'rate',
+        'average_rate',
+        'finished',
+    )
+
+    def __init__(
+        self,
+        command: str,
+        path: str,
+        done: int,
+        total: Optional[int] = None,
+        elapsed: float = 0.0,
+        rate: float = 0.0,
+        average_rate: float = 0.0,
+        finished: bool = False,
+    ) -> None:
+        self.command = command
+        self.path = path
+        self.done = done
+        self.total = total
+        self.elapsed = elapsed
+        self.rate = rate
+        self.average_rate = average_rate
+        self.finished = finished
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Part of the total already transferred, None if the total is unknown."""
+        if not self.total:
+            return None if self.total is None else 1.0
+        return min(self.done / self.total, 1.0)
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Estimated seconds left, from the average rate."""
+        if self.finished:
+            return 0.0
+        if self.total is None or self.average_rate <= 0:
+            return None
+        return max(self.total - self.done, 0) / self.average_rate
+
+    def __str__(self) -> str:
+        return (
+            f'TransferProgress<{self.command} {self.path}: {self.done}/{self.total}, '
+            f'rate={self.rate:.0f}, average_rate={self.average_rate:.0f}, '
+            f'eta={self.eta}, finished={self.finished}>'
+        )
+
+    __repr__ = __str__
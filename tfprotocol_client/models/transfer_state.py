@@ -5,6 +5,8 @@
 class TransferStatus:
     """Transfer status"""
 
+    __slots__ = ('client_command', 'server_command', 'handling_canpt', 'last_payload_size')
+
     def __init__(
         self,
         client_command: int = None,
@@ -1,78 +1,189 @@
 # coded by lagcleaner
 # email: lagcleaner@gmail.com
 
-from io import BytesIO
-from struct import unpack
-from typing import Union
-from Crypto.PublicKey import RSA
-from Crypto.Random import get_random_bytes
-from Crypto.Cipher import PKCS1_OAEP
-from Crypto.Hash import SHA1
+from functools import lru_cache
+from struct import unpack_from
+from typing import Tuple, Union
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+_BYTE_ORDER = 'little'
 
 
 class CryptographyUtils:
-    """Cryptography utils to handle public key and generate random bytes."""
+    """Cryptography utils to handle public key and generate random bytes. The `Crypto`
+    package is imported on first use, it is only needed during the handshake.
+    """
 
     @staticmethod
     def rsa_encrypt(payload: bytes, public_key: str) -> bytes:
+        # pylint: disable=import-outside-toplevel
+        from Crypto.Cipher import PKCS1_OAEP
+        from Crypto.Hash import SHA1
+        from Crypto.PublicKey import RSA
+
         recipient_key = RSA.import_key(public_key)
         # Encrypt payload with the public RSA key
         cipher_rsa = PKCS1_OAEP.new(recipient_key, hashAlgo=SHA1)
         enc_payload = cipher_rsa.encrypt(payload)
         return enc_payload
 
-    get_random_bytes = staticmethod(get_random_bytes)
+    @staticmethod
+    def get_random_bytes(length: int) -> bytes:
+        # pylint: disable=import-outside-toplevel
+        from Crypto.Random import get_random_bytes
+
+        return get_random_bytes(length)
 
 
 class Xor:
-    """Xor class to en/decrypt messages."""
+    """Xor class to en/decrypt messages. Every byte is ciphered with a keystream byte
+    and a shift, both produced by the evolution of a 64 bits seed and a key that do
+    not depend on the data, so the keystream of a payload can be produced apart (ahead
+    of time or in another thread) and applied to the whole payload at once.
+    """
 
     SESSION_KEY = None
 
     def __init__(self, key: Union[bytes, bytearray] = None) -> None:
         if key is not None and (isinstance(key, bytes) or isinstance(key, bytearray)):
             Xor.SESSION_KEY = bytearray(key)
-        self._session_key = Xor.SESSION_KEY[:]
-        self._key = Xor.SESSION_KEY[:]
+        else:
+            key = Xor.SESSION_KEY
+        # EVERY CIPHER KEEPS ITS OWN KEY, OTHER SESSIONS MAY CHANGE THE CLASS ONE
+        self._session_key = bytearray(key)
+        self._key = bytearray(key)
         self._seed = self._get_new_seed()
+        # BYTES CIPHERED SO FAR, IDENTIFIES THE STATE OF THE CIPHER
+        self.position = 0
 
     def _get_new_seed(self) -> int:
-        buff = BytesIO(self._key)
-        (new_seed,) = unpack('<q', buff.read(8))
+        (new_seed,) = unpack_from('<Q', self._key)
         return new_seed
 
     def get_seed(self) -> int:
         return self._seed
 
+    def copy(self) -> 'Xor':
+        """An independent cipher in the same state."""
+        # pylint: disable=protected-access
+        clone = Xor.__new__(Xor)
+        clone._session_key = self._session_key
+        clone.restore(self)
+        return clone
+
+    def restore(self, other: 'Xor'):
+        """Puts the cipher in the state of `other`."""
+        # pylint: disable=protected-access
+        self._key = bytearray(other._key)
+        self._seed = other._seed
+        self.position = other.position
+
+    def keystream(self, size: int) -> Tuple[int, int]:
+        """Evolves the cipher through the next `size` bytes.
+
+        Args:
+            `size` (int): Length of the payload to be ciphered.
+
+        Returns:
+            Tuple[int, int]: The key bytes and the shift bytes of every position of the
+                payload, packed as little endian integers.
+        """
+        key = self._key
+        key_len = len(key)
+        seed = self._seed
+        keys = bytearray(size)
+        shifts = bytearray(size)
+        position = 0
+        for i in range(size):
+            keys[i] = key[position]
+            shifts[i] = seed >> 56
+            # Xor.next_seed INLINED
+            seed = (seed * (seed >> 8 & 0xFFFFFFFF) + (seed >> 40 & 0xFFFF)) & _MASK64
+            if seed == 0:
+                seed = self._get_new_seed()
+            key[position] = seed & 0xFF
+            position += 1
+            if position == key_len:
+                position = 0
+        self._seed = seed
+        self.position += size
+        return (
+            int.from_bytes(keys, _BYTE_ORDER),
+            int.from_bytes(shifts, _BYTE_ORDER),
+        )
+
+    @staticmethod
+    def next_seed(seed: int) -> int:
+        """The seed after ciphering a byte with `seed`, when it is 0 the cipher takes
+        a new one from its key instead.
+        """
+        return (seed * (seed >> 8 & 0xFFFFFFFF) + (seed >> 40 & 0xFFFF)) & _MASK64
+
+    def advance(self, lows: Union[bytes, bytearray], seed: int) -> int:
+        """Moves the cipher past a payload whose seeds were computed ahead, the seeds
+        follow `next_seed` without the key until one of them is 0.
+
+        Args:
+            `lows` (Union[bytes, bytearray]): The low byte of the seed after every byte
+                of the payload.
+            `seed` (int): The seed after the last byte of the payload.
+
+        Returns:
+            int: The key bytes of the payload, packed as a little endian integer.
+        """
+        key = self._key
+        key_len = len(key)
+        size = len(lows)
+        # THE FIRST BYTES USE THE KEY LEFT BY THE PREVIOUS PAYLOAD, THE REST THE
+        # SEEDS OF THIS ONE
+        keys = bytes(key[:size]) + bytes(lows[: max(size - key_len, 0)])
+        if size >= key_len:
+            rotation = (size - key_len) % key_len
+            tail = lows[size - key_len :]
+            key[rotation:] = tail[: key_len - rotation]
+            key[:rotation] = tail[key_len - rotation :]
+        else:
+            key[:size] = lows
+        if size:
+            self._seed = seed
+        self.position += size
+        return int.from_bytes(keys, _BYTE_ORDER)
+
     def encrypt(self, payload: bytes) -> bytearray:
-        mut_payload = bytearray(payload)
-        for i, _ in enumerate(mut_payload):
-            mut_payload[i] ^= self._key[i % len(self._key)]
-            # Pack data to send
-            mut_payload[i] = (mut_payload[i] + (self._seed >> 56 & 0xFF)) % 256
-            # Change seed and encryption key
-            self._seed = self._seed * (self._seed >> 8 & 0xFFFFFFFF) + (
-                self._seed >> 40 & 0xFFFF
-            )
-            if self._seed == 0:
-                self._seed = self._get_new_seed()
-            self._key[i % len(self._key)] = self._seed % 256
-
-        return mut_payload
+        keys, shifts = self.keystream(len(payload))
+        return Xor.apply_encrypt(payload, keys, shifts)
 
     def decrypt(self, payload: bytes) -> bytearray:
-        mut_payload = bytearray(payload)
-        for i, _ in enumerate(mut_payload):
-            # Unpack received data
-            mut_payload[i] = (256 + mut_payload[i] - (self._seed >> 56 & 0xFF)) % 256
-            # Decrypt received data
-            mut_payload[i] ^= self._key[i % len(self._key)]
-            self._seed = self._seed * (self._seed >> 8 & 0xFFFFFFFF) + (
-                self._seed >> 40 & 0xFFFF
-            )
-            if self._seed == 0:
-                self._seed = self._get_new_seed()
-
-            self._key[i % len(self._key)] = self._seed % 256
-
-        return mut_payload
+        keys, shifts = self.keystream(len(payload))
+        return Xor.apply_decrypt(payload, keys, shifts)
+
+    @staticmethod
+    def apply_encrypt(payload: bytes, keys: int, shifts: int) -> bytearray:
+        """Ciphers `payload` with a keystream, all the bytes at once: the sums of
+        every byte are done over the 7 low bits, so they never carry into the next
+        byte, and the high bit is fixed after.
+        """
+        size = len(payload)
+        low, high = _byte_masks(size)
+        data = int.from_bytes(payload, _BYTE_ORDER) ^ keys
+        data = ((data & low) + (shifts & low)) ^ ((data ^ shifts) & high)
+        return bytearray(data.to_bytes(size, _BYTE_ORDER))
+
+    @staticmethod
+    def apply_decrypt(payload: bytes, keys: int, shifts: int) -> bytearray:
+        """Deciphers `payload` with a keystream, all the bytes at once: the
+        subtractions of every byte start from a set high bit, so they never borrow
+        from the next byte, and the high bit is fixed after.
+        """
+        size = len(payload)
+        low, high = _byte_masks(size)
+        data = int.from_bytes(payload, _BYTE_ORDER)
+        data = ((data | high) - (shifts & low)) ^ ((data ^ ~shifts) & high)
+        return bytearray((data ^ keys).to_bytes(size, _BYTE_ORDER))
+
+
+@lru_cache(maxsize=64)
+def _byte_masks(size: int) -> Tuple[int, int]:
+    # 0x7F AND 0x80 REPEATED IN EVERY BYTE OF A PAYLOAD OF `size` BYTES
+    high = int.from_bytes(b'\x80' * size, _BYTE_ORDER)
+    return high ^ ((1 << 8 * size) - 1), high
@@ -2,7 +2,8 @@
 # email: lagcleaner@gmail.com
 
 import hashlib
-from typing import Union
+from threading import Event
+from typing import BinaryIO, Optional, Union
 
 
 def sha256_for(payload: Union[bytes, str]):
@@ -13,3 +14,23 @@ def sha256_for(payload: Union[bytes, str]):
 
 def hexstr(data: bytes) -> str:
     return '0x' + data.hex()
+
+
+def sha256_stream(
+    stream: BinaryIO, chunk_size: int = 1024 * 1024, cancel: Optional[Event] = None
+) -> Optional[bytes]:
+    '''Extract the SHA256 hash of a stream read in chunks, None if `cancel` is set before
+    reaching its end'''
+    digest = hashlib.sha256()
+    while cancel is None or not cancel.is_set():
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return digest.digest()
+        digest.update(chunk)
+    return None
+
+
+def sha256_file(path: str, cancel: Optional[Event] = None) -> Optional[bytes]:
+    '''Extract the SHA256 hash of a local file, see `sha256_stream`'''
+    with open(path, 'rb') as stream:
+        return sha256_stream(stream, cancel=cancel)
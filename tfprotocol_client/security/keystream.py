@@ -0,0 +1,198 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+from array import array
+from itertools import cycle
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
+from time import sleep
+from typing import Optional, Sequence, Tuple
+
+from tfprotocol_client.misc.constants import (
+    DFLT_CRYPTO_PIPELINE_DEPTH,
+    DFLT_KEYSTREAM_BUFFER_SIZE,
+)
+from tfprotocol_client.security.cryptography import Xor
+
+# Bytes of keystream computed at once by a keystream buffer, the session waits at most
+# for one batch when it needs the cipher.
+KEYSTREAM_BATCH = 512
+
+
+class KeystreamPipeline:
+    """Computes in a background thread the keystreams of the next payloads of a cipher,
+    while the caller is busy with the socket. The payloads are expected to follow a
+    repeating pattern of sizes (the header and the chunk of a transference), the first
+    payload that does not follow it (or a cipher used by someone else meanwhile) stops
+    the pipeline and the cipher goes on by itself.
+    """
+
+    def __init__(
+        self,
+        cipher: Xor,
+        sizes: Sequence[int],
+        depth: int = DFLT_CRYPTO_PIPELINE_DEPTH,
+    ) -> None:
+        """Keystream pipeline initialization.
+
+        Args:
+            `cipher` (Xor): The cipher whose keystreams are computed ahead, it is not
+                modified until the keystreams are taken.
+            `sizes` (Sequence[int]): Sizes of the next payloads, repeated forever.
+            `depth` (int): Keystreams computed and not taken yet.
+        """
+        self._source = cipher
+        self._cipher = cipher.copy()
+        self._sizes = cycle(sizes)
+        self._queue: Queue = Queue(max(depth, 1))
+        self._stop = Event()
+        self._thread = Thread(target=self._produce, daemon=True)
+        self._thread.start()
+
+    def _produce(self):
+        while not self._stop.is_set():
+            size = next(self._sizes)
+            position = self._cipher.position
+            keys, shifts = self._cipher.keystream(size)
+            item = (position, size, keys, shifts, self._cipher.copy())
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(item, timeout=0.1)
+                    break
+                except Full:
+                    continue
+
+    @property
+    def running(self) -> bool:
+        return not self._stop.is_set()
+
+    def take(self, cipher: Xor, size: int) -> Optional[Tuple[int, int]]:
+        """The keystream of the next payload of `cipher`, which is moved past it.
+
+        Args:
+            `cipher` (Xor): The cipher given to the pipeline.
+            `size` (int): Size of the payload.
+
+        Returns:
+            Optional[Tuple[int, int]]: The keys and shifts to apply to the payload, None
+                if the pipeline cannot provide it and `cipher` must be used directly.
+        """
+        while self.running:
+            try:
+                position, expected, keys, shifts, state = self._queue.get(timeout=0.1)
+            except Empty:
+                continue
+            if (
+                cipher is not self._source
+                or position != cipher.position
+                or expected != size
+            ):
+                break
+            cipher.restore(state)
+            return keys, shifts
+        self.close()
+        return None
+
+    def close(self):
+        """Stops the background thread, discarding the keystreams not taken."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+
+class KeystreamBuffer:
+    """Keystream of the next bytes of a cipher, computed by a background thread while
+    the session is idle, so the small messages are ciphered without evolving the cipher
+    byte by byte. The seeds of the cipher do not depend on where a payload starts or
+    ends, so they are computed ahead for any payload. The payloads bigger than what is
+    computed (or a cipher used apart) go through the cipher as usual, and the buffer is
+    computed again from there.
+    """
+
+    def __init__(
+        self, cipher: Xor, capacity: int = DFLT_KEYSTREAM_BUFFER_SIZE
+    ) -> None:
+        """Keystream buffer initialization.
+
+        Args:
+            `cipher` (Xor): The cipher, the buffer moves it when its keystream is taken.
+            `capacity` (int): Bytes of keystream computed ahead.
+        """
+        self.cipher = cipher
+        self.capacity = capacity
+        self._lock = Lock()
+        self._wakeup = Event()
+        self._closed = False
+        # THE BUFFER STARTS AT THE CURRENT STATE OF THE CIPHER
+        self._start = cipher.position
+        self._seed = cipher.get_seed()
+        self._halted = False
+        self._shifts = bytearray()
+        self._lows = bytearray()
+        self._seeds = array('Q')
+        self._thread = Thread(target=self._fill, daemon=True)
+        self._thread.start()
+        self._wakeup.set()
+
+    def _reset(self):
+        # THE BUFFER STARTS AGAIN AT THE CURRENT STATE OF THE CIPHER
+        self._start = self.cipher.position
+        self._seed = self.cipher.get_seed()
+        self._halted = False
+        self._shifts.clear()
+        self._lows.clear()
+        del self._seeds[:]
+
+    def __len__(self) -> int:
+        return len(self._shifts)
+
+    def _fill(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            while True:
+                with self._lock:
+                    if self._closed:
+                        return
+                    if self._halted or len(self._shifts) >= self.capacity:
+                        break
+                    missing = self.capacity - len(self._shifts)
+                    self._extend(min(KEYSTREAM_BATCH, missing))
+                # LET THE SESSION TAKE THE INTERPRETER BETWEEN BATCHES
+                sleep(0)
+
+    def _extend(self, count: int):
+        seed = self._seed
+        for _ in range(count):
+            following = Xor.next_seed(seed)
+            if following == 0:
+                # THE CIPHER TAKES THE NEXT SEED FROM ITS KEY, IT GOES BY ITSELF THERE
+                self._halted = True
+                break
+            self._shifts.append(seed >> 56)
+            self._lows.append(following & 0xFF)
+            self._seeds.append(following)
+            seed = following
+        self._seed = seed
+
+    def keystream(self, size: int) -> Tuple[int, int]:
+        """Moves the cipher through the next `size` bytes, as `Xor.keystream`."""
+        with self._lock:
+            if 0 < size <= len(self._shifts) and self.cipher.position == self._start:
+                shifts = int.from_bytes(self._shifts[:size], 'little')
+                keys = self.cipher.advance(self._lows[:size], self._seeds[size - 1])
+                del self._shifts[:size]
+                del self._lows[:size]
+                del self._seeds[:size]
+                self._start += size
+            else:
+                keys, shifts = self.cipher.keystream(size)
+                self._reset()
+        self._wakeup.set()
+        return keys, shifts
+
+    def close(self):
+        """Stops the background thread."""
+        with self._lock:
+            self._closed = True
+        self._wakeup.set()
@@ -0,0 +1,631 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+"""Pure python stand-in of the TF protocol daemon, runnable in-process. It implements
+the handshake, the Xor framing and the core command set (file operations, LS/LSR,
+FSTATLS, SNDFILE/RCVFILE, PUT/GET, SUP/SDOWN, INTREAD/INTWRITE and the XS_SQLITE
+subsystem) over a temporary directory, enough to regression test and benchmark the
+client without a real server.
+"""
+
+import datetime as dt
+import hashlib
+import os
+import shutil
+import socket
+import socketserver
+import sqlite3
+import struct
+import tempfile
+import time
+from threading import Thread
+from typing import Callable, Dict, Optional, Tuple
+from uuid import uuid4
+
+from Crypto.Cipher import PKCS1_OAEP
+from Crypto.Hash import SHA1
+from Crypto.PublicKey import RSA
+from tfprotocol_client.misc.constants import (
+    ENDIANESS,
+    ENDIANESS_NAME,
+    INT_SIZE,
+    LONG_SIZE,
+)
+from tfprotocol_client.models.putget_commands import PutGetCommandEnum
+from tfprotocol_client.security.cryptography import Xor
+
+# Size of the chunks sent by the stand-in in the streamed answers.
+CHUNK_SIZE = 64 * 1024
+
+
+class StandInError(Exception):
+    """Command failure, answered as `FAILED <code> : <message>`."""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class _Session(socketserver.BaseRequestHandler):
+    """One client connection of the stand-in server."""
+
+    server: '_TCPServer'
+
+    def __init__(self, request, client_address, server) -> None:
+        # THE BASE CONSTRUCTOR ALREADY HANDLES THE WHOLE CONNECTION
+        self.xor_in: Optional[Xor] = None
+        self.xor_out: Optional[Xor] = None
+        self.databases: Dict[int, sqlite3.Connection] = {}
+        self.next_db_id = 1
+        self.alive = True
+        super().__init__(request, client_address, server)
+
+    def setup(self):
+        # THE HEADER AND THE BODY GO OUT APART, NAGLE WOULD HOLD THE BODY FOR AN ACK
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    # FRAMING
+    def recv_raw(self, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError('client closed the connection')
+            data += chunk
+        return bytes(self.xor_in.decrypt(data)) if self.xor_in else bytes(data)
+
+    def send_raw(self, data: bytes):
+        self.request.sendall(bytes(self.xor_out.encrypt(data)) if self.xor_out else data)
+
+    def recv_int(self, size: int = INT_SIZE) -> int:
+        return int.from_bytes(self.recv_raw(size), ENDIANESS_NAME, signed=True)
+
+    def send_int(self, value: int, size: int = INT_SIZE):
+        self.send_raw(value.to_bytes(size, ENDIANESS_NAME, signed=True))
+
+    def recv_msg(self, header_size: int = INT_SIZE) -> bytes:
+        return self.recv_raw(self.recv_int(header_size))
+
+    def send_msg(self, body: bytes, header_size: int = INT_SIZE):
+        # THE CLIENT DECRYPTS HEADER AND BODY SEPARATELY, SO THEY ARE ENCRYPTED APART TOO
+        self.send_int(len(body), header_size)
+        self.send_raw(body)
+
+    def reply(self, text: str = 'OK', header_size: int = INT_SIZE):
+        self.send_msg(text.encode(), header_size)
+
+    # HANDSHAKE AND MAIN LOOP
+    def handle(self):
+        try:
+            if not self.handshake():
+                return
+            while self.alive:
+                self.dispatch(self.recv_msg())
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            for database in self.databases.values():
+                database.close()
+
+    def handshake(self) -> bool:
+        if self.recv_msg().decode() != self.server.protocol_version:
+            self.reply('FAILED 1 : unsupported protocol version')
+            return False
+        self.reply()
+        session_key = self.server.cipher.decrypt(self.recv_msg())
+        self.reply()
+        self.xor_in, self.xor_out = Xor(session_key), Xor(session_key)
+        if self.recv_msg() != self.server.client_hash:
+            self.reply('FAILED 2 : invalid client hash')
+            return False
+        self.reply()
+        return True
+
+    def dispatch(self, body: bytes):
+        verb, _, args = body.partition(b' ')
+        command: Callable[[bytes], None] = getattr(
+            self, f'cmd_{verb.decode(errors="replace").lower()}', None
+        )
+        if command is None:
+            self.reply('UNKNOWN')
+            return
+        try:
+            command(args)
+        except StandInError as e:
+            self.reply(f'FAILED {e.code} : {e.message}')
+        except ConnectionError:
+            raise
+        except (OSError, ValueError) as e:
+            self.reply(f'FAILED {getattr(e, "errno", None) or 1} : {e}')
+
+    # HELPERS
+    def path(self, raw: bytes) -> str:
+        root = self.server.root
+        path = os.path.normpath(os.path.join(root, raw.decode().strip().lstrip('/')))
+        if os.path.commonpath((root, path)) != root:
+            raise StandInError(3, 'Path out of the protocol root.')
+        return path
+
+    def existing(self, raw: bytes) -> str:
+        path = self.path(raw)
+        if not os.path.exists(path):
+            raise StandInError(2, 'File or directory does not exist.')
+        return path
+
+    @staticmethod
+    def pair(args: bytes) -> Tuple[bytes, bytes]:
+        first, sep, second = args.partition(b' | ')
+        if not sep:
+            raise StandInError(4, 'Malformed command.')
+        return first, second
+
+    def stream_cont(self, data: bytes):
+        """Answers CONT with `data` in chunks, each of them requested with CONT."""
+        offset = 0
+        while True:
+            chunk = data[offset : offset + CHUNK_SIZE]
+            offset += CHUNK_SIZE
+            self.send_msg(b'CONT ' + chunk if chunk else b'CONT')
+            if self.recv_msg() != b'CONT':
+                return
+            if offset >= len(data):
+                self.reply()
+                return
+
+    # REGULAR COMMANDS
+    def cmd_end(self, _: bytes):
+        self.alive = False
+
+    def cmd_echo(self, args: bytes):
+        self.send_msg(args)
+
+    def cmd_date(self, _: bytes):
+        self.reply(f'OK {int(time.time())}')
+
+    def cmd_datef(self, _: bytes):
+        self.reply(f'OK {dt.datetime.now(dt.timezone.utc):%Y-%m-%d %H:%M:%S}')
+
+    def cmd_dtof(self, args: bytes):
+        stamp = dt.datetime.fromtimestamp(float(args), dt.timezone.utc)
+        self.reply(f'OK {stamp:%Y-%m-%d %H:%M:%S}')
+
+    def cmd_ftod(self, args: bytes):
+        stamp = dt.datetime.strptime(args.decode(), '%Y-%m-%d %H:%M:%S')
+        self.reply(f'OK {int(stamp.replace(tzinfo=dt.timezone.utc).timestamp())}')
+
+    def cmd_udate(self, _: bytes):
+        now = time.time_ns()
+        self.reply(f'OK {now // 10**9}.{now // 1000 % 10**6}')
+
+    def cmd_ndate(self, _: bytes):
+        now = time.time_ns()
+        self.reply(f'OK {now // 10**9}.{now % 10**9}')
+
+    def cmd_freesp(self, _: bytes):
+        self.reply(f'OK {shutil.disk_usage(self.server.root).free}')
+
+    def cmd_prockey(self, _: bytes):
+        self.reply(f'OK {uuid4().hex}')
+
+    def cmd_keepalive(self, _: bytes):
+        self.reply()
+
+    def cmd_nigma(self, args: bytes):
+        keylen = int(args) if args.strip().isdigit() else 0
+        if keylen % 4 != 0 or keylen < 8:
+            raise StandInError(1, 'Invalid key length.')
+        self.reply()
+        key = os.urandom(keylen)
+        self.send_msg(key)
+        self.xor_in, self.xor_out = Xor(key), Xor(key)
+
+    def cmd_mkdir(self, args: bytes):
+        path = self.path(args)
+        if os.path.exists(path):
+            raise StandInError(5, 'File already exist.')
+        os.makedirs(path)
+        self.reply()
+
+    def cmd_rmdir(self, args: bytes):
+        path = self.existing(args)
+        if not os.path.isdir(path):
+            raise StandInError(6, 'Not a directory.')
+        shutil.rmtree(path)
+        self.reply()
+
+    def cmd_del(self, args: bytes):
+        path = self.existing(args)
+        if os.path.isdir(path):
+            raise StandInError(7, 'Is a directory.')
+        os.remove(path)
+        self.reply()
+
+    def cmd_touch(self, args: bytes):
+        path = self.path(args)
+        if os.path.exists(path):
+            raise StandInError(5, 'File already exist.')
+        open(path, 'wb').close()  # pylint: disable=consider-using-with
+        self.reply()
+
+    def cmd_fupd(self, args: bytes):
+        os.utime(self.existing(args))
+        self.reply()
+
+    def cmd_copy(self, args: bytes):
+        path_from, path_to = self.pair(args)
+        shutil.copyfile(self.existing(path_from), self.path(path_to))
+        self.reply()
+
+    def cmd_cpdir(self, args: bytes):
+        path_from, path_to = self.pair(args)
+        shutil.copytree(self.existing(path_from), self.path(path_to))
+        self.reply()
+
+    def cmd_renam(self, args: bytes):
+        path_from, path_to = self.pair(args)
+        os.replace(self.existing(path_from), self.path(path_to))
+        self.reply()
+
+    def cmd_fstat(self, args: bytes):
+        path = self.existing(args)
+        stat = os.stat(path)
+        kind = 'D' if os.path.isdir(path) else 'F'
+        self.reply(f'OK {kind} {stat.st_size} {int(stat.st_atime)} {int(stat.st_mtime)}')
+
+    def cmd_fsize(self, args: bytes):
+        try:
+            size = os.path.getsize(self.existing(args))
+        except StandInError:
+            size = -1
+        self.send_int(size, LONG_SIZE)
+
+    def cmd_sha256(self, args: bytes):
+        with open(self.existing(args), 'rb') as file:
+            self.reply(f'OK 0x{hashlib.sha256(file.read()).hexdigest()}')
+
+    def listing(self, args: bytes, recursive: bool) -> bytes:
+        top = self.existing(args)
+        lines = []
+        for current, dirs, files in os.walk(top):
+            rel = os.path.relpath(current, top)
+            prefix = '' if rel == '.' else rel.replace(os.sep, '/') + '/'
+            lines.extend(f'D: {prefix}{name}/\n' for name in sorted(dirs))
+            lines.extend(f'F: {prefix}{name}\n' for name in sorted(files))
+            if not recursive:
+                break
+        return ''.join(lines).encode()
+
+    def cmd_ls(self, args: bytes):
+        self.stream_cont(self.listing(args, recursive=False))
+
+    def cmd_lsr(self, args: bytes):
+        self.stream_cont(self.listing(args, recursive=True))
+
+    def cmd_fstatls(self, args: bytes):
+        with open(self.existing(args), 'rb') as file:
+            paths = file.read().splitlines()
+        for raw in paths:
+            try:
+                stat = os.stat(self.existing(raw))
+            except StandInError:
+                self.send_raw(struct.pack(f'{ENDIANESS}bbQQQ', -1, 0, 0, 0, 0))
+                continue
+            kind = 0 if os.path.isdir(self.path(raw)) else 3
+            self.send_raw(
+                struct.pack(
+                    f'{ENDIANESS}bbQQQ',
+                    0,
+                    kind,
+                    stat.st_size,
+                    int(stat.st_atime),
+                    int(stat.st_mtime),
+                )
+            )
+        self.send_raw(struct.pack(f'{ENDIANESS}bbQQQ', -2, 0, 0, 0, 0))
+
+    # FILE TRANSFERENCE COMMANDS
+    def cmd_sndfile(self, args: bytes):
+        overwrite, _, raw_path = args.partition(b' ')
+        path = self.path(raw_path)
+        if overwrite != b'1' and os.path.exists(path):
+            raise StandInError(5, 'File already exist.')
+        self.reply('CONT')
+        with open(path, 'wb') as file:
+            while True:
+                body = self.recv_msg()
+                if body[:4] != b'CONT':
+                    break
+                file.write(body[5:])
+                self.reply('CONT')
+        self.reply()
+
+    def cmd_rcvfile(self, args: bytes):
+        delete_after, _, raw_path = args.partition(b' ')
+        path = self.existing(raw_path)
+        with open(path, 'rb') as file:
+            data = file.read()
+        self.stream_cont(data)
+        if delete_after == b'1':
+            os.remove(path)
+
+    @staticmethod
+    def putget_args(args: bytes) -> Tuple[bytes, int, int]:
+        offset = int.from_bytes(args[-16:-8], ENDIANESS_NAME, signed=False)
+        buffer_size = int.from_bytes(args[-8:], ENDIANESS_NAME, signed=True)
+        return args[:-17], offset, buffer_size
+
+    def cmd_put(self, args: bytes):
+        raw_path, offset, buffer_size = self.putget_args(args)
+        path = self.path(raw_path)
+        self.send_msg(b'OK ' + buffer_size.to_bytes(LONG_SIZE, ENDIANESS_NAME, signed=True))
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as file:
+            file.seek(offset)
+            while True:
+                header = self.recv_int(LONG_SIZE)
+                if header <= PutGetCommandEnum.HPFEND.value:
+                    break
+                file.write(self.recv_raw(header))
+            file.truncate()
+        # FINAL HANDSHAKE
+        self.send_int(PutGetCommandEnum.HPFFIN.value, LONG_SIZE)
+        self.recv_int(LONG_SIZE)
+
+    def cmd_get(self, args: bytes):
+        raw_path, offset, buffer_size = self.putget_args(args)
+        path = self.existing(raw_path)
+        self.send_msg(b'OK ' + buffer_size.to_bytes(LONG_SIZE, ENDIANESS_NAME, signed=True))
+        with open(path, 'rb') as file:
+            file.seek(offset)
+            while True:
+                chunk = file.read(buffer_size)
+                if not chunk:
+                    break
+                self.send_msg(chunk, LONG_SIZE)
+        self.send_int(PutGetCommandEnum.HPFEND.value, LONG_SIZE)
+        # FINAL HANDSHAKE
+        self.recv_int(LONG_SIZE)
+        self.send_int(PutGetCommandEnum.HPFFIN.value, LONG_SIZE)
+
+    def cmd_sup(self, args: bytes):
+        path = self.path(args)
+        with open(path, 'wb') as file:
+            while True:
+                header = self.recv_int()
+                if header <= 0:
+                    break
+                file.write(self.recv_raw(header))
+        if header < 0:
+            os.remove(path)
+            return
+        self.send_int(0)
+
+    def cmd_sdown(self, args: bytes):
+        try:
+            path = self.existing(args)
+        except StandInError:
+            self.send_int(-1)
+            return
+        with open(path, 'rb') as file:
+            while True:
+                chunk = file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                self.send_msg(chunk)
+        self.send_int(0)
+
+    def cmd_intread(self, args: bytes):
+        try:
+            with open(self.existing(args), 'rb') as file:
+                data = file.read()
+        except StandInError:
+            self.send_int(-1)
+            return
+        checksum = '0x' + hashlib.sha256(data).hexdigest()
+        self.send_int(len(data))
+        self.send_raw(checksum.encode())
+        self.send_raw(data)
+
+    def cmd_intwrite(self, args: bytes):
+        path = self.path(args)
+        checksum = self.recv_raw(66).decode()
+        data = self.recv_msg()
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                current = '0x' + hashlib.sha256(file.read()).hexdigest()
+            if current != checksum:
+                self.send_int(1)
+                return
+        with open(path, 'wb') as file:
+            file.write(data)
+        self.send_int(0)
+
+    # XS_SQLITE SUBSYSTEM
+    def cmd_xs_sqlite(self, _: bytes):
+        self.reply()
+        while self.alive:
+            verb, _, args = self.recv_msg(LONG_SIZE).partition(b' ')
+            if verb in (b'EXIT', b'TERMINATE'):
+                if verb == b'TERMINATE':
+                    for database in self.databases.values():
+                        database.close()
+                    self.databases.clear()
+                return
+            command = getattr(self, f'xs_{verb.decode(errors="replace").lower()}', None)
+            try:
+                if command is None:
+                    raise StandInError(1, 'UNKNOWN COMMAND')
+                command(args)
+            except (StandInError, sqlite3.Error) as e:
+                self.reply(f'{getattr(e, "code", 1)} FAILED : {e}', LONG_SIZE)
+
+    def database(self, raw_id: bytes) -> sqlite3.Connection:
+        database = self.databases.get(int(raw_id or 0))
+        if database is None:
+            raise StandInError(2, 'INVALID DB ID')
+        return database
+
+    def xs_open(self, args: bytes):
+        name = args.decode().strip()
+        database = sqlite3.connect(
+            name if name == ':memory:' else self.path(args), check_same_thread=False
+        )
+        database.isolation_level = None
+        db_id, self.next_db_id = self.next_db_id, self.next_db_id + 1
+        self.databases[db_id] = database
+        self.reply(f'0 OK DB OPENED WITH ID {db_id}', LONG_SIZE)
+
+    def xs_close(self, args: bytes):
+        self.database(args).close()
+        del self.databases[int(args)]
+        self.reply('0 OK DB CLOSED', LONG_SIZE)
+
+    def xs_lastrowid(self, args: bytes):
+        cursor = self.database(args).execute('SELECT last_insert_rowid()')
+        self.reply(f'0 OK {cursor.fetchone()[0]}', LONG_SIZE)
+
+    def execute(self, raw_id: bytes, sql_query: str):
+        database = self.database(raw_id)
+        try:
+            return database.execute(sql_query)
+        except (sqlite3.ProgrammingError, sqlite3.Warning):
+            # MORE THAN ONE STATEMENT
+            return database.executescript(sql_query)
+
+    @staticmethod
+    def rows(cursor: sqlite3.Cursor):
+        if cursor.description is None:
+            return
+        yield [column[0].encode() for column in cursor.description]
+        for row in cursor:
+            yield [
+                value if isinstance(value, bytes) else str(value).encode()
+                for value in row
+            ]
+
+    def xs_exec(self, args: bytes):
+        raw_id, _, sql_query = args.partition(b' ')
+        cursor = self.execute(raw_id, sql_query.decode())
+        self.reply('0 OK EXEC SUCCESSFULLY', LONG_SIZE)
+        for row in self.rows(cursor):
+            frame = b'@@'.join(row)
+            self.send_msg(frame, LONG_SIZE)
+        self.send_int(0, LONG_SIZE)
+
+    def xs_execof(self, args: bytes):
+        raw_path, _, rest = args.partition(b' ')
+        raw_id, _, sql_query = rest.partition(b' ')
+        cursor = self.execute(raw_id, sql_query.decode())
+        with open(self.path(raw_path), 'wb') as file:
+            for row in self.rows(cursor):
+                file.write(b'@@'.join(row) + b'\n')
+        self.reply('0 OK EXEC SUCCESSFULLY', LONG_SIZE)
+
+    def blob_args(self, args: bytes) -> Tuple[sqlite3.Connection, str, str, bytes]:
+        parts = args.split(b' ', 3)
+        if len(parts) != 4:
+            raise StandInError(4, 'MALFORMED COMMAND')
+        raw_id, table, filename, filepath = parts
+        return self.database(raw_id), table.decode(), filename.decode(), filepath
+
+    def xs_blobin(self, args: bytes):
+        # THE BLOBS ARE STORED AS (NAME, DATA) ROWS OF THE TABLE
+        database, table, filename, filepath = self.blob_args(args)
+        with open(self.existing(filepath), 'rb') as file:
+            data = file.read()
+        database.execute(f'INSERT INTO {table} VALUES (?, ?)', (filename, data))
+        self.reply('0 OK BLOB STORED', LONG_SIZE)
+
+    def xs_blobout(self, args: bytes):
+        database, table, filename, filepath = self.blob_args(args)
+        row = database.execute(
+            f'SELECT * FROM {table} WHERE name = ?', (filename,)
+        ).fetchone()
+        if row is None:
+            raise StandInError(3, 'BLOB NOT FOUND')
+        with open(self.path(filepath), 'wb') as file:
+            file.write(row[1])
+        self.reply('0 OK BLOB EXTRACTED', LONG_SIZE)
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    root: str
+    protocol_version: str
+    client_hash: bytes
+    cipher: PKCS1_OAEP.PKCS1OAEP_Cipher
+
+
+class StandInServer:
+    """In-process stand-in of the TF protocol daemon backed by a temporary directory.
+
+    Usage:
+        with StandInServer() as server:
+            proto = TfProtocol(*server.protocol_args)
+            proto.connect()
+    """
+
+    def __init__(
+        self,
+        protocol_version: str = '0.0',
+        client_hash: str = 'testhash',
+        address: str = '127.0.0.1',
+        port: int = 0,
+        root: Optional[str] = None,
+        key_bits: int = 1024,
+    ) -> None:
+        """Stand-in server initialization.
+
+        Args:
+            `protocol_version` (str): The protocol version accepted.
+            `client_hash` (str): The client hash accepted.
+            `address` (str): Address to listen on.
+            `port` (int): Port to listen on, 0 picks a free one.
+            `root` (str, optional): Directory served, a temporary one if not given.
+            `key_bits` (int): Size of the generated RSA key.
+        """
+        self._tmp_dir = None if root else tempfile.TemporaryDirectory()
+        key = RSA.generate(key_bits)
+        self.public_key: str = key.publickey().export_key().decode()
+        self._server = _TCPServer((address, port), _Session)
+        self._server.root = os.path.realpath(root or self._tmp_dir.name)
+        self._server.protocol_version = protocol_version
+        self._server.client_hash = client_hash.encode()
+        self._server.cipher = PKCS1_OAEP.new(key, hashAlgo=SHA1)
+        self.protocol_version = protocol_version
+        self.client_hash = client_hash
+        self._thread: Optional[Thread] = None
+
+    @property
+    def root(self) -> str:
+        return self._server.root
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    @property
+    def protocol_args(self) -> tuple:
+        """Positional arguments for the protocol classes to connect to this server."""
+        return (self.protocol_version, self.public_key, self.client_hash, *self.address)
+
+    def start(self) -> 'StandInServer':
+        self._thread = Thread(
+            target=self._server.serve_forever, name='stand_in_server', daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+
+    def __enter__(self) -> 'StandInServer':
+        return self.start()
+
+    def __exit__(self, *_):
+        self.stop()
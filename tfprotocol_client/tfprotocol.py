@@ -7,27 +7,48 @@
 import datetime as dt
 import socket
 from io import BytesIO
-from multiprocessing import Condition
-from typing import Callable, Union
+from threading import Condition
+from typing import Callable, Optional, Union
 
 from multipledispatch import dispatch
 
 from tfprotocol_client.connection.codes_sender_recvr import CodesSenderRecvr
 from tfprotocol_client.misc.build_utils import MessageUtils
+from tfprotocol_client.misc.chunk_sizing import (
+    AdaptiveChunkSize,
+    ChunkTimer,
+    requested_size,
+)
+from tfprotocol_client.misc.compression import (
+    CompressionCodec,
+    compressed,
+    decompressed,
+    finish_decompression,
+)
 from tfprotocol_client.misc.constants import (
     BYTE_SIZE,
+    DFLT_CRYPTO_PIPELINE_DEPTH,
+    DFLT_HEADER_SIZE,
     DFLT_MAX_BUFFER_SIZE,
+    DFLT_PROGRESS_INTERVAL,
     EMPTY_HANDLER,
     INT_SIZE,
     KEY_LEN_INTERVAL,
     LONG_SIZE,
 )
 from tfprotocol_client.misc.handlers_aliases import (
+    DataSink,
+    ProgressHandler,
     ResponseHandler,
     SendRecvFileHandler,
     TransferAsyncHandler,
     TransferHandler,
 )
+from tfprotocol_client.misc.logs import commands_logger
+from tfprotocol_client.misc.metrics import timed_command
+from tfprotocol_client.misc.progress import ProgressTracker, stream_left
+from tfprotocol_client.misc.rate_limit import RateLimit, Throttle
+from tfprotocol_client.misc.stream_utils import read_into, sink_writer
 from tfprotocol_client.misc.thread import TfThread
 from tfprotocol_client.models.exceptions import ErrorCode, TfException
 from tfprotocol_client.models.file_stat import FileStat, FileStatTypeEnum
@@ -40,6 +61,8 @@ from tfprotocol_client.models.transfer_state import TransferStatus
 from tfprotocol_client.tfprotocol_super import TfProtocolSuper
 
 Date = dt.date
+# Prefix of the data messages of SNDFILE.
+SNDFILE_CONT_PREFIX = b'CONT '
 
 
 class TfProtocol(TfProtocolSuper):
@@ -47,6 +70,11 @@ class TfProtocol(TfProtocolSuper):
     `TfProtocolSuper`: The Abstract mother class of Tranference Protocol API.
     """
 
+    # SECONDS BETWEEN THE REPORTS SENT TO THE `progress_handler` OF THE TRANSFERENCES
+    progress_interval: float = DFLT_PROGRESS_INTERVAL
+    # KEYSTREAMS COMPUTED AHEAD DURING THE PUT AND GET TRANSFERENCES (0 DISABLES IT)
+    crypto_pipeline_depth: int = DFLT_CRYPTO_PIPELINE_DEPTH
+
     # pylint: disable=super-init-not-called
     @dispatch(TfProtocolSuper, verbosity_mode=False)
     def __init__(
@@ -62,6 +90,7 @@ class TfProtocol(TfProtocolSuper):
             `verbosity_mode` (bool): Debug mode enabled for verbosity.
         """
         self._proto_client = tfprotocol._proto_client
+        self._len_channel = tfprotocol.len_channel
         self.verbosity_mode = verbosity_mode
 
     # pylint: disable=function-redefined
@@ -499,12 +528,15 @@ class TfProtocol(TfProtocolSuper):
             self.client.translate(TfProtocolMessage('LOCK', lock_filename))
         )
 
+    @timed_command('SNDFILE')
     def sndfile_command(
         self,
         is_overriten: bool,
         path: str,
         stream: BytesIO,
         handler: SendRecvFileHandler = EMPTY_HANDLER,
+        progress_handler: ProgressHandler = EMPTY_HANDLER,
+        window: int = 1,
     ):
         """Sends a file to the server.
 
@@ -515,7 +547,14 @@ class TfProtocol(TfProtocolSuper):
             `path` (str): The path in the server where the file be stored.
             `stream` (BytesIO): The data of the file to be sent.
             `handler` (SendRecvFileHandler): The function to handle receiving states.
-        """
+            `progress_handler` (ProgressHandler): The function to handle the progress
+                reports of the transference.
+            `window` (int): Number of chunks sent before waiting for their answers. The
+                server answers every chunk in order, so a window bigger than 1 saves the
+                round trip of each chunk, but it is only safe with servers that keep
+                reading the chunks in flight after a failure.
+        """
+        progress = self._upload_progress('SNDFILE', path, stream, progress_handler)
         response = self.client.translate(
             TfProtocolMessage('SNDFILE', '1' if (is_overriten) else '0', path),
         )
@@ -525,39 +564,43 @@ class TfProtocol(TfProtocolSuper):
             response,
             stream,
         )
-        while True:
-            payload = stream.read(
-                self.len_channel - len(StatusServerCode.CONT.name) - 1
-            )
-            if (
-                payload
-                and len(payload) - len(StatusServerCode.CONT.name) - 1
-                > self.len_channel
-            ):
-                # PAYLOAD_TOO_BIG [CASE]
-                handler(is_overriten, path, StatusInfo.parse('PAYLOAD_TOO_BIG'), stream)
-                break
-
-            # SEND DATA IF EXIST
-            if payload:
-                # CONNECTION BLOCKED WHEN THE PAYLOAD SENT IS THE MAXIMUM POSSIBLE,
-                # USED FOR TINY FILES ONLY
-                response = self.client.translate(TfProtocolMessage('CONT', payload))
+        # THE CONT FRAMES ARE BUILT IN PLACE IN A SINGLE BUFFER OF THE CHANNEL LENGTH
+        frame = memoryview(bytearray(self.len_channel))
+        frame[: len(SNDFILE_CONT_PREFIX)] = SNDFILE_CONT_PREFIX
+        chunk = frame[len(SNDFILE_CONT_PREFIX) :]
+        in_flight = 0
+        while response.status is StatusServerCode.CONT:
+            size = read_into(stream, chunk)
+            if size:
+                self.client.send_frame(frame[: len(SNDFILE_CONT_PREFIX) + size])
+                in_flight += 1
+                if progress:
+                    progress.update(size)
+            # WAIT FOR THE ANSWERS WHEN THE WINDOW IS FULL OR THE DATA IS OVER
+            while in_flight and (not size or in_flight >= window):
+                response = self.client.recv(header_size=DFLT_HEADER_SIZE)
+                in_flight -= 1
                 handler(is_overriten, path, response, stream)
-            else:
-                break
-
-            # BREAK IF BAD RESPONSE RECEIVED
-            if response.status != StatusServerCode.CONT:
+                if response.status is not StatusServerCode.CONT:
+                    break
+            if not size:
                 break
+        # THE ANSWERS OF THE CHUNKS SENT AFTER A FAILURE ARE STILL OWED
+        while in_flight:
+            self.client.recv(header_size=DFLT_HEADER_SIZE)
+            in_flight -= 1
         handler(is_overriten, path, self.client.translate('OK'), stream)
+        if progress:
+            progress.finish()
 
+    @timed_command('RCVFILE')
     def rcvfile_command(
         self,
         delete_after: bool,
         path: str,
-        sink: BytesIO = None,
+        sink: Optional[DataSink] = None,
         handler: SendRecvFileHandler = EMPTY_HANDLER,
+        progress_handler: ProgressHandler = EMPTY_HANDLER,
     ):
         """Receives a file from the server.
 
@@ -566,21 +609,52 @@ class TfProtocol(TfProtocolSuper):
                 true and tells the server whether the file must be deleted after successfully
                 received by the client.
             `path` (str): The path to the file in the server to be retrieved.
-            `sink` (BytesIO): The sink to receive data in byte mode.
+            `sink` (DataSink): Receives the data of the file as it arrives (a stream in
+                byte mode or a function called with every chunk), then only the final
+                response goes to `handler`. Without it every chunk goes to `handler`.
             `handler` (SendRecvFileHandler): The function to handle receiving states.
+            `progress_handler` (ProgressHandler): The function to handle the progress
+                reports of the transference.
         """
+        progress = self._download_progress('RCVFILE', path, progress_handler)
+        if sink is not None:
+            write = sink_writer(sink)
+
+            def write_chunk(chunk: memoryview):
+                write(chunk)
+                if progress:
+                    progress.update(len(chunk))
+
+            response = self.client.stream_cont(
+                TfProtocolMessage('RCVFILE', '1' if delete_after else '0', path),
+                write_chunk,
+            )
+            handler(delete_after, path, response, sink)
+            if progress:
+                progress.finish()
+            return
         response = self.client.translate(
             TfProtocolMessage('RCVFILE', '1' if delete_after else '0', path)
         )
         handler(delete_after, path, response, sink)
 
         while True:
+            if progress and response.status is StatusServerCode.CONT:
+                progress.update(len(response.payload_view))
             response = self.client.translate(TfProtocolMessage('CONT'))
             handler(delete_after, path, response, sink)
             if response.status != StatusServerCode.CONT:
                 break
+        if progress:
+            progress.finish()
 
-    def ls_command(self, path: str, response_handler: ResponseHandler = EMPTY_HANDLER):
+    @timed_command('LS')
+    def ls_command(
+        self,
+        path: str,
+        response_handler: ResponseHandler = EMPTY_HANDLER,
+        sink: Optional[DataSink] = None,
+    ):
         """Command list the directory entries for the indicated path, if the argument is missing,
         it lists the root directory of the protocol daemon. The return value of this command
         is a file with the listed content. In fact, it is like issuing the command RCVFILE to
@@ -594,7 +668,13 @@ class TfProtocol(TfProtocolSuper):
         Args:
             `path` (str): The path to the folder to be listed.
             `response_handler` (ResponseHandler): The function to handle the command response.
+            `sink` (DataSink): Receives the listing as it arrives, then only the final
+                response goes to `response_handler`.
         """
+        if sink is not None:
+            message = TfProtocolMessage('LS', path)
+            response_handler(self.client.stream_cont(message, sink_writer(sink)))
+            return
         response: StatusInfo = self.client.translate(TfProtocolMessage('LS', path))
         response_handler(response)
 
@@ -604,7 +684,13 @@ class TfProtocol(TfProtocolSuper):
             if response.status != StatusServerCode.CONT:
                 break
 
-    def lsr_command(self, path: str, response_handler: ResponseHandler = EMPTY_HANDLER):
+    @timed_command('LSR')
+    def lsr_command(
+        self,
+        path: str,
+        response_handler: ResponseHandler = EMPTY_HANDLER,
+        sink: Optional[DataSink] = None,
+    ):
         """Command list the directory entries for the indicated path, if the argument is missing,
         it lists the root directory of the protocol daemon. The return value of this command
         is a file with the listed content. In fact, it is like issuing the command RCVFILE to
@@ -615,7 +701,13 @@ class TfProtocol(TfProtocolSuper):
         Args:
             `path` (str): The path to the folder to be listed.
             `response_handler` (ResponseHandler): The function to handle the command response.
+            `sink` (DataSink): Receives the listing as it arrives, then only the final
+                response goes to `response_handler`.
         """
+        if sink is not None:
+            message = TfProtocolMessage('LSR', path)
+            response_handler(self.client.stream_cont(message, sink_writer(sink)))
+            return
         response: StatusInfo = self.client.translate(TfProtocolMessage('LSR', path))
         response_handler(response)
 
@@ -740,15 +832,17 @@ class TfProtocol(TfProtocolSuper):
             self.client.translate(TfProtocolMessage('CHOWN', path_file, user, group))
         )
 
+    @timed_command('PUTCAN')
     def putcan_command(
         self,
         data_stream: BytesIO,
         path_file: str,
         offset: int,
-        buffer_size: int,
+        buffer_size: Union[int, AdaptiveChunkSize],
         canpt: int,
         response_handler: ResponseHandler = EMPTY_HANDLER,
         transfer_handler: TransferHandler = EMPTY_HANDLER,
+        progress_handler: ProgressHandler = EMPTY_HANDLER,
     ):
         """Upload a file to the server.
 
@@ -758,29 +852,35 @@ class TfProtocol(TfProtocolSuper):
             `path_file` (str): Path to server file to upload, if not exists creates it.
             `offset` (int): The pointer position from where to start writing to the
                 server file.
-            `buffer_size` (int): The size proposed by the client for the buffer, the buffer
-                definitive will be sent by the server in case of OK.
+            `buffer_size` (Union[int, AdaptiveChunkSize]): The size proposed by the client
+                for the buffer, the buffer definitive will be sent by the server in case of
+                OK. An `AdaptiveChunkSize` tunes it by the measured throughput.
             `canpt` (int): Cancellation Points, determines the cancellation points where the
                 user, it will have to read from the server to know if it continues or not.
             `response_handler` (ResponseHandler): The function to handle the command response.
             `transference_handler` (TransferenceHandler): The function to handle the transference
                 cancelations.
+            `progress_handler` (ProgressHandler): The function to handle the progress
+                reports of the transference.
         """
         offset, canpt = max(0, offset), max(0, canpt)
+        progress = self._upload_progress(
+            'PUTCAN', path_file, data_stream, progress_handler, offset
+        )
 
         # SEND INITIAL OPTIONS
+        sizer = buffer_size if isinstance(buffer_size, AdaptiveChunkSize) else None
         response = self.client.translate(
             TfProtocolMessage('PUTCAN ', path_file, separate_by_spaces=False)
             .add(' ')
             .add(offset, size=LONG_SIZE, signed=False)
-            .add(buffer_size, size=LONG_SIZE, signed=True)
+            .add(requested_size(buffer_size), size=LONG_SIZE, signed=True)
             .add(canpt, size=LONG_SIZE, signed=False)
         )
 
         # INITIALIZE TRANSFER VARIABLES
         transfer_status = TransferStatus()
         header_size = LONG_SIZE
-        server_buffer_size = buffer_size
         transfer_status.server_command = PutGetCommandEnum.HPFCONT.value
         if response is None or response.code != 0:
             return
@@ -788,6 +888,7 @@ class TfProtocol(TfProtocolSuper):
 
         response.code = server_buffer_size
         response_handler(response)
+        timer = sizer.timer(server_buffer_size) if sizer else None
         i = 0
         while True:
             if canpt > 0 and i == canpt:
@@ -814,14 +915,19 @@ class TfProtocol(TfProtocolSuper):
             i += 1
             # LOAD DATA TO BE SENT
             payl: bytearray = None
+            chunk_size = timer.propose() if timer else server_buffer_size
             try:
-                payl = data_stream.read(server_buffer_size)
+                payl = data_stream.read(chunk_size)
             except Exception as e:
                 raise TfException(exception=e)
 
             # SEND DATA CHUNK
             if payl:
                 self.client.send(payl, header_size=LONG_SIZE)
+                if timer:
+                    timer.lap(chunk_size, len(payl))
+                if progress:
+                    progress.update(len(payl))
             transfer_status.last_payload_size = len(payl)
             transfer_handler(self.client, transfer_status)
 
@@ -850,16 +956,20 @@ class TfProtocol(TfProtocolSuper):
                     break
             except IOError as e:
                 raise TfException(exception=e)
+        if progress:
+            progress.finish()
 
+    @timed_command('GETCAN')
     def getcan_command(
         self,
         data_sink: BytesIO,
         path_file: str,
         offset: int,
-        buffer_size: int,
+        buffer_size: Union[int, AdaptiveChunkSize],
         canpt: int,
         response_handler: ResponseHandler = EMPTY_HANDLER,
         transfer_handler: TransferHandler = EMPTY_HANDLER,
+        progress_handler: ProgressHandler = EMPTY_HANDLER,
     ):
         """Download a file from the server.
 
@@ -868,21 +978,28 @@ class TfProtocol(TfProtocolSuper):
                 Can be any object that inherits from BinaryIO in write mode.
             `path_file` (str): Path to server file to be download.
             `offset` (int): The pointer position from where to start reading to the server file.
-            `buffer_size` (int): The size proposed by the client for the buffer, the buffer
-                definitive will be sent by the server in case of OK.
+            `buffer_size` (Union[int, AdaptiveChunkSize]): The size proposed by the client
+                for the buffer, the buffer definitive will be sent by the server in case of
+                OK. An `AdaptiveChunkSize` tunes it by the measured throughput.
             `canpt` (int): Cancellation Points, determines the cancellation points where the
                 user, it will have to read from the server to know if it continues or not.
             `response_handler` (ResponseHandler): The function to handle the command response.
             `transference_handler` (TransferenceHandler): The function to handle the transference
                 cancelations.
+            `progress_handler` (ProgressHandler): The function to handle the progress
+                reports of the transference.
         """
         offset, canpt = max(offset, 0), max(canpt, 0)
+        progress = self._download_progress(
+            'GETCAN', path_file, progress_handler, offset
+        )
         # SEND INITIAL OPTIONS
+        sizer = buffer_size if isinstance(buffer_size, AdaptiveChunkSize) else None
         response = self.client.translate(
             TfProtocolMessage('GETCAN', path_file)
             .add(' ')
             .add(offset, size=LONG_SIZE, signed=False)
-            .add(buffer_size, size=LONG_SIZE, signed=True)
+            .add(requested_size(buffer_size), size=LONG_SIZE, signed=True)
             .add(canpt, size=LONG_SIZE, signed=False)
         )
 
@@ -894,6 +1011,9 @@ class TfProtocol(TfProtocolSuper):
         response.code = MessageUtils.decode_int(response.payload, signed=True)
 
         response_handler(response)
+        # THE SERVER SENDS CHUNKS OF THE GRANTED SIZE, THE NEXT GETCAN GETS TUNED
+        timer = sizer.timer(response.code) if sizer else None
+        chunk_size = timer.propose() if timer else response.code
         i = 0
         while True:
             if canpt > 0 and i == canpt:
@@ -929,12 +1049,18 @@ class TfProtocol(TfProtocolSuper):
                 break
 
             pyld = self.client.just_recv(size=cur_header)
+            if timer:
+                timer.lap(chunk_size, len(pyld))
             try:
                 data_sink.write(pyld)
             except IOError as e:
                 raise TfException(exception=e)
+            if progress:
+                progress.update(len(pyld))
             transfer_status.last_payload_size = len(pyld)
             transfer_handler(self.client, transfer_status)
+        if progress:
+            progress.finish()
 
     def end_command(self):
         """Command is sent by the client to the server in order to terminate the TCP connection."""
@@ -989,14 +1115,18 @@ class TfProtocol(TfProtocolSuper):
             )
         )
 
+    @timed_command('GET')
     def get_command(
         self,
         data_sink: BytesIO,
         path_file: str,
         offset: int,
-        buffer_size: int,
+        buffer_size: Union[int, AdaptiveChunkSize],
         response_handler: ResponseHandler = EMPTY_HANDLER,
         transfer_handler: TransferAsyncHandler = EMPTY_HANDLER,
+        rate_limit: RateLimit = None,
+        progress_handler: ProgressHandler = EMPTY_HANDLER,
+        compression: Optional[CompressionCodec] = None,
     ):
         """Get Command download data from server asynchronously to any OutputStream the
         user wants...
@@ -1009,18 +1139,43 @@ class TfProtocol(TfProtocolSuper):
                 since the offset position for example if the data is 100 bytes long then if offset
                 is 20 I will read since 20 to 100 skiping first 20 bytes. This is useful for when
                 we stop an operation and wanted to restart it again later.
-            `buffer_size` (int): Is the size of the buffer, while bigger faster will be the
-                communication, of course server wont give you always the amount you request,
-                because may be that server's bandwidth is getting filled.
+            `buffer_size` (Union[int, AdaptiveChunkSize]): Is the size of the buffer, while
+                bigger faster will be the communication, of course server wont give you
+                always the amount you request, because may be that server's bandwidth is
+                getting filled. An `AdaptiveChunkSize` tunes it by the measured throughput.
             `response_handler` (ResponseHandler): The function to handle the command response.
             `transfer_handler` (TransferAsyncHandler): The function to handle the
                 transference cancelations from both client and server asynchronously.
+            `rate_limit` (RateLimit): Bandwidth limit of this transference, applied
+                besides the `rate_limiter` of the session.
+            `progress_handler` (ProgressHandler): The function to handle the progress
+                reports of the transference.
+            `compression` (CompressionCodec): Decompresses the data while it arrives, the
+                file in the server must be a compressed object (the codec is the one
+                named by its header), downloaded from its start (`offset` 0).
+
+        Raises:
+            TfException: In case of an `offset` with `compression` or a sink that can
+                not be sought to the `offset`, nothing is sent to the server.
         """
+        if compression is not None and offset != 0:
+            raise TfException(
+                code=ErrorCode.ILLEGAL_ARGUMENTS,
+                message='A compressed object is only downloaded from its start',
+            )
+        sizer = buffer_size if isinstance(buffer_size, AdaptiveChunkSize) else None
+        data_sink = decompressed(data_sink, compression)
+        # SEEK TO THE OFFSET POSX BEFORE THE SERVER STARTS SENDING
+        try:
+            data_sink.seek(offset)
+        except IOError as e:
+            raise TfException(exception=e)
+        progress = self._download_progress('GET', path_file, progress_handler, offset)
         response = self.client.translate(
             TfProtocolMessage('GET', path_file)
             .add(' ')
             .add(offset, size=LONG_SIZE, signed=False)
-            .add(buffer_size, size=LONG_SIZE, signed=True)
+            .add(requested_size(buffer_size), size=LONG_SIZE, signed=True)
         )
         if response.status is not StatusServerCode.OK:
             response_handler(response)
@@ -1028,15 +1183,12 @@ class TfProtocol(TfProtocolSuper):
         response.code = MessageUtils.decode_int(response.payload, signed=True)
         response_handler(response)
 
-        # SEEK TO THE OFFSET POSX
-        try:
-            data_sink.seek(offset)
-        except IOError as e:
-            raise TfException(exception=e)
-
         # SET UP SHARED VARIABLES
         cond_lock = Condition()
         code_sr = CodesSenderRecvr(self.client)
+        # THE SERVER SENDS CHUNKS OF THE GRANTED SIZE
+        timer = sizer.timer(response.code) if sizer else None
+        chunk_size = timer.propose() if timer else response.code
         t_handler: TfThread
         t_command: TfThread
         try:
@@ -1048,27 +1200,39 @@ class TfProtocol(TfProtocolSuper):
             t_command = TfThread(
                 self.__get_command_t,
                 cond_lock=cond_lock,
-                args=(data_sink, code_sr, response_handler),
+                args=(
+                    data_sink,
+                    code_sr,
+                    response_handler,
+                    chunk_size,
+                    timer,
+                    Throttle(rate_limit, self.client.rate_limiter),
+                    progress,
+                ),
             )
         except Exception as e:
             raise TfException(
                 exception=e,
                 message='FATAL ERROR!!! incorrect callback found, reinstall module...',
             )
-        t_handler.start()
-        t_command.start()
-
-        with cond_lock:
-            while t_command.is_alive() or t_handler.is_alive():
-                cond_lock.wait(0.5)
-                try:
-                    if not t_handler.is_alive() and code_sr.sending_signal:
-                        code_sr.send_get(PutGetCommandEnum.HPFFIN.value)
-                except InterruptedError as e:
-                    raise TfException(exception=e)
+        # THE KEYSTREAMS OF THE HEADERS AND CHUNKS ARE COMPUTED WHILE RECEIVING
+        with self.client.pipelined_crypto(
+            input_sizes=(LONG_SIZE, chunk_size), depth=self.crypto_pipeline_depth
+        ):
+            t_handler.start()
+            t_command.start()
+
+            with cond_lock:
+                while t_command.is_alive() or t_handler.is_alive():
+                    cond_lock.wait(0.5)
+                    try:
+                        if not t_handler.is_alive() and code_sr.sending_signal:
+                            code_sr.send_get(PutGetCommandEnum.HPFFIN.value)
+                    except InterruptedError as e:
+                        raise TfException(exception=e)
 
-        t_command.join()
-        t_handler.join()
+            t_command.join()
+            t_handler.join()
 
         # FINAL HANDSHAKE
         if code_sr.last_command is not PutGetCommandEnum.HPFFIN.value:
@@ -1077,15 +1241,33 @@ class TfProtocol(TfProtocolSuper):
             )
         if code_sr.last_header is not PutGetCommandEnum.HPFFIN.value:
             self.client.just_recv_int(size=LONG_SIZE, signed=True)
-        response_handler(
-            StatusInfo(status=StatusServerCode.OK, code=PutGetCommandEnum.HPFFIN.value)
-        )
+        if finish_decompression(data_sink):
+            response_handler(
+                StatusInfo(
+                    status=StatusServerCode.OK, code=PutGetCommandEnum.HPFFIN.value
+                )
+            )
+        else:
+            # THE TRANSFERENCE ENDED BEFORE THE END OF THE COMPRESSED OBJECT
+            response_handler(
+                StatusInfo(
+                    status=StatusServerCode.FAILED,
+                    code=PutGetCommandEnum.HPFCANCEL.value,
+                    message='The compressed object is incomplete',
+                )
+            )
+        if progress:
+            progress.finish()
 
     def __get_command_t(
         self,
         data_sink: BytesIO,
         code_sr: CodesSenderRecvr,
         response_handler: ResponseHandler = EMPTY_HANDLER,
+        chunk_size: Optional[int] = None,
+        timer: Optional[ChunkTimer] = None,
+        throttle: Optional[Throttle] = None,
+        progress: Optional[ProgressTracker] = None,
     ):
         """This command is intended to be used ONLY by the getCommand function not by
         user DO NOT CALL THIS METHOD DIRECTLY.
@@ -1095,6 +1277,10 @@ class TfProtocol(TfProtocolSuper):
                 could be in memory or in disk etc.
             `code_sr` (CodesSenderRecvr): Stateful codes sender and receiver helper.
             `response_handler` (ResponseHandler): The function to handle the command response.
+            `chunk_size` (int): Size of the chunks sent by the server.
+            `timer` (ChunkTimer): Measures the chunks for an adaptive buffer size.
+            `throttle` (Throttle): Bandwidth limits of the transference.
+            `progress` (ProgressTracker): Progress tracker of the transference.
         """
         header_size = LONG_SIZE
         while True:
@@ -1110,20 +1296,30 @@ class TfProtocol(TfProtocolSuper):
                 if header <= PutGetCommandEnum.HPFEND.value:
                     code_sr.sending_signal = False
                     return
+                if throttle:
+                    throttle.consume(header)
                 chunk = self.client.just_recv(size=header)
+                if timer:
+                    timer.lap(chunk_size, header)
                 if not code_sr.sending_signal:
                     data_sink.write(chunk)
+                    if progress:
+                        progress.update(header)
             except IOError as e:
                 raise TfException(exception=e)
 
+    @timed_command('PUT')
     def put_command(
         self,
         data_stream: BytesIO,
         path_file: str,
         offset: int,
-        buffer_size: int,
+        buffer_size: Union[int, AdaptiveChunkSize],
         response_handler: ResponseHandler = EMPTY_HANDLER,
         transfer_handler: TransferAsyncHandler = EMPTY_HANDLER,
+        rate_limit: RateLimit = None,
+        progress_handler: ProgressHandler = EMPTY_HANDLER,
+        compression: Optional[CompressionCodec] = None,
     ):
         """Upload a stream of data allowing to cancel at any moment. Asynchronously
 
@@ -1135,18 +1331,27 @@ class TfProtocol(TfProtocolSuper):
                 since the offset position for example if the data is 100 bytes long then if
                 offset is 20 I will read since 20 to 100 skiping first 20 bytes. This is useful
                 for when we stop an operation and wanted to restart it again later.
-            `buff_size` (int): Is the size of the buffer, while bigger faster will be the
-                communication, of course server wont give you always the amount you request,
-                because may be that server's bandwidth is getting filled.
+            `buffer_size` (Union[int, AdaptiveChunkSize]): Is the size of the buffer, while
+                bigger faster will be the communication, of course server wont give you
+                always the amount you request, because may be that server's bandwidth is
+                getting filled. An `AdaptiveChunkSize` tunes it by the measured throughput.
             `response_handler` (ResponseHandler): The function to handle the command response.
             `transfer_handler` (TransferAsyncHandler): The function to handle the
                 transference cancelations from both client and server asynchronously.
-        """
+            `rate_limit` (RateLimit): Bandwidth limit of this transference, applied
+                besides the `rate_limiter` of the session.
+            `progress_handler` (ProgressHandler): The function to handle the progress
+                reports of the transference.
+            `compression` (CompressionCodec): Compresses the data while it is sent, the
+                server stores the compressed object with a small header naming the codec.
+        """
+        sizer = buffer_size if isinstance(buffer_size, AdaptiveChunkSize) else None
+        data_stream = compressed(data_stream, compression)
         response = self.client.translate(
             TfProtocolMessage('PUT', path_file)
             .add(' ')
             .add(offset, size=LONG_SIZE, signed=False)
-            .add(buffer_size, size=LONG_SIZE, signed=True)
+            .add(requested_size(buffer_size), size=LONG_SIZE, signed=True)
         )
         if response.status is not StatusServerCode.OK:
             response_handler(response)
@@ -1159,10 +1364,15 @@ class TfProtocol(TfProtocolSuper):
             data_stream.seek(offset)
         except IOError as e:
             raise TfException(exception=e)
+        progress = self._upload_progress(
+            'PUT', path_file, data_stream, progress_handler, offset
+        )
 
         # SET UP SHARED VARIABLES
         cond_lock = Condition()
         code_sr = CodesSenderRecvr(self.client)
+        timer = sizer.timer(response.code) if sizer else None
+        chunk_size = timer.propose() if timer else response.code
         t_command: TfThread
         try:
             t_command = TfThread(
@@ -1174,6 +1384,9 @@ class TfProtocol(TfProtocolSuper):
                     code_sr,
                     response_handler,
                     transfer_handler,
+                    timer,
+                    Throttle(rate_limit, self.client.rate_limiter),
+                    progress,
                 ),
             )
         except Exception as e:
@@ -1181,19 +1394,24 @@ class TfProtocol(TfProtocolSuper):
                 exception=e,
                 message='FATAL ERROR!!! incorrect callback found, reinstall module...',
             )
-        # RUN THREAD
-        t_command.start()
-        # WHILE HEADERS NOT AN END-OF-FILE OR AN ERROR CONTINUES
+        # THE KEYSTREAMS OF THE HEADERS AND CHUNKS ARE COMPUTED WHILE SENDING
+        with self.client.pipelined_crypto(
+            output_sizes=(LONG_SIZE, chunk_size), depth=self.crypto_pipeline_depth
+        ):
+            # RUN THREAD
+            t_command.start()
+            # WHILE HEADERS NOT AN END-OF-FILE OR AN ERROR CONTINUES
 
-        while True:
-            code_sr.last_header = self.client.just_recv_int(size=LONG_SIZE, signed=True)
-            if self.verbosity_mode:
-                print('SERVER-HEADER:-', code_sr.last_header)
-            if code_sr.last_header <= 0:
-                code_sr.recveing_signal = True
-                break
+            while True:
+                code_sr.last_header = self.client.just_recv_int(
+                    size=LONG_SIZE, signed=True
+                )
+                commands_logger.debug('SERVER-HEADER: %s', code_sr.last_header)
+                if code_sr.last_header <= 0:
+                    code_sr.recveing_signal = True
+                    break
 
-        t_command.join()
+            t_command.join()
 
         # FINAL HANDSHAKE
         if code_sr.last_header != PutGetCommandEnum.HPFFIN.value:
@@ -1201,6 +1419,8 @@ class TfProtocol(TfProtocolSuper):
         code_sr.send_put(PutGetCommandEnum.HPFFIN.value)
         code_sr.block = True
         transfer_handler(code_sr)
+        if progress:
+            progress.finish()
 
     def __put_command_t(
         self,
@@ -1209,6 +1429,9 @@ class TfProtocol(TfProtocolSuper):
         code_sr: CodesSenderRecvr,
         response_handler: ResponseHandler = EMPTY_HANDLER,
         transfer_handler: TransferAsyncHandler = EMPTY_HANDLER,
+        timer: Optional[ChunkTimer] = None,
+        throttle: Optional[Throttle] = None,
+        progress: Optional[ProgressTracker] = None,
     ):
         """This command is intended to be used ONLY by the put_command function not by
         user DO NOT CALL THIS METHOD DIRECTLY.
@@ -1220,19 +1443,30 @@ class TfProtocol(TfProtocolSuper):
             `response_handler` (ResponseHandler): The function to handle the command response.
             `transfer_handler` (TransferAsyncHandler): The function to handle the
                 transference cancelations from both client and server asynchronously.
+            `timer` (ChunkTimer): Measures the chunks for an adaptive size of the
+                payloads, bounded by `buffer_size`.
+            `throttle` (Throttle): Bandwidth limits of the transference.
+            `progress` (ProgressTracker): Progress tracker of the transference.
         """
         while True:
             try:
                 if code_sr.recveing_signal:
                     return
 
-                readed = data_stream.read(buffer_size)
+                chunk_size = timer.propose() if timer else buffer_size
+                readed = data_stream.read(chunk_size)
                 if not readed:
                     self.client.just_send(
                         PutGetCommandEnum.HPFEND.value, size=LONG_SIZE, signed=True
                     )
                     return
+                if throttle:
+                    throttle.consume(len(readed))
                 self.client.send(readed, header_size=LONG_SIZE)
+                if timer:
+                    timer.lap(chunk_size, len(readed))
+                if progress:
+                    progress.update(len(readed))
 
                 transfer_handler(code_sr)
                 response_handler(StatusInfo(StatusServerCode.OK, code=len(readed)))
@@ -1242,6 +1476,7 @@ class TfProtocol(TfProtocolSuper):
                     message='Some error ocurred while trying to upload data... retry again later',
                 )
 
+    @timed_command('NIGMA', renew_key=False)
     def nigma_command(
         self, keylen: int, response_handler: ResponseHandler = EMPTY_HANDLER
     ):
@@ -1255,26 +1490,7 @@ class TfProtocol(TfProtocolSuper):
         Raises:
             TfException: In case of invalid keylen.
         """
-        if keylen % 4 != 0 or keylen < 8:
-            raise TfException(
-                code=-1,
-                message='Invalid key length,'
-                ' key length must be multiple of 4'
-                ' and greater or equals than 8...',
-            )
-        response = self.client.translate(TfProtocolMessage('NIGMA', str(keylen)))
-        if response.status is StatusServerCode.OK:
-            hdr = self.client.just_recv_int(signed=True)
-            self.client.session_key = bytes(self.client.just_recv(size=hdr))
-            response_handler(
-                StatusInfo(
-                    status=StatusServerCode.OK,
-                    message=str(bytes(self.client.session_key)),
-                    payload=self.client.session_key,
-                )
-            )
-        else:
-            response_handler(response)
+        response_handler(self.client.rekey(keylen))
 
     def rmsd_command(
         self,
@@ -1309,66 +1525,113 @@ class TfProtocol(TfProtocolSuper):
         """
         response_handler(self.client.translate('TLB'))
 
-    def sdown_command(self, path: str, data_sink: BytesIO, timeout: float):
+    @timed_command('SDOWN')
+    def sdown_command(
+        self,
+        path: str,
+        data_sink: BytesIO,
+        timeout: float,
+        rate_limit: RateLimit = None,
+        progress_handler: ProgressHandler = EMPTY_HANDLER,
+        compression: Optional[CompressionCodec] = None,
+    ):
         """Downloads the specified file in the command argument.
 
         Args:
             `path` (str): File path to the server file to be download.
             `data_sink` (BytesIO): Data sink open in write/append mode.
             `timeout` (float): Time out (in seconds) used to shutdown pending connection.
+            `rate_limit` (RateLimit): Bandwidth limit of this transference, applied
+                besides the `rate_limiter` of the session.
+            `progress_handler` (ProgressHandler): The function to handle the progress
+                reports of the transference.
+            `compression` (CompressionCodec): Decompresses the data while it arrives, the
+                file in the server must be a compressed object (the codec is the one
+                named by its header).
         """
         socket_timeout = self.client.socket.timeout
         self.client.socket.settimeout(timeout if timeout > 0 else socket_timeout)
 
         # SEND: SDOWN 'path/to/file'
+        progress = self._download_progress('SDOWN', path, progress_handler)
         self.client.send(TfProtocolMessage('SDOWN', path))
+        throttle = Throttle(rate_limit, self.client.rate_limiter)
+        data_sink = decompressed(data_sink, compression)
         has_error = False
         header = None
         while True:
             try:
                 header = self.client.just_recv_int(signed=True)
                 if header > 0:
+                    if throttle:
+                        throttle.consume(header)
                     try:
                         data = self.client.just_recv(size=header)
                         data_sink.write(data)
+                        if progress:
+                            progress.update(header)
                     except IOError:
                         has_error = True
                 else:
                     break
             except TfException as e:
                 if isinstance(e.original_exception, socket.timeout):
-                    if self.verbosity_mode:
-                        print('Connection timeout...')
+                    commands_logger.debug('SDOWN: connection timeout')
                     break
                 else:
                     raise e
 
-        if socket_timeout > 0:
-            self.client.socket.settimeout(socket_timeout)
+        # THE SOCKET MAY HAVE NO TIMEOUT (None), RESTORE IT EITHER WAY
+        self.client.socket.settimeout(socket_timeout)
+        if progress:
+            progress.finish()
+        complete = finish_decompression(data_sink)
 
-        return header == 0 and not has_error
+        return header == 0 and not has_error and complete
 
-    def sup_command(self, path: str, data_stream: BytesIO, timeout: float):
+    @timed_command('SUP')
+    def sup_command(
+        self,
+        path: str,
+        data_stream: BytesIO,
+        timeout: float,
+        rate_limit: RateLimit = None,
+        progress_handler: ProgressHandler = EMPTY_HANDLER,
+        compression: Optional[CompressionCodec] = None,
+    ):
         """Uploads the specified file in the command argument.
 
         Args:
             `path` (str): Path to store uploaded file.
             `data_stream` (BytesIO): Data stream open in read mode.
             `timeout` (float): Time out (in seconds) used to shutdown pending connection.
+            `rate_limit` (RateLimit): Bandwidth limit of this transference, applied
+                besides the `rate_limiter` of the session.
+            `progress_handler` (ProgressHandler): The function to handle the progress
+                reports of the transference.
+            `compression` (CompressionCodec): Compresses the data while it is sent, the
+                server stores the compressed object with a small header naming the codec.
         """
         socket_timeout = self.client.socket.timeout
         self.client.socket.settimeout(timeout if timeout > 0 else socket_timeout)
 
         # SEND: SUP 'path/to/store/uploaded/file'
+        data_stream = compressed(data_stream, compression)
+        progress = self._upload_progress('SUP', path, data_stream, progress_handler)
         self.client.send(TfProtocolMessage('SUP', path))
         buffer_size = self.client.max_buffer_size
+        throttle = Throttle(rate_limit, self.client.rate_limiter)
         readed = b''
         header = 0
         try:
             while True:
                 readed = data_stream.read(buffer_size)
                 if readed:
+                    if throttle:
+                        throttle.consume(len(readed))
                     self.client.send(readed, header_size=INT_SIZE)
+                    if progress:
+                        progress.update(len(readed))
                 else:
                     break
             self.client.just_send(0, size=INT_SIZE, signed=True)
@@ -1387,8 +1650,11 @@ class TfProtocol(TfProtocolSuper):
             self.client.socket.settimeout(socket_timeout)
         except:  # pylint: disable=bare-except
             pass
+        if progress:
+            progress.finish()
         return header == 0
 
+    @timed_command('FSIZE')
     def fsize_command(
         self, path_file: str, response_handler: ResponseHandler = EMPTY_HANDLER
     ):
@@ -1408,6 +1674,7 @@ class TfProtocol(TfProtocolSuper):
             )
         )
 
+    @timed_command('FSIZELS')
     def fsizels_command(
         self, path_file: str, response_handler: ResponseHandler = EMPTY_HANDLER
     ):
@@ -1480,6 +1747,7 @@ class TfProtocol(TfProtocolSuper):
             )
         )
 
+    @timed_command('FTYPE')
     def ftype_command(
         self, path: str, response_handler: ResponseHandler = EMPTY_HANDLER
     ):
@@ -1499,6 +1767,7 @@ class TfProtocol(TfProtocolSuper):
             )
         )
 
+    @timed_command('FTYPELS')
     def ftypels_command(
         self, path: str, response_handler: ResponseHandler = EMPTY_HANDLER
     ):
@@ -1523,6 +1792,7 @@ class TfProtocol(TfProtocolSuper):
                 )
             )
 
+    @timed_command('FSTATLS')
     def fstatls_command(
         self, path: str, response_handler: Callable[[FileStat], None] = EMPTY_HANDLER
     ):
@@ -1580,6 +1850,15 @@ class TfProtocol(TfProtocolSuper):
                 300 miliseconds.
             `response_handler` (ResponseHandler): The function to handle the command response.
         """
+        # THE NOTIFICATIONS NEVER END, NO KEY IS RENEWED FROM NOW ON
+        with self.client.command():
+            self.__startnfy_command(interval, response_handler)
+
+    def __startnfy_command(
+        self,
+        interval: Union[float, str, int],
+        response_handler: Callable[[StatusInfo, Callable, Callable], None],
+    ):
         self.client.send(TfProtocolMessage('STARTNTFY', str(interval)))
 
         while True:
@@ -1604,11 +1883,13 @@ class TfProtocol(TfProtocolSuper):
                 send_del=lambda: self.client.send(TfProtocolMessage('DEL')),
             )
 
+    @timed_command('INTREAD')
     def intread_command(
         self,
         path: str,
         data_sink: BytesIO,
         response_handler: ResponseHandler = EMPTY_HANDLER,
+        progress_handler: ProgressHandler = EMPTY_HANDLER,
     ):
         """Integrity Read. It is intended to atomically download a file with its integrity
         checksum, for the case SHA256.
@@ -1617,6 +1898,8 @@ class TfProtocol(TfProtocolSuper):
             `path` (str): Path to file to read.
             `data_sink` (BytesIO): FileInput in write mode.
             `response_handler` (ResponseHandler): The function to handle the command response.
+            `progress_handler` (ProgressHandler): The function to handle the progress
+                reports of the transference.
         """
         self.client.send(TfProtocolMessage('INTREAD', path))
         ms_header = self.client.just_recv_int(size=INT_SIZE, signed=True)
@@ -1625,20 +1908,27 @@ class TfProtocol(TfProtocolSuper):
             response_handler(StatusInfo(status=StatusServerCode.FAILED, code=ms_header))
             return
 
+        # THE FILE COMES IN A SINGLE PAYLOAD, ITS SIZE IS THE HEADER
+        progress = self._progress('INTREAD', path, progress_handler, ms_header)
         checksum = self.client.just_recv_str(size=66)
         file_payload = self.client.just_recv(size=ms_header)
 
         data_sink.write(file_payload)
+        if progress:
+            progress.update(ms_header)
+            progress.finish()
         response_handler(
             StatusInfo(status=StatusServerCode.OK, code=ms_header, message=checksum)
         )
 
+    @timed_command('INTWRITE')
     def intwrite_command(
         self,
         path: str,
         data_stream: BytesIO,
         checksum: str,
         response_handler: ResponseHandler = EMPTY_HANDLER,
+        progress_handler: ProgressHandler = EMPTY_HANDLER,
     ):
         """Integrity Write. It is intended to atomically upload a file with its integrity
         checksum, for the case SHA256.
@@ -1648,6 +1938,8 @@ class TfProtocol(TfProtocolSuper):
             `data_stream` (BytesIO): FileInput in read mode.
             `checksum` (str): Checksum of the file.
             `response_handler` (ResponseHandler): The function to handle the command response.
+            `progress_handler` (ProgressHandler): The function to handle the progress
+                reports of the transference.
         """
         self.client.send(TfProtocolMessage('INTWRITE', path))
 
@@ -1656,7 +1948,11 @@ class TfProtocol(TfProtocolSuper):
 
         # Send the file payload
         payload = data_stream.read()
+        progress = self._progress('INTWRITE', path, progress_handler, len(payload))
         self.client.send(payload, header_size=INT_SIZE)
+        if progress:
+            progress.update(len(payload))
+            progress.finish()
 
         resp_code = self.client.just_recv_int(size=INT_SIZE, signed=True)
 
@@ -1868,3 +2164,48 @@ class TfProtocol(TfProtocolSuper):
         response_handler(
             self.client.translate(TfProtocolMessage('LOCKSYS', path_in_lock))
         )
+
+    def _progress(
+        self,
+        command: str,
+        path: str,
+        progress_handler: ProgressHandler,
+        total: Optional[int] = None,
+        done: int = 0,
+    ) -> Optional[ProgressTracker]:
+        """The progress tracker of a transference, None if nobody listens to it."""
+        if progress_handler is EMPTY_HANDLER:
+            return None
+        return ProgressTracker(
+            command, path, progress_handler, total, done, self.progress_interval
+        )
+
+    def _upload_progress(
+        self,
+        command: str,
+        path: str,
+        stream: BytesIO,
+        progress_handler: ProgressHandler,
+        done: int = 0,
+    ) -> Optional[ProgressTracker]:
+        """The progress tracker of an upload, its total is what is left in `stream`."""
+        if progress_handler is EMPTY_HANDLER:
+            return None
+        left = stream_left(stream)
+        total = done + left if left is not None else None
+        return self._progress(command, path, progress_handler, total, done)
+
+    def _download_progress(
+        self,
+        command: str,
+        path: str,
+        progress_handler: ProgressHandler,
+        done: int = 0,
+    ) -> Optional[ProgressTracker]:
+        """The progress tracker of a download, its total is asked with FSIZE."""
+        if progress_handler is EMPTY_HANDLER:
+            return None
+        sizes = []
+        self.fsize_command(path, response_handler=sizes.append)
+        total = sizes[-1].code if sizes and sizes[-1].code >= 0 else None
+        return self._progress(command, path, progress_handler, total, done)
@@ -2,9 +2,9 @@
 # email: lagcleaner@gmail.com
 
 from abc import ABC
+from time import perf_counter
 from typing import Callable, Optional, Tuple, Union
 
-from tfprotocol_client.connection.keep_alive_thread import KeepAliveThread
 from tfprotocol_client.connection.protocol_client import ProtocolClient
 from tfprotocol_client.misc.constants import (
     DFLT_MAX_BUFFER_SIZE,
@@ -12,9 +12,12 @@ from tfprotocol_client.misc.constants import (
     KEY_LEN_INTERVAL,
 )
 from tfprotocol_client.misc.handlers_aliases import ResponseHandler
+from tfprotocol_client.misc.metrics import Metrics
+from tfprotocol_client.misc.rate_limit import RateLimiter
 from tfprotocol_client.models.exceptions import ErrorCode, TfException
 from tfprotocol_client.models.keepalive_options import KeepAliveOptions
 from tfprotocol_client.models.proxy_options import ProxyOptions
+from tfprotocol_client.models.rekey_policy import RekeyPolicy
 from tfprotocol_client.models.status_info import StatusInfo
 from tfprotocol_client.models.status_server_code import StatusServerCode
 from tfprotocol_client.models.tcptimeout_options import TCPTimeoutOptions
@@ -29,6 +32,11 @@ class TfProtocolSuper(ABC):
     be able to instantiate the extended subclass.
     """
 
+    _metrics: Optional[Metrics] = None
+    _rate_limiter: Optional[RateLimiter] = None
+    _keystream_buffer_size: int = 0
+    _rekey_policy: Optional[RekeyPolicy] = None
+
     def __init__(
         self,
         protocol_version: str,
@@ -57,7 +65,8 @@ class TfProtocolSuper(ABC):
                 used to encrypt communication whit the server. Defaults to KEY_LEN_INTERVAL[0].
             `channel_len` (int, optional): The length of the channel.
                 Defaults to DFLT_MAX_BUFFER_SIZE.
-            `verbosity_mode` (bool): Debug mode enabled for verbosity.
+            `verbosity_mode` (bool): Debug mode enabled for verbosity, the traces of the
+                library are shown until the client is disconnected.
         """
         assert isinstance(port, int), f'Port argument must be an integer: {port} given'
         assert isinstance(
@@ -92,6 +101,7 @@ class TfProtocolSuper(ABC):
         keepalive_options: Optional[KeepAliveOptions] = None,
         on_response: ResponseHandler = EMPTY_HANDLER,
         on_connect: Callable[['TfProtocolSuper'], None] = EMPTY_HANDLER,
+        on_dead: Callable[['TfProtocolSuper'], None] = EMPTY_HANDLER,
     ):
         """Connect to the server with keep-alive mechanism enabled or disabled
 
@@ -101,15 +111,53 @@ class TfProtocolSuper(ABC):
                 connection process.
             `on_connect` ((TfProtocolSuper) -> None): The callback to retrieve the connected
                 instance of tfprotocol after stablishing connection.
+            `on_dead` ((TfProtocolSuper) -> None): The callback for when the keep alive
+                mechanism considers the connection dead and closes it.
+
+        Raises:
+            TfException: If the connection or the keep alive mechanism cannot be
+                stablished.
         """
         # TRY TO INITIATE CONNECTION
-        final_status: StatusInfo = self._connect()
+        final_status: StatusInfo = self._connect(on_response)
         if final_status.status is StatusServerCode.OK:
-            if keepalive_options:
+            # pylint: disable=import-outside-toplevel
+            proxy_options = self.__proto_client_args['proxy_options']
+            kept_alive = True
+            if keepalive_options and keepalive_options.multiplexed:
+                # REGISTER IN THE SHARED KEEP ALIVE MECHANISM
+                from tfprotocol_client.connection.keep_alive_service import (
+                    KeepAliveService,
+                )
+
+                kept_alive = KeepAliveService.instance().register(
+                    self.client,
+                    keepalive_options,
+                    proxy_options=proxy_options,
+                    on_dead=lambda _: on_dead(self),
+                )
+            elif keepalive_options:
                 # START KEEP ALIVE MECHANISM
-                udp_keep_alive = KeepAliveThread(self.client, keepalive_options)
+                from tfprotocol_client.connection.keep_alive_thread import (
+                    KeepAliveThread,
+                )
+
+                udp_keep_alive = KeepAliveThread(
+                    self.client,
+                    keepalive_options,
+                    proxy_options=proxy_options,
+                    on_connection_closed=lambda: on_dead(self),
+                )
                 udp_keep_alive.setDaemon(True)
                 udp_keep_alive.start()
+                kept_alive = self.client.is_connect()
+            if not kept_alive:
+                # THE UDP_PROCHECK SET UP FAILED AND THE CONNECTION WAS CLOSED
+                raise TfException(
+                    status_server_code=StatusServerCode.DISCONNECTED,
+                    code=ErrorCode.ON_WRITE_OR_RECEIVE_TO_SOCKET,
+                    message='Cannot start the keep alive mechanism',
+                )
             on_connect(self)
             return True
         else:
@@ -128,18 +176,36 @@ class TfProtocolSuper(ABC):
         self,
         on_response: ResponseHandler = EMPTY_HANDLER,
     ) -> StatusInfo:
+        metrics = self.metrics
         self._proto_client = ProtocolClient(**self.__proto_client_args)
-        self._tcp_timeout_options = TCPTimeoutOptions(
-            status_server_callback=on_response,
-        )
+        self._proto_client.metrics = metrics
+        self._proto_client.rate_limiter = self._rate_limiter
+        self._proto_client.keystream_buffer_size = self._keystream_buffer_size
+        self._proto_client.rekey_policy = self._rekey_policy
+        if metrics is None:
+            return self._handshake(on_response)
+        start = perf_counter()
+        with metrics.untimed():
+            status = self._handshake(on_response)
+        if status.status is StatusServerCode.OK:
+            metrics.observe_handshake(perf_counter() - start)
+        return status
+
+    def _handshake(self, on_response: ResponseHandler) -> StatusInfo:
+        if self._tcp_timeout_options is None:
+            self._tcp_timeout_options = TCPTimeoutOptions()
+        options = self._tcp_timeout_options
+        # THE OPTIONS OUTLIVE THE CONNECTION, THEY REPORT TO THE CURRENT ONE
+        options.status_server_callback = on_response
         count = 0
         status: StatusInfo = None
-        while count < self.tcp_timeout_options.connect_retry:
+        while count < max(options.connect_retry, 1):
             count += 1
-            # TRY TO STABLISH TCP CONNECTION
+            # TRY TO STABLISH TCP CONNECTION (THE OPTIONS ARE IN MILLISECONDS)
             status: StatusInfo = self._proto_client.start_connection(
-                self.tcp_timeout_options.dns_resolution_timeout,
-                self.tcp_timeout_options.connect_timeout,
+                options.dns_resolution_timeout / 1000,
+                options.connect_timeout / 1000,
+                options.connect_attempt_delay / 1000,
             )
             if status.status == StatusServerCode.OK:
                 break
@@ -169,6 +235,78 @@ class TfProtocolSuper(ABC):
             return status
         return StatusInfo(StatusServerCode.OK)
 
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        """Gets the metrics hook of the connection, None if it is disabled.
+
+        Returns:
+            Metrics: `metrics`
+        """
+        if self._proto_client is not None:
+            return self._proto_client.metrics
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, value: Optional[Metrics]):
+        self._metrics = value
+        if self._proto_client is not None:
+            self._proto_client.metrics = value
+
+    @property
+    def rate_limiter(self) -> Optional[RateLimiter]:
+        """Gets the bandwidth limit of the transferences of the session, None if they
+        are not limited. Share a limiter between sessions to limit all of them together.
+
+        Returns:
+            RateLimiter: `rate_limiter`
+        """
+        if self._proto_client is not None:
+            return self._proto_client.rate_limiter
+        return self._rate_limiter
+
+    @rate_limiter.setter
+    def rate_limiter(self, value: Optional[RateLimiter]):
+        self._rate_limiter = value
+        if self._proto_client is not None:
+            self._proto_client.rate_limiter = value
+
+    @property
+    def keystream_buffer_size(self) -> int:
+        """Gets the bytes of keystream computed ahead in each direction while the
+        session is idle (`DFLT_KEYSTREAM_BUFFER_SIZE` is a good start), so the small
+        commands do not pay the evolution of the cipher. 0 if it is disabled.
+
+        Returns:
+            int: `keystream_buffer_size`
+        """
+        if self._proto_client is not None:
+            return self._proto_client.keystream_buffer_size
+        return self._keystream_buffer_size
+
+    @keystream_buffer_size.setter
+    def keystream_buffer_size(self, value: int):
+        self._keystream_buffer_size = value
+        if self._proto_client is not None:
+            self._proto_client.keystream_buffer_size = value
+
+    @property
+    def rekey_policy(self) -> Optional[RekeyPolicy]:
+        """Gets when the session key is renewed with NIGMA, None if it is only renewed
+        on demand. The renewals are made between commands.
+
+        Returns:
+            RekeyPolicy: `rekey_policy`
+        """
+        if self._proto_client is not None:
+            return self._proto_client.rekey_policy
+        return self._rekey_policy
+
+    @rekey_policy.setter
+    def rekey_policy(self, value: Optional[RekeyPolicy]):
+        self._rekey_policy = value
+        if self._proto_client is not None:
+            self._proto_client.rekey_policy = value
+
     def disconnect(self):
         """Disconect the protocol client from the server."""
         self.client.stop_connection()
@@ -196,9 +334,12 @@ class TfProtocolSuper(ABC):
         return self._tcp_timeout_options
 
     @tcp_timeout_options.setter
-    def set_tcp_timeout_options(self, value: TCPTimeoutOptions):
+    def tcp_timeout_options(self, value: TCPTimeoutOptions):
         self._tcp_timeout_options = value
 
+    # DEPRECATED NAME OF THE PROPERTY, KEPT FOR THE EXISTING CODE
+    set_tcp_timeout_options = tcp_timeout_options
+
     @property
     def client(self) -> ProtocolClient:
         return self._proto_client
@@ -0,0 +1,689 @@
+# coded by lagcleaner
+# email: lagcleaner@gmail.com
+
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from queue import Empty, Queue
+from threading import Event, Lock
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from uuid import uuid4
+
+from tfprotocol_client.misc.chunk_sizing import AdaptiveChunkSize
+from tfprotocol_client.misc.constants import (
+    DFLT_SYNC_BUFFER_SIZE,
+    EMPTY_HANDLER,
+    STRING_ENCODING,
+)
+from tfprotocol_client.misc.handlers_aliases import ResponseHandler
+from tfprotocol_client.models.exceptions import TfException
+from tfprotocol_client.models.file_stat import FileStat
+from tfprotocol_client.models.message import TfProtocolMessage
+from tfprotocol_client.models.status_info import StatusInfo
+from tfprotocol_client.models.status_server_code import StatusServerCode
+from tfprotocol_client.models.sync_plan import (
+    SyncAction,
+    SyncActionEnum,
+    SyncPlan,
+    SyncReport,
+)
+from tfprotocol_client.security.hash_utils import sha256_file
+from tfprotocol_client.tfprotocol import TfProtocol
+
+# Prefix of the temporary path lists uploaded to stat the server files with FSTATLS.
+SYNC_LIST_PREFIX = '.tfsync-'
+# Suffix of the partial downloads, kept to resume them.
+SYNC_PART_SUFFIX = '.tfpart'
+
+
+class TfProtocolSync:
+    """Synchronization of local files with the server, built on top of the commands of a
+    connected `TfProtocol` session. The transferences are skipped when the server already
+    has an identical copy of the file.
+    """
+
+    def __init__(
+        self,
+        tfprotocol: TfProtocol,
+        buffer_size: Union[int, AdaptiveChunkSize] = DFLT_SYNC_BUFFER_SIZE,
+        session_factory: Optional[Callable[[], TfProtocol]] = None,
+        workers: int = 1,
+        pipeline_depth: int = 32,
+    ) -> None:
+        """Synchronization helper initialization.
+
+        Args:
+            `tfprotocol` (TfProtocol): The connected session used for the commands.
+            `buffer_size` (Union[int, AdaptiveChunkSize]): Buffer size of the PUT and GET
+                transferences. Every parallel session tunes its own copy of an
+                `AdaptiveChunkSize`, their links do not perform alike.
+            `session_factory` (Callable[[], TfProtocol]): Builds a new session, not yet
+                connected, for the parallel transferences. Without it every file is
+                transferred through `tfprotocol`.
+            `workers` (int): Number of sessions transferring files at the same time,
+                including `tfprotocol`.
+            `pipeline_depth` (int): Maximum number of directory operations sent to the
+                server without waiting for their answers.
+        """
+        self._tfprotocol = tfprotocol
+        self.buffer_size = buffer_size
+        # ADAPTIVE BUFFER SIZES OF THE PARALLEL SESSIONS, BY SESSION ID
+        self._session_buffer_sizes: Dict[int, AdaptiveChunkSize] = {}
+        self.session_factory = session_factory
+        self.workers = workers
+        self.pipeline_depth = pipeline_depth
+
+    @property
+    def tfprotocol(self) -> TfProtocol:
+        return self._tfprotocol
+
+    def remote_size(self, path: str) -> int:
+        """Size of a server file, -1 if it does not exist."""
+        responses: List[StatusInfo] = []
+        self._tfprotocol.fsize_command(path, response_handler=responses.append)
+        return responses[-1].code
+
+    def remote_sha256(self, path: str) -> Optional[str]:
+        """SHA256 (lowercase hexadecimal digest) of a server file, None if it cannot be
+        computed.
+        """
+        responses: List[StatusInfo] = []
+        self._tfprotocol.sha256_command(path, response_handler=responses.append)
+        if responses[-1].status is not StatusServerCode.OK:
+            return None
+        digest = responses[-1].message.strip().lower()
+        return digest[2:] if digest.startswith('0x') else digest
+
+    def remote_tree(
+        self, remote_dir: str, read_only: bool = False
+    ) -> Optional[Dict[str, Optional[FileStat]]]:
+        """Entries of a server directory and its subdirectories. The stats of the files
+        are requested all at once with FSTATLS, which needs a temporary list of paths
+        (named `SYNC_LIST_PREFIX`...) uploaded to `remote_dir` and removed afterwards.
+        The list is left behind if the session dies in between, and it is ignored by
+        later calls. With `read_only` (or when the list cannot be uploaded) every file
+        is stated with FSTAT instead, one request per file, and nothing is written.
+
+        Args:
+            `remote_dir` (str): Path of the directory in the server.
+            `read_only` (bool): Do not write in the server.
+
+        Returns:
+            Optional[Dict[str, Optional[FileStat]]]: The stat of every file by its path
+                relative to `remote_dir`, the directories end with '/' and have no stat.
+                None if the directory cannot be listed.
+        """
+        responses: List[StatusInfo] = []
+        sink = BytesIO()
+        self._tfprotocol.lsr_command(
+            remote_dir, response_handler=responses.append, sink=sink
+        )
+        if responses[-1].status is StatusServerCode.FAILED:
+            return None
+        listing = sink.getvalue()
+        tree: Dict[str, Optional[FileStat]] = {}
+        files: List[str] = []
+        for line in listing.decode(STRING_ENCODING).splitlines():
+            kind, _, rel = line.partition(': ')
+            if not rel or rel.startswith(SYNC_LIST_PREFIX):
+                continue
+            if kind == 'D':
+                tree[rel.rstrip('/') + '/'] = None
+            elif kind == 'F':
+                files.append(rel)
+        tree.update(zip(files, self._stat_files(remote_dir, files, read_only)))
+        return tree
+
+    def _stat_files(
+        self, remote_dir: str, files: List[str], read_only: bool
+    ) -> List[FileStat]:
+        if not files:
+            return []
+        paths = [_remote_path(remote_dir, rel) for rel in files]
+        stats: List[FileStat] = []
+        if not read_only:
+            list_path = _remote_path(remote_dir, f'{SYNC_LIST_PREFIX}{uuid4().hex}')
+            responses: List[StatusInfo] = []
+            try:
+                self._tfprotocol.put_command(
+                    BytesIO('\n'.join(paths).encode(STRING_ENCODING)),
+                    list_path,
+                    0,
+                    self.buffer_size,
+                    response_handler=responses.append,
+                )
+                if responses and responses[-1].status is StatusServerCode.OK:
+                    self._tfprotocol.fstatls_command(
+                        list_path, response_handler=stats.append
+                    )
+                    # THE LAST STRUCTURE IS THE TERMINATOR
+                    stats = stats[:-1][: len(files)]
+            finally:
+                self._tfprotocol.del_command(list_path)
+        # ONE FSTAT PER FILE NOT LISTED, WITHOUT WRITING IN THE SERVER
+        for path in paths[len(stats) :]:
+            self._tfprotocol.fstat_command(
+                path, response_handler=lambda stat, _: stats.append(stat)
+            )
+        return stats
+
+    def plan_put_dir(
+        self,
+        local_dir: str,
+        remote_dir: str,
+        checksum: bool = False,
+        delete: bool = False,
+        read_only: bool = False,
+    ) -> SyncPlan:
+        """Computes the operations needed to make a server directory equal to a local
+        one. A file is uploaded when it is missing in the server, its size differs or it
+        was modified locally after the server copy (with `checksum`, when its SHA256
+        differs instead).
+
+        Args:
+            `local_dir` (str): Path of the local directory.
+            `remote_dir` (str): Path of the directory in the server.
+            `checksum` (bool): Compare the content of the files with the same size.
+            `delete` (bool): Remove the server entries missing in the local directory.
+                New files with the same content of a removed one are renamed in the
+                server instead of uploaded.
+            `read_only` (bool): Do not write in the server while planning, see
+                `remote_tree`.
+
+        Returns:
+            SyncPlan: The operations in execution order.
+        """
+        local = _local_tree(local_dir)
+        remote = self.remote_tree(remote_dir, read_only)
+        actions: List[SyncAction] = []
+        if remote is None:
+            remote = {}
+            actions.append(SyncAction(SyncActionEnum.MKDIR, ''))
+        uploads: List[SyncAction] = []
+        skipped = 0
+        for rel, stat in sorted(local.items()):
+            if stat is None:
+                if rel not in remote:
+                    actions.append(SyncAction(SyncActionEnum.MKDIR, rel))
+            elif self._put_needed(
+                os.path.join(local_dir, rel),
+                _remote_path(remote_dir, rel),
+                stat,
+                remote.get(rel),
+                checksum,
+            ):
+                uploads.append(SyncAction(SyncActionEnum.PUT, rel, stat.st_size))
+            else:
+                skipped += 1
+        removals: List[SyncAction] = []
+        if delete:
+            extra = sorted(rel for rel in remote if rel not in local)
+            # THE ENTRIES INSIDE A REMOVED DIRECTORY MAY STILL BE RENAME SOURCES
+            removals = _removals(extra)
+            renames = self._find_renames(local_dir, remote_dir, uploads, extra, remote)
+            actions.extend(renames)
+            renamed = {action.target for action in renames}
+            uploads = [action for action in uploads if action.path not in renamed]
+            renamed = {action.path for action in renames}
+            removals = [action for action in removals if action.path not in renamed]
+        actions.extend(uploads)
+        actions.extend(removals)
+        return SyncPlan(actions, skipped)
+
+    def _put_needed(
+        self,
+        local_path: str,
+        remote_path: str,
+        stat: os.stat_result,
+        remote_stat: Optional[FileStat],
+        checksum: bool,
+    ) -> bool:
+        if remote_stat is None:
+            # MISSING IN THE SERVER, OR A DIRECTORY WITH THE SAME NAME
+            return True
+        if stat.st_size != remote_stat.size:
+            return True
+        if checksum:
+            return self.remote_sha256(remote_path) != sha256_file(local_path).hex()
+        return int(stat.st_mtime) > remote_stat.last_modification
+
+    def _find_renames(
+        self,
+        local_dir: str,
+        remote_dir: str,
+        uploads: List[SyncAction],
+        extra: List[str],
+        remote: Dict[str, Optional[FileStat]],
+    ) -> List[SyncAction]:
+        """Pairs the new local files with removed server files of the same content."""
+        candidates = [rel for rel in extra if remote[rel] is not None]
+        renames: List[SyncAction] = []
+        remote_digests: Dict[str, Optional[str]] = {}
+        for upload in uploads:
+            if upload.path in remote:
+                continue
+            matches = [rel for rel in candidates if remote[rel].size == upload.size]
+            if not matches:
+                continue
+            digest = sha256_file(os.path.join(local_dir, upload.path)).hex()
+            for rel in matches:
+                if rel not in remote_digests:
+                    remote_digests[rel] = self.remote_sha256(
+                        _remote_path(remote_dir, rel)
+                    )
+                if remote_digests[rel] == digest:
+                    renames.append(
+                        SyncAction(SyncActionEnum.RENAM, rel, target=upload.path)
+                    )
+                    candidates.remove(rel)
+                    break
+        return renames
+
+    def sync_dir(
+        self,
+        local_dir: str,
+        remote_dir: str,
+        checksum: bool = False,
+        delete: bool = False,
+        dry_run: bool = False,
+        response_handler: ResponseHandler = EMPTY_HANDLER,
+    ) -> SyncReport:
+        """Makes a server directory equal to a local one, see `plan_put_dir`. The
+        directory operations are pipelined and the files are uploaded in parallel when
+        there is a `session_factory`.
+
+        Args:
+            `local_dir` (str): Path of the local directory.
+            `remote_dir` (str): Path of the directory in the server.
+            `checksum` (bool): Compare the content of the files with the same size.
+            `delete` (bool): Remove the server entries missing in the local directory.
+            `dry_run` (bool): Only compute the plan, nothing is written in the server.
+            `response_handler` (ResponseHandler): The function to handle the PUT responses.
+
+        Returns:
+            SyncReport: The plan and the outcome of every operation.
+        """
+        start = perf_counter()
+        plan = self.plan_put_dir(local_dir, remote_dir, checksum, delete, dry_run)
+        report = SyncReport(plan, dry_run)
+        if not dry_run:
+            self._run_pipelined(
+                report,
+                remote_dir,
+                plan.actions_of(SyncActionEnum.MKDIR, SyncActionEnum.RENAM),
+            )
+            self._run_transfers(
+                report,
+                plan.actions_of(SyncActionEnum.PUT),
+                lambda session, action: self._put_file(
+                    os.path.join(local_dir, action.path),
+                    _remote_path(remote_dir, action.path),
+                    response_handler,
+                    session,
+                ),
+            )
+            self._run_pipelined(
+                report,
+                remote_dir,
+                plan.actions_of(SyncActionEnum.DEL, SyncActionEnum.RMDIR),
+            )
+        report.elapsed = perf_counter() - start
+        return report
+
+    def _run_pipelined(
+        self, report: SyncReport, remote_dir: str, actions: List[SyncAction]
+    ):
+        messages = [
+            TfProtocolMessage(
+                action.action.name,
+                _remote_path(remote_dir, action.path),
+                '|',
+                _remote_path(remote_dir, action.target),
+            )
+            if action.action is SyncActionEnum.RENAM
+            else TfProtocolMessage(
+                action.action.name, _remote_path(remote_dir, action.path)
+            )
+            for action in actions
+        ]
+        responses = self._tfprotocol.client.pipeline(messages, self.pipeline_depth)
+        for action, response in zip(actions, responses):
+            if response.status is StatusServerCode.OK:
+                report.done.append(action)
+            else:
+                report.failed.append((action, response))
+
+    def _run_transfers(
+        self,
+        report: SyncReport,
+        actions: List[SyncAction],
+        transfer: Callable[[TfProtocol, SyncAction], bool],
+    ):
+        """Runs `transfer` for every action, spread over the available sessions."""
+        if not actions:
+            return
+        pending: 'Queue[SyncAction]' = Queue()
+        for action in actions:
+            pending.put(action)
+        lock = Lock()
+
+        def worker(session: TfProtocol):
+            while True:
+                try:
+                    action = pending.get_nowait()
+                except Empty:
+                    return
+                try:
+                    ok = transfer(session, action)
+                except TfException:
+                    # THE SESSION IS UNUSABLE, THE REMAINING FILES GO TO THE OTHERS
+                    with lock:
+                        report.failed.append((action, None))
+                    return
+                with lock:
+                    if ok:
+                        report.done.append(action)
+                        report.transferred += action.size
+                    else:
+                        report.failed.append((action, None))
+
+        sessions = [self._tfprotocol] + self._open_sessions(
+            min(self.workers, len(actions)) - 1
+        )
+        if isinstance(self.buffer_size, AdaptiveChunkSize):
+            for session in sessions[1:]:
+                self._session_buffer_sizes[id(session)] = self.buffer_size.copy()
+        try:
+            with ThreadPoolExecutor(
+                max_workers=len(sessions), thread_name_prefix='sync_transfer'
+            ) as pool:
+                for session in sessions:
+                    pool.submit(worker, session)
+        finally:
+            for session in sessions[1:]:
+                self._session_buffer_sizes.pop(id(session), None)
+                session.disconnect()
+        while not pending.empty():
+            report.failed.append((pending.get_nowait(), None))
+
+    def _open_sessions(self, count: int) -> List[TfProtocol]:
+        sessions: List[TfProtocol] = []
+        if self.session_factory is None:
+            return sessions
+        # THE HANDSHAKES ARE DONE ONE BY ONE, EVERY SESSION HAS ITS OWN KEY
+        for _ in range(count):
+            session = self.session_factory()
+            try:
+                session.connect()
+            except TfException:
+                break
+            sessions.append(session)
+        return sessions
+
+    def plan_get_dir(
+        self,
+        remote_dir: str,
+        local_dir: str,
+        delete: bool = False,
+        read_only: bool = False,
+    ) -> SyncPlan:
+        """Computes the operations needed to make a local directory equal to a server
+        one. A file is downloaded when it is missing locally or its size or modification
+        time differ from the server copy, the downloaded files keep the server times.
+
+        Args:
+            `remote_dir` (str): Path of the directory in the server.
+            `local_dir` (str): Path of the local directory.
+            `delete` (bool): Remove the local entries missing in the server directory.
+            `read_only` (bool): Do not write in the server while planning, see
+                `remote_tree`.
+
+        Returns:
+            SyncPlan: The operations in execution order, the size of a download is the
+                amount of bytes left, excluding a previous partial download.
+        """
+        return self._plan_get_dir(remote_dir, local_dir, delete, read_only)[0]
+
+    def _plan_get_dir(
+        self, remote_dir: str, local_dir: str, delete: bool, read_only: bool = False
+    ) -> Tuple[SyncPlan, Dict[str, Optional[FileStat]]]:
+        remote = self.remote_tree(remote_dir, read_only)
+        if remote is None:
+            raise TfException(message=f'Cannot list the server directory {remote_dir}')
+        local = _local_tree(local_dir) if os.path.isdir(local_dir) else {}
+        actions: List[SyncAction] = []
+        if not os.path.isdir(local_dir):
+            actions.append(SyncAction(SyncActionEnum.MKDIR, ''))
+        downloads: List[SyncAction] = []
+        skipped = 0
+        for rel, stat in sorted(remote.items()):
+            local_stat = local.get(rel)
+            if stat is None:
+                if rel not in local:
+                    actions.append(SyncAction(SyncActionEnum.MKDIR, rel))
+            elif (
+                local_stat is None
+                or local_stat.st_size != stat.size
+                or int(local_stat.st_mtime) != stat.last_modification
+            ):
+                part_path = _part_path(os.path.join(local_dir, rel), stat)
+                done = os.path.getsize(part_path) if os.path.isfile(part_path) else 0
+                downloads.append(
+                    SyncAction(
+                        SyncActionEnum.GET,
+                        rel,
+                        stat.size - done if done <= stat.size else stat.size,
+                    )
+                )
+            else:
+                skipped += 1
+        actions.extend(downloads)
+        if delete:
+            actions.extend(_removals(sorted(rel for rel in local if rel not in remote)))
+        return SyncPlan(actions, skipped), remote
+
+    def mirror_down(
+        self,
+        remote_dir: str,
+        local_dir: str,
+        delete: bool = False,
+        dry_run: bool = False,
+        response_handler: ResponseHandler = EMPTY_HANDLER,
+    ) -> SyncReport:
+        """Makes a local directory equal to a server one, see `plan_get_dir`. The files
+        are downloaded in parallel when there is a `session_factory`. Every download
+        goes to a partial file first, so a mirror interrupted halfway resumes the files
+        where it left them.
+
+        Args:
+            `remote_dir` (str): Path of the directory in the server.
+            `local_dir` (str): Path of the local directory.
+            `delete` (bool): Remove the local entries missing in the server directory.
+            `dry_run` (bool): Only compute the plan, nothing is changed locally nor
+                written in the server.
+            `response_handler` (ResponseHandler): The function to handle the GET responses.
+
+        Returns:
+            SyncReport: The plan and the outcome of every operation.
+        """
+        start = perf_counter()
+        plan, remote = self._plan_get_dir(remote_dir, local_dir, delete, dry_run)
+        report = SyncReport(plan, dry_run)
+        if not dry_run:
+            for action in plan.actions_of(SyncActionEnum.MKDIR):
+                _run_local(
+                    report,
+                    action,
+                    lambda path: os.makedirs(path, exist_ok=True),
+                    os.path.join(local_dir, action.path),
+                )
+            self._run_transfers(
+                report,
+                plan.actions_of(SyncActionEnum.GET),
+                lambda session, action: self._get_file(
+                    _remote_path(remote_dir, action.path),
+                    os.path.join(local_dir, action.path),
+                    remote[action.path],
+                    response_handler,
+                    session,
+                ),
+            )
+            for action in plan.actions_of(SyncActionEnum.DEL, SyncActionEnum.RMDIR):
+                remove = (
+                    shutil.rmtree
+                    if action.action is SyncActionEnum.RMDIR
+                    else os.remove
+                )
+                _run_local(report, action, remove, os.path.join(local_dir, action.path))
+        report.elapsed = perf_counter() - start
+        return report
+
+    def _get_file(
+        self,
+        remote_path: str,
+        local_path: str,
+        stat: FileStat,
+        response_handler: ResponseHandler = EMPTY_HANDLER,
+        tfprotocol: Optional[TfProtocol] = None,
+    ) -> bool:
+        part_path = _part_path(local_path, stat)
+        offset = os.path.getsize(part_path) if os.path.isfile(part_path) else 0
+        if offset > stat.size:
+            offset = 0
+        with open(part_path, 'r+b' if offset else 'wb') as sink:
+            if offset < stat.size:
+                (tfprotocol or self._tfprotocol).get_command(
+                    sink,
+                    remote_path,
+                    offset,
+                    self._buffer_size_of(tfprotocol),
+                    response_handler=response_handler,
+                )
+        if os.path.getsize(part_path) != stat.size:
+            # KEPT TO RESUME THE DOWNLOAD
+            return False
+        os.replace(part_path, local_path)
+        os.utime(local_path, (stat.last_access, stat.last_modification))
+        return True
+
+    def sync_put(
+        self,
+        local_path: str,
+        remote_path: str,
+        response_handler: ResponseHandler = EMPTY_HANDLER,
+    ) -> bool:
+        """Uploads a local file unless the server has an identical one. The local SHA256 is
+        computed in a worker thread while the server is asked for the size of its copy
+        (and its SHA256 when the sizes match), so an unchanged file costs a couple of
+        round trips.
+
+        Args:
+            `local_path` (str): Path of the local file.
+            `remote_path` (str): Path of the file in the server.
+            `response_handler` (ResponseHandler): The function to handle the PUT responses.
+
+        Returns:
+            bool: True if the file was uploaded, False if it was already in the server or
+                the server refused the PUT.
+        """
+        local_size = os.path.getsize(local_path)
+        cancel = Event()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='sync_sha256') as pool:
+            local_digest = pool.submit(sha256_file, local_path, cancel)
+            try:
+                if self.remote_size(remote_path) == local_size:
+                    remote_digest = self.remote_sha256(remote_path)
+                    if remote_digest and remote_digest == local_digest.result().hex():
+                        return False
+            finally:
+                # STOP HASHING IF THE DIGEST IS NOT NEEDED
+                cancel.set()
+        return self._put_file(local_path, remote_path, response_handler)
+
+    def _put_file(
+        self,
+        local_path: str,
+        remote_path: str,
+        response_handler: ResponseHandler = EMPTY_HANDLER,
+        tfprotocol: Optional[TfProtocol] = None,
+    ) -> bool:
+        accepted = []
+
+        def on_response(status: StatusInfo):
+            if not accepted:
+                accepted.append(status.status is StatusServerCode.OK)
+            response_handler(status)
+
+        with open(local_path, 'rb') as stream:
+            (tfprotocol or self._tfprotocol).put_command(
+                stream,
+                remote_path,
+                0,
+                self._buffer_size_of(tfprotocol),
+                response_handler=on_response,
+            )
+        return bool(accepted) and accepted[0]
+
+    def _buffer_size_of(
+        self, tfprotocol: Optional[TfProtocol]
+    ) -> Union[int, AdaptiveChunkSize]:
+        """The buffer size of the transferences made through `tfprotocol`."""
+        if tfprotocol is None:
+            return self.buffer_size
+        return self._session_buffer_sizes.get(id(tfprotocol), self.buffer_size)
+
+
+def _remote_path(remote_dir: str, rel: str) -> str:
+    """Server path of an entry relative to `remote_dir`."""
+    rel = rel.rstrip('/')
+    return f'{remote_dir.rstrip("/")}/{rel}' if rel else remote_dir
+
+
+def _local_tree(local_dir: str) -> Dict[str, Optional[os.stat_result]]:
+    """Entries of a local directory like `TfProtocolSync.remote_tree` does."""
+    tree: Dict[str, Optional[os.stat_result]] = {}
+    for current, dirs, files in os.walk(local_dir):
+        rel = os.path.relpath(current, local_dir)
+        prefix = '' if rel == '.' else rel.replace(os.sep, '/') + '/'
+        for name in dirs:
+            tree[f'{prefix}{name}/'] = None
+        for name in files:
+            if not name.endswith(SYNC_PART_SUFFIX):
+                tree[f'{prefix}{name}'] = os.stat(os.path.join(current, name))
+    return tree
+
+
+def _removals(extra: List[str]) -> List[SyncAction]:
+    """Removal of the sorted `extra` entries, the directories are removed with their
+    content.
+    """
+    removals: List[SyncAction] = []
+    for rel in extra:
+        if removals and removals[-1].path.endswith('/') and rel.startswith(
+            removals[-1].path
+        ):
+            continue
+        kind = SyncActionEnum.RMDIR if rel.endswith('/') else SyncActionEnum.DEL
+        removals.append(SyncAction(kind, rel))
+    return removals
+
+
+def _run_local(
+    report: SyncReport,
+    action: SyncAction,
+    operation: Callable[[str], None],
+    path: str,
+):
+    try:
+        operation(path)
+    except OSError:
+        report.failed.append((action, None))
+    else:
+        report.done.append(action)
+
+
+def _part_path(local_path: str, stat: FileStat) -> str:
+    """Partial download of a file, bound to the version of the server file."""
+    return f'{local_path}.{stat.last_modification}{SYNC_PART_SUFFIX}'